@@ -0,0 +1,224 @@
+"""One capture stream, any number of consumers.
+
+``CaptureHub`` owns the input (normally an ``AudioStream`` on the
+microphone, opened once at the device's native rate) and copies every
+block it delivers to each subscriber: the wake word and clap detectors
+with command capture, a recorder, and so on. A subscriber asks for its own
+sample rate and block size; the hub resamples and re-blocks with whole-array
+NumPy operations, once per input block.
+
+Each subscription has its own bounded ``FrameQueue``. The hub never waits
+for a subscriber: if one falls behind, its queue fills and its blocks are
+dropped and counted, while every other subscriber keeps receiving audio.
+"""
+import logging
+import threading
+import time
+
+import numpy as np
+
+from audio.frames import FrameQueue
+from audio.sources import AudioSource
+
+logger = logging.getLogger(__name__)
+
+
+class Resampler:
+    """Streaming sample-rate converter for int16 blocks of any length.
+
+    Linear interpolation between input samples, preceded when downsampling
+    by a windowed-sinc low-pass at the output Nyquist frequency so speech
+    above it does not alias into the band the detectors see. The filter
+    tail and fractional read position carry over between blocks, so
+    converting a stream block by block gives the same samples as converting
+    it in one piece.
+    """
+
+    def __init__(self, input_rate, output_rate, taps=31):
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.step = input_rate / output_rate
+        self._position = 1.0
+        self._last = 0.0
+
+        self._filter = None
+        if output_rate < input_rate:
+            cutoff = output_rate / input_rate / 2
+            n = np.arange(taps) - (taps - 1) / 2
+            kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+            self._filter = (kernel / kernel.sum()).astype(np.float32)
+            self._tail = np.zeros(taps - 1, dtype=np.float32)
+
+    def process(self, block):
+        """Convert one input block; returns however many output samples it completes."""
+        samples = np.asarray(block, dtype=np.float32)
+        if self._filter is not None:
+            padded = np.concatenate((self._tail, samples))
+            self._tail = padded[len(padded) - len(self._tail):]
+            samples = np.convolve(padded, self._filter, mode="valid")
+
+        # Index 0 is the previous block's last sample, so interpolation spans block edges
+        extended = np.concatenate(([self._last], samples))
+        count = int((len(samples) - self._position) // self.step) + 1 if self._position <= len(samples) else 0
+        positions = self._position + np.arange(count) * self.step
+        out = np.interp(positions, np.arange(len(extended)), extended)
+
+        self._position += count * self.step - len(samples)
+        self._last = samples[-1] if len(samples) else self._last
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+
+
+class HubSubscription(AudioSource):
+    """A consumer's view of the hub: an ``AudioSource`` at its own rate and frame length.
+
+    Anything that runs on an audio source (the controller, command capture,
+    a recorder) can run on a subscription. ``now`` is the capture time of
+    the last frame read. ``read`` raises ``EOFError`` once a finite hub
+    source is exhausted and everything queued has been read.
+    """
+
+    def __init__(self, hub, name, sample_rate, frame_length, queue_frames=32, read_timeout=1.0, pool_size=4):
+        super().__init__(sample_rate, frame_length, pool_size)
+        self.hub = hub
+        self.name = name
+        self.queue = FrameQueue(frame_length, queue_frames)
+        self.read_timeout = read_timeout
+        self.resampler = Resampler(hub.sample_rate, sample_rate) if sample_rate != hub.sample_rate else None
+        self._staging = np.zeros(frame_length, dtype=np.int16)
+        self._filled = 0
+        self._now = time.time()
+        self._reported_drops = 0
+        self._last_drop_report = 0.0
+
+    def feed(self, block, block_end):
+        """Hub thread: resample ``block``, cut it into frames and queue them (never blocks)."""
+        samples = self.resampler.process(block) if self.resampler is not None else block
+        total = len(samples)
+        offset = 0
+        while offset < total:
+            take = min(self.frame_length - self._filled, total - offset)
+            self._staging[self._filled:self._filled + take] = samples[offset:offset + take]
+            self._filled += take
+            offset += take
+            if self._filled == self.frame_length:
+                # Timestamp of the frame's last sample
+                self.queue.put(self._staging, block_end - (total - offset) / self.sample_rate)
+                self._filled = 0
+
+    def start(self):
+        self.hub.start()
+
+    def read(self):
+        frame = self.pool.next()
+        if not self.queue.get_into(frame, self.read_timeout):
+            if self.queue.closed and self.queue.depth == 0:
+                raise EOFError("Capture hub source exhausted")
+            return None
+        self._now = float(self.queue.last_timestamp)
+        self._report_drops()
+        return frame
+
+    def _report_drops(self):
+        if self.queue.dropped == self._reported_drops:
+            return
+        now = time.monotonic()
+        if now - self._last_drop_report < 5.0:
+            return
+        logger.warning(f"Capture subscriber {self.name} is falling behind: {self.queue.dropped} frames dropped")
+        self._reported_drops = self.queue.dropped
+        self._last_drop_report = now
+
+    def now(self):
+        return self._now
+
+    def stop(self):
+        self.hub.unsubscribe(self)
+
+    def stats(self):
+        stats = super().stats()
+        stats.update(self.queue.stats())
+        return stats
+
+
+class CaptureHub:
+    """
+    Read one audio source on a background thread and fan its blocks out to subscribers.
+
+    Args:
+        source: The source that owns the device (e.g. ``AudioStream``); any
+            ``AudioSource`` works, including replayed ones
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.sample_rate = source.sample_rate
+        # Replaced, never mutated, so the hub thread iterates without a lock
+        self._subscriptions = ()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+
+    def subscribe(self, name, sample_rate=None, frame_length=None, queue_frames=32, read_timeout=1.0):
+        """Add a consumer; ``sample_rate``/``frame_length`` default to the source's."""
+        subscription = HubSubscription(
+            self,
+            name,
+            sample_rate or self.sample_rate,
+            frame_length or self.source.frame_length,
+            queue_frames,
+            read_timeout
+        )
+        with self._lock:
+            self._subscriptions = self._subscriptions + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a consumer; the source is closed when the last one leaves."""
+        with self._lock:
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+            last = not self._subscriptions
+        subscription.queue.close()
+        if last:
+            self.stop()
+
+    def start(self):
+        """Start the source and the fan-out thread (once; later calls do nothing)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.source.start()
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="capture-hub", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        try:
+            while self._running:
+                block = self.source.read()
+                if block is None or len(block) == 0:
+                    continue
+                block_end = self.source.now()
+                for subscription in self._subscriptions:
+                    subscription.feed(block, block_end)
+        except EOFError:
+            logger.info("Capture hub source finished")
+        except Exception as e:
+            logger.error(f"Capture hub stopped: {e}")
+        finally:
+            for subscription in self._subscriptions:
+                subscription.queue.close()
+
+    def stop(self):
+        self._running = False
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        if thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+        self.source.stop()
+
+    def stats(self):
+        stats = {"source": self.source.stats()}
+        for subscription in self._subscriptions:
+            stats[subscription.name] = subscription.stats()
+        return stats
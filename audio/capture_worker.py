@@ -0,0 +1,295 @@
+"""Capture and detection for one input device, run in its own process.
+
+With several microphones (one per room), the supervisor in
+``launcher.supervisor`` starts ``capture_worker`` once per device. Each
+worker owns its audio source, its ``WakeWordDetector`` and its
+``ClapDetector``, so detection for N rooms runs on N cores and one slow
+room cannot make another drop frames. Workers do not act on anything
+themselves: they put ``DetectionEvent``s (and, for commands, the captured
+audio as a ``CapturedCommand``) on a shared queue and the dispatcher in the
+main process decides which room's detection to act on.
+
+Everything passed to a worker is picklable, as workers are started with
+the ``spawn`` method on every platform.
+"""
+import logging
+import os
+import queue
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from logging.handlers import QueueHandler
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from audio.clap_detector import ClapDetector
+from audio.command_capture import CommandCapture
+from audio.vad import EnergyVAD
+from audio.wake_word import WakeWord, WakeWordDetector
+
+logger = logging.getLogger(__name__)
+
+# File extensions treated as recordings to replay rather than device names
+REPLAY_EXTENSIONS = (".wav", ".pcm", ".raw")
+
+
+@dataclass(frozen=True)
+class DetectionEvent:
+    """
+    A wake word or double clap heard by one worker.
+
+    Attributes:
+        room: Name of the worker's input
+        seq: Per-worker sequence number; a command's audio follows with the same one
+        kind: ``"wake"`` or ``"clap"``
+        action: The wake word's action, or ``"launch"`` for a double clap
+        keyword: Wake word label (empty for claps)
+        energy: Mean RMS over the last ``energy_window`` seconds, used to pick
+            the room the user is in when several heard the same thing
+        time: Detection time on the worker's source clock
+    """
+
+    room: str
+    seq: int
+    kind: str
+    action: str
+    keyword: str
+    energy: float
+    time: float
+
+
+@dataclass(frozen=True)
+class CapturedCommand:
+    """Command audio captured after a ``command`` wake word (pre-roll included)."""
+
+    room: str
+    seq: int
+    audio: np.ndarray
+    sample_rate: int
+    frame_length: int
+
+
+@dataclass(frozen=True)
+class WorkerExit:
+    """Last message of a worker: why it stopped and its audio source stats."""
+
+    room: str
+    reason: str
+    stats: dict = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class DetectorSettings:
+    """Reloaded detector settings the supervisor sends to a running worker."""
+
+    clap_threshold: int
+    clap_interval: float
+    active_duration: float
+
+
+@dataclass
+class WorkerConfig:
+    """
+    Everything one capture worker needs, sent to it when it starts.
+
+    Args:
+        room: Display name of the input, e.g. ``kitchen``
+        device: Input device index or name, ``synthetic:<script>`` or a
+            WAV/raw file path to replay
+        wake_words: Wake words this worker listens for
+        engine_factory: Optional picklable callable returning a wake word
+            engine (see ``WakeWordDetector``); used instead of Porcupine
+        speed: Replay speed for file and synthetic sources
+        start_time: Source clock start for replayed audio; workers replayed
+            together share it so their detection times are comparable
+    """
+
+    room: str
+    device: str
+    wake_words: List[WakeWord]
+    clap_threshold: int = 1800
+    clap_interval: float = 0.7
+    active_duration: float = 5.0
+    command_preroll: float = 0.3
+    command_max_duration: float = 5.0
+    command_silence_duration: float = 0.8
+    command_start_timeout: float = 3.0
+    vad_threshold: int = 500
+    queue_frames: int = 32
+    energy_window: float = 0.5
+    speed: float = 1.0
+    start_time: Optional[float] = None
+    engine_factory: Optional[Callable[[], Any]] = None
+
+    @property
+    def is_replay(self) -> bool:
+        return (
+            self.device.startswith("synthetic:")
+            or self.device.lower().endswith(REPLAY_EXTENSIONS)
+            or os.path.isfile(self.device)
+        )
+
+    def open_audio(self, sample_rate: int, frame_length: int):
+        if self.is_replay:
+            from audio.sources import open_source
+            return open_source(self.device, sample_rate, frame_length, self.speed, self.start_time)
+
+        # Imported here so replayed workers run without PortAudio installed
+        from audio.stream import AudioStream
+        device = int(self.device) if self.device.isdigit() else (self.device or None)
+        return AudioStream(sample_rate, frame_length, queue_frames=self.queue_frames, device=device)
+
+
+def parse_devices(spec: str) -> List[Tuple[str, str]]:
+    """
+    Parse an ``AUDIO_DEVICES`` value into ``(room, device)`` pairs.
+
+    Entries are separated by ``;`` (synthetic scripts contain commas) and
+    look like ``room=device`` or just ``device``, e.g.
+    ``kitchen=1; office=USB Audio; test=synthetic:silence:1,clap``.
+    Unnamed entries are called ``mic1``, ``mic2``, ...
+    """
+    devices = []
+    for entry in spec.split(";"):
+        entry = entry.strip()
+        if not entry:
+            continue
+        room, separator, device = entry.partition("=")
+        if not separator or room.startswith("synthetic:") or not room.strip():
+            room, device = f"mic{len(devices) + 1}", entry
+        room, device = room.strip(), device.strip()
+        if not device:
+            raise ValueError(f"Audio device entry {entry!r} has no device")
+        if any(room == existing for existing, _ in devices):
+            raise ValueError(f"Audio device room {room!r} is listed twice")
+        devices.append((room, device))
+    return devices
+
+
+def _forward_logging(log_queue, level: int):
+    """Send this process's log records to the supervisor instead of writing them here."""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+
+
+def _apply_control(control, clap: ClapDetector, config: WorkerConfig):
+    """Apply the newest ``DetectorSettings`` waiting on ``control``, if any."""
+    settings = None
+    while True:
+        try:
+            settings = control.get_nowait()
+        except queue.Empty:
+            break
+    if settings is None:
+        return
+    clap.configure(settings.clap_threshold, settings.clap_interval)
+    config.active_duration = settings.active_duration
+    logger.info(f"[{config.room}] Clap threshold {settings.clap_threshold}, interval {settings.clap_interval}s")
+
+
+def capture_worker(config: WorkerConfig, events, log_queue, stop, log_level: int = logging.INFO, control=None):
+    """
+    Process entry point: read frames from one input and report detections.
+
+    Mirrors the controller's loop: wake words are scored on every frame
+    while idle, and a ``command`` wake word captures the command from the
+    same stream. As in ``UnifiedController._on_wake_word``, the worker is
+    active only while that command is captured and idle again afterwards.
+
+    Args:
+        config: This worker's input and detector settings
+        events: Queue receiving ``DetectionEvent``, ``CapturedCommand`` and ``WorkerExit``
+        log_queue: Queue the supervisor's log listener reads
+        stop: Event set by the supervisor to end the worker
+        log_level: Root log level to apply in this process
+        control: Optional queue of ``DetectorSettings`` from configuration reloads
+    """
+    _forward_logging(log_queue, log_level)
+    room = config.room
+    audio = None
+    reason = "stopped"
+    try:
+        engine = config.engine_factory() if config.engine_factory else None
+        detector = WakeWordDetector(config.wake_words, engine=engine)
+        clap = ClapDetector(config.clap_threshold, config.clap_interval)
+        audio = config.open_audio(detector.sample_rate, detector.frame_length)
+        capture = CommandCapture(
+            audio.sample_rate,
+            audio.frame_length,
+            preroll=config.command_preroll,
+            max_duration=config.command_max_duration,
+            silence_duration=config.command_silence_duration,
+            start_timeout=config.command_start_timeout,
+            vad=EnergyVAD(config.vad_threshold)
+        )
+    except Exception as e:
+        logger.error(f"[{room}] Capture worker failed to start: {e}")
+        events.put(WorkerExit(room, f"failed to start: {e}"))
+        return
+
+    # Per-frame RMS over the last energy_window seconds
+    levels = deque(maxlen=max(1, int(config.energy_window * audio.sample_rate / audio.frame_length)))
+    seq = 0
+    active = False
+    active_time = 0.0
+
+    try:
+        audio.start()
+        logger.info(f"[{room}] Capturing from {config.device} (pid {os.getpid()})")
+        while not stop.is_set():
+            pcm = audio.read()
+            if pcm is None or len(pcm) == 0:
+                continue
+            levels.append(EnergyVAD.rms(pcm))
+            if control is not None and not control.empty():
+                _apply_control(control, clap, config)
+
+            if active:
+                if audio.now() - active_time > config.active_duration:
+                    active = False
+                    continue
+                if clap.detect(pcm, audio.now()) == 2:
+                    seq += 1
+                    events.put(DetectionEvent(room, seq, "clap", "launch", "", sum(levels) / len(levels), audio.now()))
+                    active = False
+                continue
+
+            capture.push(pcm)
+            detected = detector.detect(pcm)
+            if not detected:
+                continue
+
+            seq += 1
+            detected_at = audio.now()
+            events.put(DetectionEvent(
+                room, seq, "wake", detected.action, detected.label, sum(levels) / len(levels), detected_at
+            ))
+            if detected.action == "command":
+                active = True
+                active_time = detected_at
+                command = capture.capture(audio.read)
+                events.put(CapturedCommand(room, seq, command, audio.sample_rate, audio.frame_length))
+                active = False
+    except EOFError:
+        reason = "source finished"
+    except KeyboardInterrupt:
+        reason = "interrupted"
+    except Exception as e:
+        logger.error(f"[{room}] Capture worker error: {e}")
+        reason = f"error: {e}"
+    finally:
+        stats = {}
+        try:
+            audio.stop()
+            stats = audio.stats()
+        except Exception as e:
+            logger.error(f"[{room}] Error closing audio source: {e}")
+        try:
+            detector.cleanup()
+        except Exception:
+            pass
+        events.put(WorkerExit(room, reason, stats))
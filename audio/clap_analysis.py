@@ -0,0 +1,149 @@
+"""Offline clap analysis over whole recordings.
+
+Computes the same per-frame features as ``ClapDetector.detect`` (peak,
+jump from the previous frame, 10-frame moving average) with NumPy over the
+entire recording at once, then replays only the loud frames through
+``ClapDetector.register_clap`` so the clap events and double/triple
+decisions match the streaming detector frame for frame.
+
+Usage:
+    python -m audio.clap_analysis recording.wav --threshold 1800 --interval 0.7
+    python -m audio.clap_analysis recording.raw --sample-rate 16000
+"""
+import argparse
+import json
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+
+from audio.clap_detector import ClapDetector
+from audio.sources import load_pcm
+
+HISTORY_LENGTH = 10
+
+
+@dataclass
+class ClapEvent:
+    frame: int
+    time: float
+    amplitude: int
+    decision: int = 0
+
+
+@dataclass
+class ClapAnalysis:
+    sample_rate: int
+    frame_length: int
+    peak: np.ndarray
+    jump: np.ndarray
+    moving_average: np.ndarray
+    claps: List[ClapEvent] = field(default_factory=list)
+
+    @property
+    def decisions(self) -> List[ClapEvent]:
+        return [event for event in self.claps if event.decision]
+
+    def summary(self) -> dict:
+        return {
+            "frames": int(self.peak.size),
+            "duration": self.peak.size * self.frame_length / self.sample_rate,
+            "claps": len(self.claps),
+            "doubles": sum(1 for e in self.claps if e.decision == 2),
+            "triples": sum(1 for e in self.claps if e.decision == 3),
+            "decisions": [
+                {"frame": e.frame, "time": round(e.time, 4), "decision": e.decision}
+                for e in self.decisions
+            ],
+        }
+
+
+def frame_features(samples, frame_length):
+    """Per-frame peak and 10-frame moving average for a whole recording.
+
+    Trailing samples that do not fill a frame are dropped, exactly as the
+    live stream never delivers a partial frame.
+    """
+    audio = np.asarray(samples, dtype=np.int16)
+    n_frames = audio.size // frame_length
+    frames = audio[:n_frames * frame_length].reshape(n_frames, frame_length)
+
+    peak = np.maximum(frames.max(axis=1).astype(np.int64), -frames.min(axis=1).astype(np.int64))
+
+    cumulative = np.concatenate(([0], np.cumsum(peak)))
+    index = np.arange(n_frames)
+    start = np.maximum(index + 1 - HISTORY_LENGTH, 0)
+    counts = index + 1 - start
+    moving_average = (cumulative[index + 1] - cumulative[start]) / counts
+
+    return peak, moving_average
+
+
+def analyze(samples, threshold, interval, sample_rate=16000, frame_length=512, start_time=0.0):
+    """Run clap detection over a whole int16 recording.
+
+    Args:
+        samples: 1-D int16 samples (array, memmap or buffer)
+        threshold: Same meaning as ``CLAP_THRESHOLD``
+        interval: Same meaning as ``CLAP_INTERVAL``
+        sample_rate: Sample rate of ``samples``
+        frame_length: Samples per frame, as delivered by ``AudioStream``
+        start_time: Timestamp assigned to the first frame
+
+    Returns:
+        ClapAnalysis with per-frame features and every registered clap
+    """
+    peak, moving_average = frame_features(samples, frame_length)
+    frame_duration = frame_length / sample_rate
+    times = start_time + np.arange(peak.size) * frame_duration
+
+    previous = np.concatenate(([0], peak[:-1]))
+    jump = peak - previous
+
+    sustained = moving_average < threshold * 0.5
+    sustained[:2] = True
+    loud = peak > threshold
+
+    # ClapDetector leaves previous_amplitude untouched on frames that return a
+    # decision, so the frame after a decision measures its jump against the
+    # frame before it. Decisions only happen on loud frames, so walking the
+    # loud frames in order is enough to patch those jumps up.
+    detector = ClapDetector(threshold, interval)
+    analysis = ClapAnalysis(sample_rate, frame_length, peak, jump, moving_average)
+    stale_previous = {}
+
+    for i in np.flatnonzero(loud):
+        i = int(i)
+        if i in stale_previous:
+            jump[i] = peak[i] - stale_previous[i]
+        sharp = jump[i] > threshold * 0.4
+        if not (sharp or sustained[i]):
+            continue
+
+        if times[i] - detector.last_clap_time <= 0.1:
+            continue
+
+        decision = detector.register_clap(float(times[i]))
+        analysis.claps.append(ClapEvent(i, float(times[i]), int(peak[i]), decision))
+        if decision and i + 1 < peak.size:
+            stale_previous[i + 1] = stale_previous.get(i, peak[i - 1] if i else 0)
+
+    return analysis
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline clap detection over a WAV recording")
+    parser.add_argument("path", help="Mono 16-bit WAV file, or raw int16 PCM with --sample-rate")
+    parser.add_argument("--sample-rate", type=int, default=None)
+    parser.add_argument("--threshold", type=int, default=1800)
+    parser.add_argument("--interval", type=float, default=0.7)
+    parser.add_argument("--frame-length", type=int, default=512)
+    args = parser.parse_args()
+
+    samples, sample_rate = load_pcm(args.path, args.sample_rate)
+    analysis = analyze(samples, args.threshold, args.interval, sample_rate, args.frame_length)
+    print(json.dumps(analysis.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
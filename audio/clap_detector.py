@@ -1,6 +1,10 @@
 import time
-import numpy as np
 from collections import deque
+from audio.frames import frame_peak
+from utils import metrics
+
+CLAPS = metrics.counter("arc_claps_total", "Clap-shaped frames accepted after debouncing")
+CLAP_SEQUENCES = metrics.counter("arc_clap_sequences_total", "Double and triple claps recognised", labels=("claps",))
 
 class ClapDetector:
     def __init__(self, threshold, interval, debug=False):
@@ -10,41 +14,69 @@ class ClapDetector:
 
         self.clap_times = []
         self.last_clap_time = 0
+        self.amplitude = 0
         self.previous_amplitude = 0
         self.amplitude_history = deque(maxlen=10)
+        self.amplitude_sum = 0
+
+    def configure(self, threshold, interval):
+        """Apply new settings between frames; the clap history is kept."""
+        self.threshold = threshold
+        self.interval = interval
 
-    def detect(self, pcm):
-        audio = np.array(pcm, dtype=np.int16)
-        amplitude = np.abs(audio).max()
-        now = time.time()
+    def detect(self, pcm, now=None):
+        amplitude = self.amplitude = frame_peak(pcm)
+        if now is None:
+            now = time.time()
 
+        if len(self.amplitude_history) == self.amplitude_history.maxlen:
+            self.amplitude_sum -= self.amplitude_history[0]
         self.amplitude_history.append(amplitude)
+        self.amplitude_sum += amplitude
 
         amplitude_jump = amplitude - self.previous_amplitude
         sharp = amplitude_jump > self.threshold * 0.4
         loud = amplitude > self.threshold
 
         sustained = (
-            sum(self.amplitude_history) / len(self.amplitude_history)
+            self.amplitude_sum / len(self.amplitude_history)
             < self.threshold * 0.5
             if len(self.amplitude_history) >= 3 else True
         )
 
         is_clap = loud and (sharp or sustained)
 
-        if is_clap and now - self.last_clap_time > 0.1:
-            self.clap_times.append(now)
-            self.last_clap_time = now
+        if is_clap:
+            decision = self.register_clap(now)
+            if decision:
+                return decision
 
-            self.clap_times = [t for t in self.clap_times if now - t < self.interval * 2.5]
+        self.previous_amplitude = amplitude
+        return 0
 
-            if len(self.clap_times) >= 3 and self.clap_times[-1] - self.clap_times[-3] < self.interval * 2.5:
-                self.clap_times.clear()
-                return 3
+    def register_clap(self, now):
+        """Record a clap-shaped frame at ``now`` and return 0, 2 or 3.
 
-            if len(self.clap_times) >= 2 and self.clap_times[-1] - self.clap_times[-2] < self.interval:
-                self.clap_times.clear()
-                return 2
+        Shared by the streaming path and ``audio.clap_analysis`` so both make
+        identical double/triple decisions for the same clap timestamps.
+        """
+        if now - self.last_clap_time <= 0.1:
+            return 0
+
+        self.clap_times.append(now)
+        self.last_clap_time = now
+        CLAPS.inc()
+
+        self.clap_times = [t for t in self.clap_times if now - t < self.interval * 2.5]
+
+        if len(self.clap_times) >= 3 and self.clap_times[-1] - self.clap_times[-3] < self.interval * 2.5:
+            self.clap_times.clear()
+            CLAP_SEQUENCES.labels(claps=3).inc()
+            return 3
+
+        if len(self.clap_times) >= 2 and self.clap_times[-1] - self.clap_times[-2] < self.interval:
+            self.clap_times.clear()
+            CLAP_SEQUENCES.labels(claps=2).inc()
+            return 2
 
-        self.previous_amplitude = amplitude
         return 0
@@ -0,0 +1,102 @@
+import logging
+import numpy as np
+from audio.vad import EnergyVAD
+
+logger = logging.getLogger(__name__)
+
+class CommandCapture:
+    """Capture a spoken command from the running audio stream.
+
+    While idle, the controller pushes every frame into a small pre-roll ring
+    so the start of the command is kept even if it overlaps the wake word
+    detection. ``capture`` then keeps reading frames from the same stream
+    until the VAD sees trailing silence, no speech starts in time, or the
+    max-duration cap is hit.
+    """
+
+    def __init__(
+        self,
+        sample_rate,
+        frame_length,
+        preroll=0.3,
+        max_duration=5.0,
+        silence_duration=0.8,
+        start_timeout=3.0,
+        vad=None
+    ):
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.frame_duration = frame_length / sample_rate
+        self.max_frames = max(1, int(max_duration / self.frame_duration))
+        self.silence_frames = max(1, int(silence_duration / self.frame_duration))
+        self.start_timeout_frames = max(1, int(start_timeout / self.frame_duration))
+        self.vad = vad or EnergyVAD(500)
+
+        self.preroll_frames = int(round(preroll / self.frame_duration))
+        self._ring = np.zeros((max(1, self.preroll_frames), frame_length), dtype=np.int16)
+        self._ring_index = 0
+        self._ring_count = 0
+
+    def push(self, frame):
+        """Remember a frame heard before the wake word fired (per-frame, no allocation)."""
+        if not self.preroll_frames:
+            return
+        np.copyto(self._ring[self._ring_index], frame)
+        self._ring_index = (self._ring_index + 1) % self.preroll_frames
+        self._ring_count = min(self._ring_count + 1, self.preroll_frames)
+
+    def preroll(self):
+        """Return the buffered pre-roll frames, oldest first, and clear the ring."""
+        start = (self._ring_index - self._ring_count) % max(1, self.preroll_frames)
+        order = (start + np.arange(self._ring_count)) % max(1, self.preroll_frames)
+        frames = self._ring[order].reshape(-1)
+        self._ring_count = 0
+        return frames
+
+    def capture(self, read, on_frame=None):
+        """Read frames via ``read()`` until the command ends.
+
+        Args:
+            read: Callable returning the next int16 frame (e.g. ``AudioStream.read``)
+            on_frame: Optional callback receiving each captured frame as it arrives
+
+        Returns:
+            1-D int16 array with the pre-roll followed by the captured frames
+        """
+        chunks = [self.preroll()]
+        if on_frame and chunks[0].size:
+            on_frame(chunks[0])
+
+        speech_started = False
+        silent_run = 0
+        reason = "max duration"
+
+        for count in range(1, self.max_frames + 1):
+            frame = read()
+            if frame is None or len(frame) == 0:
+                continue
+
+            frame = np.array(frame, dtype=np.int16)
+            chunks.append(frame)
+            if on_frame:
+                on_frame(frame)
+
+            if self.vad.is_speech(frame):
+                speech_started = True
+                silent_run = 0
+            else:
+                silent_run += 1
+
+            if speech_started and silent_run >= self.silence_frames:
+                reason = "trailing silence"
+                break
+            if not speech_started and count >= self.start_timeout_frames:
+                reason = "no speech"
+                break
+
+        samples = np.concatenate(chunks)
+        logger.debug(
+            f"Command capture ended ({reason}) after "
+            f"{samples.size / self.sample_rate:.2f}s"
+        )
+        return samples
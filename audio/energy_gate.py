@@ -0,0 +1,115 @@
+import numpy as np
+from audio.vad import EnergyVAD
+
+
+class EnergyGate:
+    """Skip the expensive detectors on frames that are just room noise.
+
+    Each frame's RMS is compared with the larger of ``min_level`` and
+    ``ratio`` times a tracked noise floor. Quiet frames are only copied into
+    a short look-back ring. When a frame clears the level the gate opens and
+    returns the look-back frames followed by the current one, so Porcupine
+    still hears the onset of a wake word that started on skipped frames. It
+    stays open for ``hangover`` seconds after the last loud frame, so soft
+    word endings are scored too.
+
+    The noise floor follows quieter levels quickly and louder ones slowly
+    (``fall`` and ``rise`` per frame), so a steady background such as a fan
+    or TV raises it over tens of seconds while speech barely moves it.
+    """
+
+    def __init__(
+        self,
+        sample_rate,
+        frame_length,
+        ratio=2.0,
+        min_level=150.0,
+        hangover=1.0,
+        lookback=0.5,
+        rise=0.002,
+        fall=0.05
+    ):
+        self.frame_duration = frame_length / sample_rate
+        self.ratio = ratio
+        self.min_level = min_level
+        self.rise = rise
+        self.fall = fall
+        self.hangover_frames = max(0, int(round(hangover / self.frame_duration)))
+        self.lookback_frames = max(0, int(round(lookback / self.frame_duration)))
+        self._ring = np.zeros((max(1, self.lookback_frames), frame_length), dtype=np.int16)
+        self._ring_index = 0
+        self._ring_count = 0
+
+        self.noise_floor = min_level / ratio
+        self.is_open = False
+        self._hangover_left = 0
+
+        self.frames = 0
+        self.skipped = 0
+        self.replayed = 0
+        self.openings = 0
+
+    def admit(self, frame):
+        """Return the frames the detectors should process now, oldest first (often none)."""
+        self.frames += 1
+        level = EnergyVAD.rms(frame)
+        loud = level > max(self.min_level, self.noise_floor * self.ratio)
+        self.noise_floor += (self.fall if level < self.noise_floor else self.rise) * (level - self.noise_floor)
+
+        if loud:
+            self._hangover_left = self.hangover_frames
+            if not self.is_open:
+                self.is_open = True
+                self.openings += 1
+                if self._ring_count:
+                    lookback = self._lookback()
+                    self.replayed += len(lookback)
+                    return [*lookback, frame]
+            return (frame,)
+
+        if self.is_open:
+            if self._hangover_left > 0:
+                self._hangover_left -= 1
+                return (frame,)
+            self.is_open = False
+
+        self._remember(frame)
+        self.skipped += 1
+        return ()
+
+    def _remember(self, frame):
+        if not self.lookback_frames:
+            return
+        np.copyto(self._ring[self._ring_index], frame)
+        self._ring_index = (self._ring_index + 1) % self.lookback_frames
+        self._ring_count = min(self._ring_count + 1, self.lookback_frames)
+
+    def _lookback(self):
+        """The remembered quiet frames, oldest first, and clear the ring."""
+        start = (self._ring_index - self._ring_count) % self.lookback_frames
+        order = (start + np.arange(self._ring_count)) % self.lookback_frames
+        self._ring_count = 0
+        return self._ring[order]
+
+    def reset(self):
+        """Close the gate and forget the look-back, e.g. after reading a command past it."""
+        self.is_open = False
+        self._hangover_left = 0
+        self._ring_count = 0
+
+    @property
+    def saved_fraction(self):
+        """Share of frames the detectors never saw (skipped and not replayed later)."""
+        if not self.frames:
+            return 0.0
+        return (self.skipped - self.replayed) / self.frames
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "replayed": self.replayed,
+            "openings": self.openings,
+            "saved_fraction": round(self.saved_fraction, 4),
+            "noise_floor": round(self.noise_floor, 1),
+        }
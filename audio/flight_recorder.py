@@ -0,0 +1,335 @@
+"""Flight recorder: the last few minutes of audio and detector events, on disk.
+
+Two fixed-size, memory-mapped ring files in one directory:
+
+``audio.ring``
+    64-byte header (``ARCAUD1``, frames written, capacity, frame length,
+    sample rate), then one float64 capture time per slot, then the int16
+    samples, ``capacity x frame_length``. Frame ``n`` lives in slot
+    ``n % capacity``.
+
+``events.ring``
+    64-byte header (``ARCEVT1``, events written, capacity), then 24-byte
+    records ``(time f8, frame u8, kind u2, arg i2, value f4)``. ``frame`` is
+    the audio frame the event belongs to, so any event can be cut out of
+    the audio ring.
+
+``recorder.json`` holds the geometry, the event kinds and the wake word
+labels (a wake event's ``arg`` indexes them). Recording is a memcpy into
+the page cache per frame and one record per event; the OS writes the
+pages back, so the files survive a crash of the assistant. Restarting with
+the same settings continues the rings.
+
+Frames are written either by the caller (``write_frame``) or by a
+background thread following a source of its own (``follow``), such as a
+capture hub subscription. An event is placed on the frame whose capture
+time matches the event's timestamp, so the thread writing frames does not
+need to be the one reporting events.
+
+Slicing a WAV around an event::
+
+    python -m audio.flight_recorder recordings/                  # list events
+    python -m audio.flight_recorder recordings/ --event 12 --export fp.wav
+    python -m audio.flight_recorder recordings/ --last 30 --export tail.wav
+"""
+import argparse
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import wave
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HEADER_SIZE = 64
+AUDIO_MAGIC = b"ARCAUD1\0"
+EVENTS_MAGIC = b"ARCEVT1\0"
+EVENT_DTYPE = np.dtype([("time", "<f8"), ("frame", "<u8"), ("kind", "<u2"), ("arg", "<i2"), ("value", "<f4")])
+
+# Event kinds
+EVENT_WAKE = 1            # arg: wake word index
+EVENT_CLAP_AMPLITUDE = 2  # value: frame peak seen by the clap detector
+EVENT_CLAP = 3            # arg: 2 or 3 claps
+EVENT_STATE = 4           # arg: STATE_*, value: 1 entered / 0 left
+EVENT_KINDS = {EVENT_WAKE: "wake", EVENT_CLAP_AMPLITUDE: "clap_amplitude", EVENT_CLAP: "clap", EVENT_STATE: "state"}
+
+STATE_ACTIVE = 0
+STATE_WAITING_TRIPLE = 1
+STATES = {STATE_ACTIVE: "active", STATE_WAITING_TRIPLE: "waiting_triple"}
+
+
+def _open_ring(path, magic, size, header_fields, create):
+    """Map ``path`` (creating and zeroing it if asked) and check its header."""
+    if create:
+        with open(path, "wb") as f:
+            f.truncate(size)
+    mapped = np.memmap(path, dtype=np.uint8, mode="r+" if create is not None else "r", shape=(size,))
+    if create:
+        mapped[:HEADER_SIZE] = np.frombuffer(
+            struct.pack(f"<8sQ{len(header_fields)}I", magic, 0, *header_fields).ljust(HEADER_SIZE, b"\0"),
+            dtype=np.uint8
+        )
+    if bytes(mapped[:8]) != magic:
+        raise ValueError(f"{path}: not a flight recorder ring")
+    return mapped
+
+
+class FlightRecorder:
+    """
+    Write frames and events into the ring files in ``directory``.
+
+    Args:
+        directory: Where the rings and ``recorder.json`` live (created if needed)
+        sample_rate: Sample rate of the recorded frames
+        frame_length: Samples per frame
+        minutes: Audio kept, rounded to whole frames
+        wake_labels: Wake word labels, indexed by wake events' ``arg``
+        event_capacity: Events kept
+    """
+
+    def __init__(
+        self,
+        directory,
+        sample_rate: int,
+        frame_length: int,
+        minutes: float = 5.0,
+        wake_labels: Sequence[str] = (),
+        event_capacity: int = 65536
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.capacity = max(1, int(minutes * 60 * sample_rate / frame_length))
+        self.event_capacity = event_capacity
+
+        metadata = {
+            "version": 1,
+            "sample_rate": sample_rate,
+            "frame_length": frame_length,
+            "capacity": self.capacity,
+            "event_capacity": event_capacity,
+            "event_kinds": {str(kind): name for kind, name in EVENT_KINDS.items()},
+            "states": {str(state): name for state, name in STATES.items()},
+            "wake_labels": list(wake_labels),
+        }
+        metadata_path = os.path.join(directory, "recorder.json")
+        previous = {}
+        if os.path.exists(metadata_path):
+            with open(metadata_path, encoding="utf-8") as f:
+                previous = json.load(f)
+        # Continue the rings only if they have the same layout and event meanings
+        same = ("sample_rate", "frame_length", "capacity", "event_capacity", "wake_labels")
+        resume = all(previous.get(key) == metadata[key] for key in same) and all(
+            os.path.exists(os.path.join(directory, name)) for name in ("audio.ring", "events.ring")
+        )
+
+        audio_size = HEADER_SIZE + self.capacity * (8 + frame_length * 2)
+        self._audio = _open_ring(
+            os.path.join(directory, "audio.ring"), AUDIO_MAGIC, audio_size,
+            (self.capacity, frame_length, sample_rate), create=not resume
+        )
+        self._frames_written = self._audio[8:16].view("<u8")
+        times_end = HEADER_SIZE + self.capacity * 8
+        self._times = self._audio[HEADER_SIZE:times_end].view("<f8")
+        self._samples = self._audio[times_end:].view("<i2").reshape(self.capacity, frame_length)
+
+        events_size = HEADER_SIZE + event_capacity * EVENT_DTYPE.itemsize
+        self._events_map = _open_ring(
+            os.path.join(directory, "events.ring"), EVENTS_MAGIC, events_size, (event_capacity,), create=not resume
+        )
+        self._events_written = self._events_map[8:16].view("<u8")
+        self._events = self._events_map[HEADER_SIZE:].view(EVENT_DTYPE)
+
+        tmp_path = f"{metadata_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(tmp_path, metadata_path)
+
+        self.frame = int(self._frames_written[0])
+        self.event_count = int(self._events_written[0])
+        self.frame_duration = frame_length / sample_rate
+        # (index, capture time) of the last frame written this session, replaced in one assignment
+        self._last = None
+        self._source = None
+        self._thread = None
+        logger.info(
+            f"Flight recorder {'resumed' if resume else 'started'} in {directory}: "
+            f"{self.capacity * frame_length / sample_rate / 60:.1f} min of audio, {event_capacity} events"
+        )
+
+    def write_frame(self, pcm, timestamp: float):
+        """Append one frame (per-frame path: two copies into mapped memory)."""
+        slot = self.frame % self.capacity
+        np.copyto(self._samples[slot], pcm)
+        self._times[slot] = timestamp
+        self._last = (self.frame, timestamp)
+        self.frame += 1
+        self._frames_written[0] = self.frame
+
+    def follow(self, source) -> "FlightRecorder":
+        """Record every frame ``source`` delivers on a background thread until it ends or ``close``."""
+        self._source = source
+        self._thread = threading.Thread(target=self._follow, name="flight-recorder", daemon=True)
+        self._thread.start()
+        return self
+
+    def _follow(self):
+        try:
+            while True:
+                pcm = self._source.read()
+                if pcm is not None and len(pcm):
+                    self.write_frame(pcm, self._source.now())
+        except EOFError:
+            pass
+        except Exception as e:
+            logger.error(f"Flight recorder stopped recording: {e}")
+
+    def frame_at(self, timestamp: Optional[float]) -> int:
+        """Index of the frame captured at ``timestamp`` (the last written one if unknown)."""
+        last = self._last
+        if last is None or timestamp is None:
+            return max(0, self.frame - 1)
+        frame, captured = last
+        return max(0, frame + int(round((timestamp - captured) / self.frame_duration)))
+
+    def event(self, kind: int, arg: int = 0, value: float = 0.0, timestamp: Optional[float] = None):
+        """Append an event on the frame captured at ``timestamp`` (on the source clock)."""
+        self._events[self.event_count % self.event_capacity] = (
+            time.time() if timestamp is None else timestamp, self.frame_at(timestamp), kind, arg, value
+        )
+        self.event_count += 1
+        self._events_written[0] = self.event_count
+
+    def close(self):
+        if self._source is not None:
+            self._source.stop()
+            self._thread.join(timeout=2.0)
+        self._audio.flush()
+        self._events_map.flush()
+
+
+class FlightRecording:
+    """Read-only view of a recorder directory, for listing events and cutting WAVs."""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, "recorder.json"), encoding="utf-8") as f:
+            self.metadata = json.load(f)
+        self.sample_rate = self.metadata["sample_rate"]
+        self.frame_length = self.metadata["frame_length"]
+        self.capacity = self.metadata["capacity"]
+        self.wake_labels = self.metadata.get("wake_labels", [])
+
+        audio = _open_ring(
+            os.path.join(directory, "audio.ring"), AUDIO_MAGIC,
+            HEADER_SIZE + self.capacity * (8 + self.frame_length * 2), (), create=None
+        )
+        self.frames_written = int(audio[8:16].view("<u8")[0])
+        times_end = HEADER_SIZE + self.capacity * 8
+        self._times = audio[HEADER_SIZE:times_end].view("<f8")
+        self._samples = audio[times_end:].view("<i2").reshape(self.capacity, self.frame_length)
+
+        event_capacity = self.metadata["event_capacity"]
+        events = _open_ring(
+            os.path.join(directory, "events.ring"), EVENTS_MAGIC,
+            HEADER_SIZE + event_capacity * EVENT_DTYPE.itemsize, (), create=None
+        )
+        written = int(events[8:16].view("<u8")[0])
+        records = events[HEADER_SIZE:].view(EVENT_DTYPE)
+        order = np.arange(max(0, written - event_capacity), written) % event_capacity
+        self.events = records[order]
+
+    @property
+    def first_frame(self) -> int:
+        """Oldest frame still in the ring."""
+        return max(0, self.frames_written - self.capacity)
+
+    def frames(self, start: int, end: int) -> np.ndarray:
+        """Samples of frames ``start`` up to ``end`` (clamped to what is still recorded)."""
+        start = max(start, self.first_frame)
+        end = min(end, self.frames_written)
+        if end <= start:
+            return np.zeros(0, dtype=np.int16)
+        return self._samples[np.arange(start, end) % self.capacity].reshape(-1)
+
+    def frame_time(self, frame: int) -> float:
+        return float(self._times[frame % self.capacity])
+
+    def around(self, frame: int, before: float, after: float) -> np.ndarray:
+        """Audio from ``before`` seconds ahead of ``frame`` to ``after`` seconds past it."""
+        frame_duration = self.frame_length / self.sample_rate
+        return self.frames(frame - int(before / frame_duration), frame + 1 + int(after / frame_duration))
+
+    def describe(self, record) -> str:
+        kind = int(record["kind"])
+        name = EVENT_KINDS.get(kind, f"kind {kind}")
+        arg, value = int(record["arg"]), float(record["value"])
+        if kind == EVENT_WAKE:
+            label = self.wake_labels[arg] if 0 <= arg < len(self.wake_labels) else arg
+            return f"{name} {label}"
+        if kind == EVENT_CLAP_AMPLITUDE:
+            return f"{name} {value:.0f}"
+        if kind == EVENT_CLAP:
+            return f"{name} x{arg}"
+        if kind == EVENT_STATE:
+            return f"{STATES.get(arg, arg)} {'on' if value else 'off'}"
+        return f"{name} arg={arg} value={value}"
+
+
+def write_wav(path, samples: np.ndarray, sample_rate: int) -> str:
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(np.ascontiguousarray(samples, dtype="<i2").tobytes())
+    return str(path)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="List flight recorder events or cut a WAV from the audio ring")
+    parser.add_argument("directory", help="FLIGHT_RECORDER_DIR of the recording")
+    parser.add_argument("--event", type=int, help="Index (from the listing) of the event to cut around")
+    parser.add_argument("--last", type=float, help="Cut the last SECONDS of audio instead")
+    parser.add_argument("--before", type=float, default=3.0, help="Seconds before the event (default: 3)")
+    parser.add_argument("--after", type=float, default=3.0, help="Seconds after the event (default: 3)")
+    parser.add_argument("--export", help="WAV file to write")
+    parser.add_argument("--amplitudes", action="store_true", help="Also list per-frame clap amplitudes")
+    args = parser.parse_args(argv)
+
+    recording = FlightRecording(args.directory)
+    frame_duration = recording.frame_length / recording.sample_rate
+
+    if args.export:
+        if args.event is not None:
+            record = recording.events[args.event]
+            samples = recording.around(int(record["frame"]), args.before, args.after)
+        elif args.last:
+            samples = recording.frames(recording.frames_written - int(args.last / frame_duration), recording.frames_written)
+        else:
+            parser.error("--export needs --event or --last")
+        if not samples.size:
+            parser.error("That audio is no longer in the ring")
+        write_wav(args.export, samples, recording.sample_rate)
+        print(f"Wrote {samples.size / recording.sample_rate:.1f}s to {args.export}")
+        return
+
+    oldest = recording.first_frame
+    print(
+        f"{recording.frames_written - oldest} frames "
+        f"({(recording.frames_written - oldest) * frame_duration:.0f}s) of audio, {len(recording.events)} events"
+    )
+    for index, record in enumerate(recording.events):
+        if int(record["kind"]) == EVENT_CLAP_AMPLITUDE and not args.amplitudes:
+            continue
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(float(record["time"])))
+        in_ring = "" if int(record["frame"]) >= oldest else "  (audio overwritten)"
+        print(f"{index:6d}  {stamp}  frame {int(record['frame']):9d}  {recording.describe(record)}{in_ring}")
+
+
+if __name__ == "__main__":
+    main()
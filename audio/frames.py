@@ -0,0 +1,133 @@
+import threading
+import numpy as np
+
+
+class FramePool:
+    """Fixed ring of reusable int16 frame buffers.
+
+    Buffers are allocated once up front and handed out round-robin, so a
+    frame returned by ``next()`` stays valid until ``size`` more frames have
+    been requested. Consumers that need to keep a frame longer must copy it.
+    """
+
+    def __init__(self, frame_length, size=4):
+        if frame_length <= 0:
+            raise ValueError(f"frame_length must be positive, got {frame_length}")
+        if size <= 0:
+            raise ValueError(f"size must be positive, got {size}")
+
+        self.frame_length = frame_length
+        self.size = size
+        self.allocations = 0
+        self.frames = 0
+        self._buffers = [self._allocate() for _ in range(size)]
+        self._index = 0
+
+    def _allocate(self):
+        self.allocations += 1
+        return np.zeros(self.frame_length, dtype=np.int16)
+
+    def next(self):
+        """Return the next reusable buffer in the ring."""
+        buffer = self._buffers[self._index]
+        self._index = (self._index + 1) % self.size
+        self.frames += 1
+        return buffer
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "allocations": self.allocations,
+        }
+
+
+def frame_peak(pcm):
+    """Peak absolute amplitude of an int16 frame without temporary arrays.
+
+    Works on ndarrays and anything exposing the buffer protocol
+    (memoryviews, ``array.array``). ``np.abs`` is avoided because it both
+    allocates and wraps -32768 back to -32768.
+    """
+    audio = np.asarray(pcm, dtype=np.int16)
+    return max(int(audio.max()), -int(audio.min()))
+
+
+class FrameQueue:
+    """Bounded single-producer/single-consumer queue of int16 frames.
+
+    The producer (the PortAudio callback) copies each frame into a
+    preallocated slot and advances ``head``; the consumer copies the oldest
+    slot out and advances ``tail``. Each index is written by one side only,
+    so no lock is taken and the producer never blocks. When the queue is
+    full the incoming frame is dropped and counted rather than overwriting
+    audio the consumer has not seen yet.
+
+    Each frame may carry a timestamp (``put(frame, timestamp)``); the one of
+    the frame last returned by ``get_into`` is ``last_timestamp``. ``close``
+    wakes a waiting consumer once the producer has nothing more to send.
+    """
+
+    def __init__(self, frame_length, capacity=32):
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+
+        self.capacity = capacity
+        self._slots = np.zeros((capacity, frame_length), dtype=np.int16)
+        self._times = np.zeros(capacity)
+        self._head = 0
+        self._tail = 0
+        self._ready = threading.Event()
+        self.closed = False
+        self.last_timestamp = 0.0
+
+        self.pushed = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self):
+        return self._head - self._tail
+
+    def put(self, frame, timestamp=0.0):
+        """Copy ``frame`` into the queue; return False if it had to be dropped."""
+        depth = self._head - self._tail
+        if depth >= self.capacity:
+            self.dropped += 1
+            return False
+
+        np.copyto(self._slots[self._head % self.capacity], frame)
+        self._times[self._head % self.capacity] = timestamp
+        self._head += 1
+        self.pushed += 1
+        if depth + 1 > self.max_depth:
+            self.max_depth = depth + 1
+        self._ready.set()
+        return True
+
+    def get_into(self, out, timeout=None):
+        """Copy the oldest frame into ``out``; return False on timeout or once closed and empty."""
+        while self._head == self._tail:
+            if self.closed:
+                return False
+            self._ready.clear()
+            if self._head != self._tail or self.closed:
+                continue
+            if not self._ready.wait(timeout):
+                return False
+
+        np.copyto(out, self._slots[self._tail % self.capacity])
+        self.last_timestamp = self._times[self._tail % self.capacity]
+        self._tail += 1
+        return True
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+    def stats(self):
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "pushed": self.pushed,
+            "dropped": self.dropped,
+        }
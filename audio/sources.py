@@ -0,0 +1,228 @@
+"""Audio sources the controller can run from.
+
+``AudioStream`` (live microphone) is one implementation; the others replay
+recorded or generated audio so the whole wake/clap pipeline can run on a
+headless box with no sound card, at realtime, N x realtime or as fast as
+possible.
+"""
+import struct
+import time
+from pathlib import Path
+
+import numpy as np
+
+from audio.frames import FramePool
+
+
+class AudioSource:
+    """Common interface: ``start``, ``read``, ``stop`` and a source clock.
+
+    ``read`` returns one pooled int16 frame and raises ``EOFError`` once a
+    finite source is exhausted. ``now`` is the timestamp of the most recent
+    frame; live sources use wall-clock time, replayed sources use stream time
+    so detection timing does not depend on replay speed.
+    """
+
+    def __init__(self, sample_rate, frame_length, pool_size=4):
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.pool = FramePool(frame_length, pool_size)
+
+    def start(self):
+        pass
+
+    def read(self):
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+    def now(self):
+        return time.time()
+
+    def stats(self):
+        return self.pool.stats()
+
+
+class ArrayAudioSource(AudioSource):
+    """Replays an in-memory (or memory-mapped) int16 array frame by frame.
+
+    Args:
+        samples: 1-D int16 samples
+        sample_rate: Sample rate of ``samples``
+        frame_length: Samples per frame
+        speed: Replay speed relative to realtime; ``0`` or ``None`` replays
+            as fast as possible
+        start_time: Timestamp of the first frame on the source clock
+    """
+
+    def __init__(self, samples, sample_rate, frame_length, speed=1.0, start_time=None):
+        super().__init__(sample_rate, frame_length)
+        self.samples = samples
+        self.speed = speed
+        self.frame_duration = frame_length / sample_rate
+        self.total_frames = len(samples) // frame_length
+        self.position = 0
+        self.start_time = time.time() if start_time is None else start_time
+        self._wall_start = None
+
+    def start(self):
+        self.position = 0
+        self._wall_start = time.perf_counter()
+
+    def read(self):
+        if self.position >= self.total_frames:
+            raise EOFError("Audio source exhausted")
+
+        if self.speed:
+            if self._wall_start is None:
+                self._wall_start = time.perf_counter()
+            due = self._wall_start + self.position * self.frame_duration / self.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        offset = self.position * self.frame_length
+        frame = self.pool.next()
+        np.copyto(frame, self.samples[offset:offset + self.frame_length])
+        self.position += 1
+        return frame
+
+    def now(self):
+        return self.start_time + self.position * self.frame_duration
+
+
+def _wav_layout(path):
+    """Return ``(data_offset, data_size, sample_rate)`` for a mono 16-bit PCM WAV."""
+    with open(path, "rb") as f:
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"{path}: not a RIFF/WAVE file")
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path}: no data chunk")
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", f.read(16))
+                f.seek(chunk_size - 16 + (chunk_size & 1), 1)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError(f"{path}: data chunk before fmt chunk")
+                audio_format, channels, sample_rate, _, _, bits = fmt
+                if audio_format != 1 or channels != 1 or bits != 16:
+                    raise ValueError(f"{path}: expected mono 16-bit PCM WAV")
+                return f.tell(), chunk_size, sample_rate
+            else:
+                f.seek(chunk_size + (chunk_size & 1), 1)
+
+
+def load_pcm(path, sample_rate=None):
+    """Memory-map a WAV or raw PCM file as ``(samples, sample_rate)``.
+
+    WAV files must be mono 16-bit PCM. Raw files (any other extension) are
+    read as little-endian int16 and need ``sample_rate``. Nothing is read
+    into memory up front, so day-long recordings are fine.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".wav":
+        offset, size, file_rate = _wav_layout(path)
+        size = min(size, path.stat().st_size - offset)
+        samples = np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(size // 2,))
+        return samples, file_rate
+
+    if not sample_rate:
+        raise ValueError(f"{path}: sample_rate is required for raw PCM files")
+    return np.memmap(path, dtype="<i2", mode="r"), sample_rate
+
+
+class FileAudioSource(ArrayAudioSource):
+    """Replays a WAV or raw 16-bit PCM file."""
+
+    def __init__(self, path, sample_rate, frame_length, speed=1.0, start_time=None):
+        samples, file_rate = load_pcm(path, sample_rate)
+        if file_rate != sample_rate:
+            raise ValueError(
+                f"{path}: sample rate {file_rate} Hz does not match the detector's {sample_rate} Hz"
+            )
+        super().__init__(samples, sample_rate, frame_length, speed, start_time)
+        self.path = str(path)
+
+
+def silence(seconds, sample_rate):
+    return np.zeros(int(seconds * sample_rate), dtype=np.int16)
+
+
+def noise(seconds, sample_rate, level=300, rng=None):
+    rng = rng or np.random.default_rng()
+    samples = rng.normal(0, level, int(seconds * sample_rate))
+    return np.clip(samples, -32768, 32767).astype(np.int16)
+
+
+def tone(seconds, sample_rate, frequency=1000, amplitude=3000):
+    """A steady sine, e.g. a marker for a stand-in wake word engine to fire on."""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return np.rint(np.sin(2 * np.pi * frequency * t) * amplitude).astype(np.int16)
+
+
+def clap(sample_rate, amplitude=12000, decay=0.02, rng=None):
+    """A clap-like impulse: broadband noise burst with an exponential decay."""
+    rng = rng or np.random.default_rng()
+    n = int(decay * 5 * sample_rate)
+    envelope = np.exp(-np.arange(n) / (decay * sample_rate))
+    burst = rng.uniform(-1, 1, n) * envelope * amplitude
+    return np.clip(burst, -32768, 32767).astype(np.int16)
+
+
+class SyntheticAudioSource(ArrayAudioSource):
+    """Generated audio from a compact script.
+
+    The script is a comma-separated list of segments:
+    ``silence:SECONDS``, ``noise:SECONDS[:LEVEL]``, ``clap[:AMPLITUDE]`` and
+    ``tone:SECONDS[:FREQUENCY[:AMPLITUDE]]``,
+    e.g. ``"silence:1,clap,silence:0.3,clap,noise:2:300"``.
+    """
+
+    def __init__(self, script, sample_rate, frame_length, speed=0, start_time=None, seed=0):
+        samples = self.render(script, sample_rate, seed)
+        super().__init__(samples, sample_rate, frame_length, speed, start_time)
+        self.script = script
+
+    @staticmethod
+    def render(script, sample_rate, seed=0):
+        rng = np.random.default_rng(seed)
+        segments = []
+
+        for item in script.split(","):
+            kind, *args = item.strip().split(":")
+            values = [float(a) for a in args]
+
+            if kind == "silence":
+                segments.append(silence(values[0], sample_rate))
+            elif kind == "noise":
+                segments.append(noise(values[0], sample_rate, *values[1:2], rng=rng))
+            elif kind == "clap":
+                segments.append(clap(sample_rate, *values[:1], rng=rng))
+            elif kind == "tone":
+                segments.append(tone(values[0], sample_rate, *values[1:3]))
+            else:
+                raise ValueError(f"Unknown synthetic segment: {kind!r}")
+
+        if not segments:
+            return np.zeros(0, dtype=np.int16)
+        return np.concatenate(segments)
+
+
+def open_source(spec, sample_rate, frame_length, speed=1.0, start_time=None):
+    """Build a replay source from a command-line spec.
+
+    ``synthetic:<script>`` builds a ``SyntheticAudioSource``; anything else
+    is treated as a WAV/raw file path. Sources replayed side by side (one per
+    capture worker) should share ``start_time`` so their clocks line up.
+    """
+    if spec.startswith("synthetic:"):
+        return SyntheticAudioSource(spec[len("synthetic:"):], sample_rate, frame_length, speed, start_time)
+    return FileAudioSource(spec, sample_rate, frame_length, speed, start_time)
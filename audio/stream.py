@@ -1,23 +1,81 @@
+import logging
+import time
 import sounddevice as sd
+from audio.frames import FrameQueue
+from audio.sources import AudioSource
 
-class AudioStream:
-    def __init__(self, sample_rate, frame_length):
-        self.sample_rate = sample_rate
-        self.frame_length = frame_length
+logger = logging.getLogger(__name__)
+
+class AudioStream(AudioSource):
+    """Live microphone source backed by ``sounddevice.InputStream``.
+
+    Capture runs in the PortAudio callback, which only copies each block
+    into a bounded ``FrameQueue``. The processing loop consumes frames with
+    ``read()``, so a slow iteration delays processing instead of losing
+    input, and anything that is lost (queue full, PortAudio input overflow)
+    is counted. ``device`` selects the input device by index or (partial)
+    name, as accepted by sounddevice; None uses the system default.
+    """
+
+    def __init__(self, sample_rate, frame_length, pool_size=4, queue_frames=32, read_timeout=1.0, device=None):
+        super().__init__(sample_rate, frame_length, pool_size)
+        self.device = device
         self.stream = None
+        self.queue = FrameQueue(frame_length, queue_frames)
+        self.read_timeout = read_timeout
+        self.input_overflows = 0
+        self._reported_losses = 0
+        self._last_loss_report = 0.0
+
+    def _callback(self, indata, frames, time_info, status):
+        # Runs on the PortAudio thread: no logging, no allocation, never block
+        if status.input_overflow:
+            self.input_overflows += 1
+        self.queue.put(indata[:, 0])
 
     def start(self):
         self.stream = sd.InputStream(
             samplerate=self.sample_rate,
+            device=self.device,
             channels=1,
             dtype="int16",
-            blocksize=self.frame_length
+            blocksize=self.frame_length,
+            callback=self._callback
         )
         self.stream.start()
 
     def read(self):
-        audio_data, _ = self.stream.read(self.frame_length)
-        return audio_data.flatten().tolist()
+        """Return the next captured frame in a pooled int16 buffer.
+
+        The returned array is reused by later reads (see ``FramePool``), so
+        detectors must consume it before the pool wraps around. Returns None
+        if no frame arrives within ``read_timeout`` seconds.
+        """
+        frame = self.pool.next()
+        if not self.queue.get_into(frame, self.read_timeout):
+            return None
+        self._report_losses()
+        return frame
+
+    def _report_losses(self):
+        losses = self.queue.dropped + self.input_overflows
+        if losses == self._reported_losses:
+            return
+        now = time.monotonic()
+        if now - self._last_loss_report < 5.0:
+            return
+        logger.warning(
+            f"Audio input lost: {self.queue.dropped} frames dropped (queue full), "
+            f"{self.input_overflows} PortAudio input overflows"
+        )
+        self._reported_losses = losses
+        self._last_loss_report = now
+
+    def stats(self):
+        stats = super().stats()
+        stats.update(self.queue.stats())
+        stats["input_overflows"] = self.input_overflows
+        return stats
 
     def stop(self):
         if self.stream:
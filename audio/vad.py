@@ -0,0 +1,45 @@
+import numpy as np
+
+
+class EnergyVAD:
+    """Cheap energy + zero-crossing voice activity detector.
+
+    A frame counts as speech when its RMS clears the larger of a fixed
+    threshold and a multiple of the tracked noise floor. Quieter frames with
+    a high zero-crossing rate (fricatives like "s" and "f") also count, at
+    half the level. The noise floor only adapts on non-speech frames.
+    """
+
+    def __init__(self, energy_threshold, zcr_threshold=0.25, noise_ratio=3.0, floor_alpha=0.05):
+        self.energy_threshold = energy_threshold
+        self.zcr_threshold = zcr_threshold
+        self.noise_ratio = noise_ratio
+        self.floor_alpha = floor_alpha
+        self.noise_floor = energy_threshold / noise_ratio
+
+    @staticmethod
+    def rms(frame):
+        audio = np.asarray(frame, dtype=np.int16)
+        if audio.size == 0:
+            return 0.0
+        energy = np.einsum("i,i->", audio, audio, dtype=np.int64)
+        return float(np.sqrt(energy / audio.size))
+
+    @staticmethod
+    def zero_crossing_rate(frame):
+        audio = np.asarray(frame, dtype=np.int16)
+        if audio.size < 2:
+            return 0.0
+        return np.count_nonzero(np.signbit(audio[1:]) != np.signbit(audio[:-1])) / (audio.size - 1)
+
+    def is_speech(self, frame):
+        rms = self.rms(frame)
+        level = max(self.energy_threshold, self.noise_floor * self.noise_ratio)
+
+        speech = rms > level or (
+            rms > level * 0.5 and self.zero_crossing_rate(frame) > self.zcr_threshold
+        )
+
+        if not speech:
+            self.noise_floor += self.floor_alpha * (rms - self.noise_floor)
+        return speech
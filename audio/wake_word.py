@@ -1,21 +1,115 @@
-import pvporcupine
-from config import PORCUPINE_ACCESS_KEY
 import os
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Union
+
+# What the controller does when a wake word fires
+WAKE_ACTIONS = ("command", "cancel", "launch")
+DEFAULT_SENSITIVITY = 0.5
+
+
+@dataclass(frozen=True)
+class WakeWord:
+    """A built-in Porcupine keyword or a custom ``.ppn`` file, its sensitivity and bound action."""
+
+    keyword: str
+    action: str = "command"
+    sensitivity: float = DEFAULT_SENSITIVITY
+
+    @property
+    def label(self) -> str:
+        """Short display name, e.g. ``Hey arc`` for ``/path/Hey arc.ppn``."""
+        name = os.path.basename(self.keyword)
+        return name[:-4] if name.endswith(".ppn") else name
+
+
+def parse_wake_words(spec: str) -> List[WakeWord]:
+    """
+    Parse a ``WAKE_WORDS`` value.
+
+    Comma-separated entries of ``keyword_or_path[:action][:sensitivity]``,
+    e.g. ``Hey arc.ppn:command:0.6, jarvis:cancel, Arc launch.ppn:launch``.
+    Paths may themselves contain colons (``C:\\...``); only a trailing
+    action and/or number are split off.
+    """
+    wake_words = []
+    for entry in spec.split(","):
+        parts = entry.strip().split(":")
+        if not parts[0] and len(parts) == 1:
+            continue
+
+        sensitivity = DEFAULT_SENSITIVITY
+        action = "command"
+        if len(parts) > 1:
+            try:
+                sensitivity = float(parts[-1])
+                parts.pop()
+            except ValueError:
+                pass
+        if len(parts) > 1 and parts[-1].strip().lower() in WAKE_ACTIONS:
+            action = parts.pop().strip().lower()
+
+        keyword = ":".join(parts).strip()
+        if not keyword:
+            raise ValueError(f"Wake word entry {entry.strip()!r} has no keyword or path")
+        if not 0.0 <= sensitivity <= 1.0:
+            raise ValueError(f"Wake word sensitivity must be between 0 and 1, got {sensitivity} for {keyword}")
+        wake_words.append(WakeWord(keyword, action, sensitivity))
+    return wake_words
+
+
+def _resolve_keyword_path(keyword: str, keyword_paths) -> str:
+    """Path of a custom ``.ppn`` file, or of the built-in keyword's model file."""
+    if keyword.endswith('.ppn'):
+        if not os.path.isfile(keyword):
+            raise FileNotFoundError(f"Wake word file not found: {keyword}")
+        return keyword
+    path = keyword_paths.get(keyword.lower())
+    if path is None:
+        raise ValueError(
+            f"Unknown built-in wake word {keyword!r}. Available: {', '.join(sorted(keyword_paths))}"
+        )
+    return path
+
 
 class WakeWordDetector:
-    def __init__(self, wake_word):
-        # Check if wake_word is a path to a custom .ppn file
-        if wake_word.endswith('.ppn') and os.path.isfile(wake_word):
-            self.porcupine = pvporcupine.create(
-                access_key=PORCUPINE_ACCESS_KEY,
-                keyword_paths=[wake_word]
-            )
-        else:
-            # Use built-in keyword
-            self.porcupine = pvporcupine.create(
-                access_key=PORCUPINE_ACCESS_KEY,
-                keywords=[wake_word]
-            )
+    """
+    One Porcupine instance scoring every configured wake word per frame.
+
+    Args:
+        wake_words: A keyword/path, a list of them, or ``WakeWord`` entries
+        engine: An already-built engine (anything with Porcupine's
+            process/sample_rate/frame_length/delete), e.g. a stand-in for
+            benchmarks; ``process`` returns the index of the keyword that fired
+    """
+
+    def __init__(self, wake_words: Union[str, Sequence[Union[str, WakeWord]], None], engine=None):
+        if isinstance(wake_words, str):
+            wake_words = [wake_words]
+        self.wake_words: List[WakeWord] = [
+            word if isinstance(word, WakeWord) else WakeWord(word)
+            for word in (wake_words or [])
+        ]
+
+        if engine is not None:
+            self.porcupine = engine
+            if not self.wake_words:
+                self.wake_words = [WakeWord("wake word")]
+            return
+
+        if not self.wake_words:
+            raise ValueError("At least one wake word is required")
+
+        # Imported here: the engine library is slow to load and not needed when injected
+        import pvporcupine
+        from config import PORCUPINE_ACCESS_KEY
+
+        # Built-in keywords are passed by model path too, so custom and
+        # built-in wake words can be mixed in a single engine
+        self.porcupine = pvporcupine.create(
+            access_key=PORCUPINE_ACCESS_KEY,
+            keyword_paths=[_resolve_keyword_path(word.keyword, pvporcupine.KEYWORD_PATHS) for word in self.wake_words],
+            sensitivities=[word.sensitivity for word in self.wake_words]
+        )
 
     @property
     def sample_rate(self):
@@ -25,8 +119,11 @@ class WakeWordDetector:
     def frame_length(self):
         return self.porcupine.frame_length
 
-    def detect(self, pcm):
-        return self.porcupine.process(pcm) >= 0
+    def detect(self, pcm) -> Optional[WakeWord]:
+        """Return the wake word that fired in this frame, or None."""
+        # pcm is the pooled int16 buffer from AudioStream; pass it through as-is.
+        index = self.porcupine.process(pcm)
+        return self.wake_words[index] if index >= 0 else None
 
     def cleanup(self):
         self.porcupine.delete()
@@ -0,0 +1,466 @@
+"""Per-frame detection latency benchmarks.
+
+At Porcupine's 512 samples / 16 kHz every iteration of
+``UnifiedController.run`` has 32 ms before the input stream overflows. This
+suite drives ``ClapDetector.detect``, ``WakeWordDetector.detect`` and the
+full controller loop over canned audio and reports throughput, p50/p99/max
+per-frame latency and how many frames missed the realtime deadline.
+
+The ``controller_allocations`` case runs the controller loop again under
+``tracemalloc``, with a wake engine that allocates nothing, so only the
+loop's own work is measured. Per loop iteration it reports the peak memory
+allocated above what was live when the iteration started, and how many
+iterations allocated anything the size of a frame (a copy or a
+fancy-indexing result). The small allocations that remain come from
+Python objects (counters, iterators). ``per_call_peak_bytes`` assigns them
+to the loop's calls, each measured on its own. ``retained_by_line`` lists
+the repo lines still holding memory when the loop ends.
+
+The ``energy_gate`` case runs the wake word and clap detectors over the
+same frames with and without the idle-mode ``EnergyGate`` and reports the
+CPU time saved and the wake word and clap detections with and without it.
+By default it uses its own corpus: a quiet room with a marker "wake word"
+(a soft then loud 1 kHz tone) and a double clap every half minute.
+
+Without ``PORCUPINE_ACCESS_KEY`` the wake word benchmark runs against a
+local stand-in engine, so numbers from machines with and without a key are
+not comparable for that case (the JSON records which engine was used). The
+stand-in fires on the 1 kHz marker, so gated and ungated detection counts
+can be compared; Porcupine is used for the gate only with ``--source``.
+
+Usage:
+    python -m benchmarks.frame_latency
+    python -m benchmarks.frame_latency --source recording.wav --output results.json
+    python -m benchmarks.frame_latency --compare old.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from audio.sources import AudioSource, SyntheticAudioSource, open_source  # noqa: E402
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 512
+DEFAULT_SCRIPT = ",".join(
+    ["noise:2:200", "clap", "silence:0.3", "clap", "silence:1", "noise:5:800"] * 6
+)
+# Mostly room tone. The marker's soft first half stays under the gate, so it
+# is only heard in full if the gate replays its look-back.
+GATE_SCRIPT = ",".join(
+    [
+        "noise:20:40", "tone:0.35:1000:150", "tone:0.35:1000:3000", "noise:5:40",
+        "clap", "noise:0.3:40", "clap", "noise:5:40",
+    ] * 4
+)
+MARKER_FREQUENCY = 1000
+
+
+class StandInWakeEngine:
+    """Porcupine-shaped engine that does a comparable amount of NumPy work.
+
+    Computes a windowed power spectrum per frame. It fires (keyword 0) once
+    the ``MARKER_FREQUENCY`` tone has dominated ``hold`` consecutive frames
+    it was given, standing in for a wake word of about half a second.
+    """
+
+    sample_rate = SAMPLE_RATE
+    frame_length = FRAME_LENGTH
+
+    def __init__(self, hold=16):
+        self._window = np.hanning(FRAME_LENGTH).astype(np.float32)
+        centre = int(round(MARKER_FREQUENCY * FRAME_LENGTH / SAMPLE_RATE))
+        self._marker = slice(centre - 1, centre + 2)
+        self.hold = hold
+        self._run = 0
+
+    def process(self, pcm):
+        power = np.abs(np.fft.rfft(np.asarray(pcm, dtype=np.float32) * self._window)) ** 2
+        total = power.sum()
+        if total > 0 and power[self._marker].sum() > 0.6 * total:
+            self._run += 1
+            if self._run == self.hold:
+                return 0
+        else:
+            self._run = 0
+        return -1
+
+    def delete(self):
+        pass
+
+
+class NullWakeEngine:
+    """Porcupine-shaped engine that never fires and allocates nothing."""
+
+    sample_rate = SAMPLE_RATE
+    frame_length = FRAME_LENGTH
+
+    def process(self, pcm):
+        return -1
+
+    def delete(self):
+        pass
+
+
+class TimedSource(AudioSource):
+    """Wraps a source and times the work done between consecutive reads."""
+
+    def __init__(self, inner):
+        super().__init__(inner.sample_rate, inner.frame_length)
+        self.inner = inner
+        self.latencies = []
+        self._returned = None
+
+    def start(self):
+        self.inner.start()
+
+    def read(self):
+        called = time.perf_counter()
+        if self._returned is not None:
+            self.latencies.append(called - self._returned)
+        frame = self.inner.read()
+        self._returned = time.perf_counter()
+        return frame
+
+    def stop(self):
+        self.inner.stop()
+
+    def now(self):
+        return self.inner.now()
+
+
+class AllocationSource(AudioSource):
+    """Wraps a source and records the traced memory peak of the work between reads.
+
+    Requires ``tracemalloc`` to be tracing. The source's own read is
+    excluded: the peak is reset after each read returns.
+    """
+
+    def __init__(self, inner):
+        super().__init__(inner.sample_rate, inner.frame_length)
+        self.inner = inner
+        self.peaks = []
+        self._baseline = None
+
+    def start(self):
+        self.inner.start()
+
+    def read(self):
+        if self._baseline is not None:
+            _, peak = tracemalloc.get_traced_memory()
+            self.peaks.append(max(0, peak - self._baseline))
+        frame = self.inner.read()
+        tracemalloc.reset_peak()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        return frame
+
+    def stop(self):
+        self.inner.stop()
+
+    def now(self):
+        return self.inner.now()
+
+
+def summarize(latencies, frame_length=FRAME_LENGTH, sample_rate=SAMPLE_RATE):
+    deadline = frame_length / sample_rate
+    values = np.asarray(latencies, dtype=np.float64)
+    if values.size == 0:
+        return {"frames": 0}
+    total = values.sum()
+    return {
+        "frames": int(values.size),
+        "frames_per_sec": round(values.size / total, 1) if total > 0 else None,
+        "p50_ms": round(float(np.percentile(values, 50)) * 1000, 4),
+        "p99_ms": round(float(np.percentile(values, 99)) * 1000, 4),
+        "max_ms": round(float(values.max()) * 1000, 4),
+        "deadline_ms": round(deadline * 1000, 3),
+        "deadline_misses": int(np.count_nonzero(values > deadline)),
+    }
+
+
+def _frames(source):
+    source.start()
+    frames = []
+    try:
+        while True:
+            frames.append(source.read().copy())
+    except EOFError:
+        pass
+    return frames
+
+
+def bench_clap_detector(frames, threshold, interval):
+    from audio.clap_detector import ClapDetector
+
+    detector = ClapDetector(threshold, interval)
+    latencies = []
+    now = 0.0
+    for frame in frames:
+        start = time.perf_counter()
+        detector.detect(frame, now)
+        latencies.append(time.perf_counter() - start)
+        now += FRAME_LENGTH / SAMPLE_RATE
+    return summarize(latencies)
+
+
+def _wake_detector(stand_in=False):
+    from audio.wake_word import WakeWordDetector
+
+    if not stand_in and os.getenv("PORCUPINE_ACCESS_KEY") and not os.getenv("BENCH_STAND_IN"):
+        from config import DEFAULT_WAKE_WORD
+        return WakeWordDetector(DEFAULT_WAKE_WORD), "porcupine"
+    return WakeWordDetector(None, engine=StandInWakeEngine()), "stand-in"
+
+
+def bench_wake_word(frames):
+    detector, engine = _wake_detector()
+    latencies = []
+    try:
+        for frame in frames:
+            start = time.perf_counter()
+            detector.detect(frame)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        detector.cleanup()
+    result = summarize(latencies)
+    result["engine"] = engine
+    return result
+
+
+def _run_detectors(frames, threshold, interval, gate=None, stand_in=False):
+    """CPU seconds, wake detections and clap decisions for one pass over ``frames``."""
+    from audio.clap_detector import ClapDetector
+
+    detector, engine = _wake_detector(stand_in)
+    clap_detector = ClapDetector(threshold, interval)
+    frame_duration = FRAME_LENGTH / SAMPLE_RATE
+    wakes = claps = 0
+    cpu_started = time.process_time()
+    try:
+        for position, pcm in enumerate(frames):
+            admitted = gate.admit(pcm) if gate is not None else (pcm,)
+            now = position * frame_duration
+            for index, frame in enumerate(admitted):
+                if detector.detect(frame):
+                    wakes += 1
+                if clap_detector.detect(frame, now - (len(admitted) - 1 - index) * frame_duration):
+                    claps += 1
+    finally:
+        detector.cleanup()
+    return time.process_time() - cpu_started, wakes, claps, engine
+
+
+def bench_energy_gate(frames, threshold, interval, ratio=2.0, min_level=150.0, stand_in=False):
+    """Gated vs ungated CPU time and detections over ``frames``."""
+    from audio.energy_gate import EnergyGate
+
+    ungated_cpu, ungated_wakes, ungated_claps, engine = _run_detectors(
+        frames, threshold, interval, stand_in=stand_in
+    )
+    gate = EnergyGate(SAMPLE_RATE, FRAME_LENGTH, ratio=ratio, min_level=min_level)
+    gated_cpu, gated_wakes, gated_claps, _ = _run_detectors(frames, threshold, interval, gate, stand_in)
+    return {
+        "frames": len(frames),
+        "engine": engine,
+        "cpu_ms_ungated": round(ungated_cpu * 1000, 2),
+        "cpu_ms_gated": round(gated_cpu * 1000, 2),
+        "cpu_saved_pct": round((1 - gated_cpu / ungated_cpu) * 100, 1) if ungated_cpu else None,
+        "wake_detections": {"ungated": ungated_wakes, "gated": gated_wakes},
+        "clap_decisions": {"ungated": ungated_claps, "gated": gated_claps},
+        "gate": gate.stats(),
+    }
+
+
+def bench_controller(source_factory, threshold, interval):
+    from audio.clap_detector import ClapDetector
+    from launcher.controller import UnifiedController
+
+    detector, engine = _wake_detector()
+    source = TimedSource(source_factory())
+    controller = UnifiedController(detector, ClapDetector(threshold, interval), source)
+    try:
+        controller.run()
+    finally:
+        detector.cleanup()
+    result = summarize(source.latencies)
+    result["engine"] = engine
+    return result
+
+
+def _call_peak(fn, repeat=200):
+    """Largest traced peak of one ``fn()`` call, less the cost of measuring."""
+    def peak(call):
+        for _ in range(20):
+            call()
+        largest = 0
+        for _ in range(repeat):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            call()
+            largest = max(largest, tracemalloc.get_traced_memory()[1] - baseline)
+        return largest
+
+    return max(0, peak(fn) - peak(lambda: None))
+
+
+def _iterate(iterator):
+    for _ in iterator:
+        pass
+
+
+def _loop_call_peaks(controller, pcm):
+    """Peak bytes of each call the controller loop makes per frame, measured one at a time."""
+    from launcher.controller import FRAME_SECONDS
+
+    calls = {
+        "command_capture.push": lambda: controller.command_capture.push(pcm),
+        "wake_detector.detect": lambda: controller.wake_detector.detect(pcm),
+        "clap_detector.detect": lambda: controller.clap_detector.detect(pcm, 0.0),
+        "FRAME_SECONDS.observe": lambda: FRAME_SECONDS.observe(0.001),
+        "enumerate(frames)": lambda: _iterate(enumerate((pcm,))),
+    }
+    if controller.gate is not None:
+        calls["gate.admit"] = lambda: controller.gate.admit(pcm)
+    return {name: _call_peak(fn) for name, fn in calls.items()}
+
+
+def bench_controller_allocations(source_factory, threshold, interval):
+    from audio.clap_detector import ClapDetector
+    from audio.wake_word import WakeWordDetector
+    from launcher.controller import UnifiedController
+
+    detector = WakeWordDetector(None, engine=NullWakeEngine())
+    source = AllocationSource(source_factory())
+    controller = UnifiedController(detector, ClapDetector(threshold, interval), source)
+    repo_files = [tracemalloc.Filter(True, str(ROOT / package / "*")) for package in ("audio", "launcher", "utils")]
+    tracemalloc.start()
+    try:
+        started = tracemalloc.take_snapshot().filter_traces(repo_files)
+        controller.run()
+        retained = tracemalloc.take_snapshot().filter_traces(repo_files).compare_to(started, "lineno")
+        call_peaks = _loop_call_peaks(controller, np.zeros(FRAME_LENGTH, dtype=np.int16))
+    finally:
+        tracemalloc.stop()
+        detector.cleanup()
+    peaks = np.asarray(source.peaks, dtype=np.int64)
+    if peaks.size == 0:
+        return {"frames": 0}
+    retained = [stat for stat in retained if stat.size_diff > 0]
+    return {
+        "frames": int(peaks.size),
+        "engine": "null",
+        "frames_allocating": int(np.count_nonzero(peaks)),
+        "frames_allocating_buffers": int(np.count_nonzero(peaks >= FRAME_LENGTH * 2)),
+        "peak_bytes_p50": int(np.percentile(peaks, 50)),
+        "peak_bytes_p99": int(np.percentile(peaks, 99)),
+        "peak_bytes_max": int(peaks.max()),
+        "per_call_peak_bytes": call_peaks,
+        "retained_bytes": int(sum(stat.size_diff for stat in retained)),
+        "retained_by_line": {
+            f"{Path(stat.traceback[0].filename).relative_to(ROOT)}:{stat.traceback[0].lineno}": stat.size_diff
+            for stat in sorted(retained, key=lambda stat: -stat.size_diff)[:5]
+        },
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(current, previous):
+    """Print p50/p99/deadline-miss deltas against an earlier results file."""
+    for name, result in current["benchmarks"].items():
+        before = previous.get("benchmarks", {}).get(name)
+        if not before or not before.get("frames"):
+            continue
+        print(f"{name}:")
+        for key in (
+            "p50_ms", "p99_ms", "max_ms", "deadline_misses", "cpu_saved_pct",
+            "frames_allocating", "frames_allocating_buffers", "peak_bytes_p99", "retained_bytes",
+        ):
+            old, new = before.get(key), result.get(key)
+            if old is None or new is None:
+                continue
+            change = f" ({(new - old) / old * 100:+.1f}%)" if old else ""
+            print(f"  {key}: {old} -> {new}{change}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame detection latency benchmarks")
+    parser.add_argument("--source", help="WAV/raw file or synthetic:<script> (default: built-in script)")
+    parser.add_argument("--threshold", type=int, default=1800)
+    parser.add_argument("--interval", type=float, default=0.7)
+    parser.add_argument("--output", help="Write results JSON to this path")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument("--skip-controller", action="store_true", help="Only benchmark the detectors")
+    parser.add_argument("--gate-ratio", type=float, default=2.0, help="Energy gate level over the noise floor")
+    parser.add_argument("--gate-min-level", type=float, default=150.0, help="Energy gate minimum RMS")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if not os.getenv("PORCUPINE_ACCESS_KEY"):
+        # config.py insists on a key; the stand-in engine never uses it
+        os.environ["PORCUPINE_ACCESS_KEY"] = "benchmark-stand-in"
+        os.environ["BENCH_STAND_IN"] = "1"
+
+    def source_factory():
+        if args.source:
+            return open_source(args.source, SAMPLE_RATE, FRAME_LENGTH, speed=0)
+        return SyntheticAudioSource(DEFAULT_SCRIPT, SAMPLE_RATE, FRAME_LENGTH, speed=0)
+
+    frames = _frames(source_factory())
+    gate_frames = frames if args.source else _frames(
+        SyntheticAudioSource(GATE_SCRIPT, SAMPLE_RATE, FRAME_LENGTH, speed=0)
+    )
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "source": args.source or f"synthetic:{DEFAULT_SCRIPT}",
+        "gate_source": args.source or f"synthetic:{GATE_SCRIPT}",
+        "benchmarks": {
+            "clap_detector": bench_clap_detector(frames, args.threshold, args.interval),
+            "wake_word": bench_wake_word(frames),
+            "energy_gate": bench_energy_gate(
+                gate_frames, args.threshold, args.interval, args.gate_ratio, args.gate_min_level,
+                stand_in=not args.source
+            ),
+        },
+    }
+    if not args.skip_controller:
+        results["benchmarks"]["controller_loop"] = bench_controller(
+            source_factory, args.threshold, args.interval
+        )
+        results["benchmarks"]["controller_allocations"] = bench_controller_allocations(
+            source_factory, args.threshold, args.interval
+        )
+
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Intent dispatch cost as the intent table grows.
+
+Builds synthetic intent tables of increasing size on top of the defaults
+and times ``IntentRouter.match`` for commands that hit a local intent, hit
+one through a misrecognised word, and miss (i.e. go to the LLM). A naive
+loop of substring checks over every phrase is timed alongside for scale.
+Before timing, the default table is checked against ``EXPECTED`` so a
+change to the matching rules cannot silently send commands elsewhere.
+
+Usage:
+    python -m benchmarks.intent_dispatch
+    python -m benchmarks.intent_dispatch --sizes 10 100 1000 --output intents.json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from launcher.intents import DEFAULT_INTENTS, IntentRouter  # noqa: E402
+
+COMMANDS = {
+    "hit": "can you launch spotify",
+    "fuzzy_hit": "launch spotfy please",
+    "miss": "what is the tallest mountain in south america and how high is it",
+}
+
+# Command -> intent the default table must route it to (None: goes to the LLM)
+EXPECTED = {
+    "the usual": "the_usual",
+    "do the usual": "the_usual",
+    "can you do the usual": "the_usual",
+    "hey arc the usual please": "the_usual",
+    "can you launch spotify": "launch_app",
+    "launch spotfy please": "launch_app",
+    "open my github": "open_github",
+    "how do I open discord on linux": None,
+    "smart music": None,
+    "what is the usual temperature in march": None,
+}
+
+VERBS = ["open", "launch", "start", "show", "play", "turn on", "switch to", "go to"]
+
+
+def synthetic_table(size):
+    """Default intents plus ``size`` generated intents, each with a few phrases."""
+    table = list(DEFAULT_INTENTS)
+    for i in range(size):
+        table.append({
+            "name": f"synthetic_{i}",
+            "phrases": [f"{verb} widget{i} panel" for verb in VERBS[i % 3: i % 3 + 3]],
+            "action": "noop",
+        })
+    return table
+
+
+def check_defaults():
+    """Commands the default table routes differently from ``EXPECTED``, as (command, expected, got)."""
+    router = IntentRouter()
+    mismatches = []
+    for command, expected in EXPECTED.items():
+        match = router.match(command)
+        got = match.name if match else None
+        if got != expected:
+            mismatches.append((command, expected, got))
+    return mismatches
+
+
+def _time_per_call(fn, arg, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def bench(size, repeat):
+    table = synthetic_table(size)
+
+    start = time.perf_counter()
+    router = IntentRouter(table)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    phrases = [p for entry in table for p in entry["phrases"]]
+
+    def naive(text):
+        lowered = text.lower()
+        return next((p for p in phrases if p in lowered), None)
+
+    result = {
+        "intents": len(table),
+        "patterns": len(router.patterns),
+        "compile_ms": round(compile_ms, 3),
+    }
+    for kind, command in COMMANDS.items():
+        result[f"{kind}_us"] = round(_time_per_call(router.match, command, repeat), 2)
+    result["naive_miss_us"] = round(_time_per_call(naive, COMMANDS["miss"], repeat), 2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Intent dispatch micro-benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 10, 100, 500, 1000])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--output", help="Write results JSON to this path")
+    args = parser.parse_args()
+
+    mismatches = check_defaults()
+    if mismatches:
+        for command, expected, got in mismatches:
+            print(f"❌ {command!r}: expected {expected}, got {got}")
+        sys.exit(1)
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commands": COMMANDS,
+        "results": [bench(size, args.repeat) for size in args.sizes],
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
 
+import logging
 import os
+from dataclasses import dataclass, replace
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import Iterable, Optional, Tuple
+from dotenv import find_dotenv, load_dotenv
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -29,6 +34,13 @@ def _get_int_env(var_name: str, default: int) -> int:
     except ValueError:
         raise ValueError(f"Invalid integer value for {var_name}")
 
+def _get_float_env(var_name: str, default: float) -> float:
+    """Get float environment variable with validation."""
+    try:
+        return float(os.getenv(var_name, str(default)))
+    except ValueError:
+        raise ValueError(f"Invalid number value for {var_name}")
+
 # API Keys (Required)
 PORCUPINE_ACCESS_KEY = _get_required_env(
     "PORCUPINE_ACCESS_KEY",
@@ -41,8 +53,13 @@ DEFAULT_WAKE_WORD = _get_optional_env(
     str(Path(__file__).parent / "Hey arc.ppn")
 )
 
+# Several wake words, each bound to an action, scored in one Porcupine pass:
+# comma-separated "keyword_or_path[:action][:sensitivity]", action is command, cancel or launch
+# (e.g. "Hey arc.ppn:command, Arc stop.ppn:cancel:0.6, jarvis:launch"). Overrides WAKE_WORD_PATH.
+WAKE_WORDS = _get_optional_env("WAKE_WORDS", "")
+
 # Validate wake word file exists
-if not Path(DEFAULT_WAKE_WORD).exists():
+if not WAKE_WORDS and not Path(DEFAULT_WAKE_WORD).exists():
     raise FileNotFoundError(
         f"Wake word file not found: {DEFAULT_WAKE_WORD}\n"
         f"Please check WAKE_WORD_PATH in your .env file"
@@ -53,10 +70,159 @@ CLAP_THRESHOLD = _get_int_env("CLAP_THRESHOLD", 1800)
 ACTIVE_DURATION = _get_int_env("ACTIVE_DURATION", 5)
 TRIPLE_WAIT_DURATION = _get_int_env("TRIPLE_WAIT_DURATION", 30)
 CLAP_INTERVAL = float(os.getenv("CLAP_INTERVAL", "0.7"))
+# Frames buffered between the capture callback and the detection loop (32 ≈ 1s)
+AUDIO_QUEUE_FRAMES = _get_int_env("AUDIO_QUEUE_FRAMES", 32)
+# Rate the microphone is opened at; the capture hub resamples for the detectors (0 = the wake word engine's rate)
+AUDIO_DEVICE_RATE = _get_int_env("AUDIO_DEVICE_RATE", 0)
+# Idle mode: skip wake word / clap detection on frames quieter than the noise floor times
+# ENERGY_GATE_RATIO (and ENERGY_GATE_MIN_LEVEL RMS), keeping a look-back of skipped audio
+# to replay when the gate opens and staying open for a hangover after the last loud frame
+ENERGY_GATE = os.getenv("ENERGY_GATE", "false").lower() == "true"
+ENERGY_GATE_RATIO = _get_float_env("ENERGY_GATE_RATIO", 2.0)
+ENERGY_GATE_MIN_LEVEL = _get_float_env("ENERGY_GATE_MIN_LEVEL", 150.0)
+ENERGY_GATE_HANGOVER = _get_float_env("ENERGY_GATE_HANGOVER", 1.0)
+ENERGY_GATE_LOOKBACK = _get_float_env("ENERGY_GATE_LOOKBACK", 0.5)
+# Flight recorder: the last FLIGHT_RECORDER_MINUTES of audio and detector events in memory-mapped
+# ring files in this directory ("" disables); cut WAVs with python -m audio.flight_recorder
+FLIGHT_RECORDER_DIR = _get_optional_env("FLIGHT_RECORDER_DIR", "")
+FLIGHT_RECORDER_MINUTES = _get_float_env("FLIGHT_RECORDER_MINUTES", 5.0)
+# Several microphones, one capture process each: "room=device; room=device" ("" uses the default input only)
+AUDIO_DEVICES = _get_optional_env("AUDIO_DEVICES", "")
+# Detections of the same wake word or clap in several rooms within this many seconds are acted on once
+DEDUP_WINDOW = _get_float_env("DEDUP_WINDOW", 0.75)
+
+# Command Capture Configuration
+# Audio kept from just before the wake word fired, so the first word is not clipped
+COMMAND_PREROLL = _get_float_env("COMMAND_PREROLL", 0.3)
+# Hard cap on how long a single command can be
+COMMAND_MAX_DURATION = _get_float_env("COMMAND_MAX_DURATION", 5.0)
+# Trailing silence that ends the command
+COMMAND_SILENCE_DURATION = _get_float_env("COMMAND_SILENCE_DURATION", 0.8)
+# Give up if no speech starts within this many seconds
+COMMAND_START_TIMEOUT = _get_float_env("COMMAND_START_TIMEOUT", 3.0)
+# RMS level treated as speech by the voice activity detector
+VAD_ENERGY_THRESHOLD = _get_int_env("VAD_ENERGY_THRESHOLD", 500)
+
+# Speech-to-text: google (online), vosk (offline, needs VOSK_MODEL_PATH) or fake (scripted, for tests)
+STT_BACKEND = _get_optional_env("STT_BACKEND", "google")
+
+# Local intents: optional JSON intent table and fuzzy word matching for STT errors
+INTENTS_PATH = _get_optional_env("INTENTS_PATH", "")
+INTENT_FUZZY = os.getenv("INTENT_FUZZY", "true").lower() == "true"
+
+# Text-to-speech: auto (pyttsx3 on Windows, print elsewhere), pyttsx3, print or null
+TTS_BACKEND = _get_optional_env("TTS_BACKEND", "auto")
+TTS_RATE = _get_int_env("TTS_RATE", 175)
+TTS_VOLUME = _get_float_env("TTS_VOLUME", 0.9)
+
+# Seconds between checks of PATH and configured app paths for changes to the launch plan (0 disables)
+LAUNCH_PLAN_POLL_INTERVAL = _get_float_env("LAUNCH_PLAN_POLL_INTERVAL", 5.0)
+
+# Metrics: local Prometheus endpoint (0 disables) and periodic JSON snapshot ("" disables)
+METRICS_PORT = _get_int_env("METRICS_PORT", 0)
+METRICS_SNAPSHOT_PATH = _get_optional_env("METRICS_SNAPSHOT_PATH", "")
+METRICS_SNAPSHOT_INTERVAL = _get_float_env("METRICS_SNAPSHOT_INTERVAL", 30.0)
+
+# Interaction traces (Chrome trace JSON): directory to write them to ("" keeps them in memory only)
+TRACE_DIR = _get_optional_env("TRACE_DIR", "")
+TRACE_HISTORY = _get_int_env("TRACE_HISTORY", 20)
+
+# Startup time budget (ms from launch to "Listening...") checked by --startup-report
+STARTUP_BUDGET_MS = _get_int_env("STARTUP_BUDGET_MS", 1500)
 
 # Debug mode
 DEBUG = os.getenv("DEBUG", "false").lower() == "true"
 
+# Configuration file watched for changes while running (hot reload), and how often its
+# modification time is checked in seconds (0 disables reloading)
+ENV_FILE = _get_optional_env("ENV_FILE", find_dotenv() or str(Path(__file__).parent / ".env"))
+CONFIG_RELOAD_INTERVAL = _get_float_env("CONFIG_RELOAD_INTERVAL", 2.0)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Settings that running components pick up on reload, without a restart."""
+
+    clap_threshold: int
+    clap_interval: float
+    active_duration: float
+    triple_wait_duration: float
+    debug: bool
+    vs_code_path: str
+    spotify_path: Optional[str]
+    discord_path: Optional[str]
+    brave_path: str
+    chrome_url: str
+    github_url: str
+    llm_model: str
+    llm_fallback_models: Tuple[str, ...]
+    llm_timeout: float
+    llm_hedge_delay: float
+    llm_stream: bool
+
+
+# Environment variables behind each Settings field; changes to any other variable need a restart
+RELOADABLE_VARIABLES = (
+    "CLAP_THRESHOLD", "CLAP_INTERVAL", "ACTIVE_DURATION", "TRIPLE_WAIT_DURATION", "DEBUG",
+    "VS_CODE_PATH", "SPOTIFY_PATH", "DISCORD_PATH", "BRAVE_PATH", "CHROME_URL", "GITHUB_URL",
+    "LLM_MODEL", "LLM_FALLBACK_MODELS", "LLM_TIMEOUT", "LLM_HEDGE_DELAY", "LLM_STREAM",
+)
+
+
+def load_settings(changed: Iterable[str] = ()) -> Settings:
+    """
+    Read and validate the reloadable settings from the environment.
+
+    An invalid number always raises ``ValueError``. An invalid URL raises
+    only if its variable is in ``changed`` (a reload that edited it, so the
+    watcher rolls back). Otherwise it is logged and dropped, which skips
+    that action, as the launcher did before settings were validated.
+
+    Args:
+        changed: Variables edited since the last load (empty at startup)
+    """
+    settings = Settings(
+        clap_threshold=_get_int_env("CLAP_THRESHOLD", 1800),
+        clap_interval=_get_float_env("CLAP_INTERVAL", 0.7),
+        active_duration=_get_float_env("ACTIVE_DURATION", 5),
+        triple_wait_duration=_get_float_env("TRIPLE_WAIT_DURATION", 30),
+        debug=os.getenv("DEBUG", "false").lower() == "true",
+        vs_code_path=os.getenv("VS_CODE_PATH", "code"),
+        spotify_path=os.getenv("SPOTIFY_PATH"),
+        discord_path=os.getenv("DISCORD_PATH"),
+        brave_path=os.getenv("BRAVE_PATH", "brave"),
+        chrome_url=os.getenv("CHROME_URL", "https://claude.ai"),
+        github_url=os.getenv("GITHUB_URL", "https://github.com/HetParikh4136"),
+        llm_model=os.getenv("LLM_MODEL", "mistralai/mistral-7b-instruct:free"),
+        llm_fallback_models=tuple(
+            m.strip() for m in os.getenv("LLM_FALLBACK_MODELS", "meta-llama/llama-3.1-8b-instruct:free").split(",")
+            if m.strip()
+        ),
+        llm_timeout=_get_float_env("LLM_TIMEOUT", 10),
+        llm_hedge_delay=_get_float_env("LLM_HEDGE_DELAY", 0),
+        llm_stream=os.getenv("LLM_STREAM", "false").lower() == "true",
+    )
+    if settings.clap_threshold <= 0:
+        raise ValueError(f"CLAP_THRESHOLD must be positive, got {settings.clap_threshold}")
+    if settings.clap_interval <= 0:
+        raise ValueError(f"CLAP_INTERVAL must be positive, got {settings.clap_interval}")
+    if settings.active_duration <= 0:
+        raise ValueError(f"ACTIVE_DURATION must be positive, got {settings.active_duration}")
+    if settings.llm_timeout <= 0:
+        raise ValueError(f"LLM_TIMEOUT must be positive, got {settings.llm_timeout}")
+    if settings.llm_hedge_delay < 0:
+        raise ValueError(f"LLM_HEDGE_DELAY cannot be negative, got {settings.llm_hedge_delay}")
+    for name, field in (("CHROME_URL", "chrome_url"), ("GITHUB_URL", "github_url")):
+        url = getattr(settings, field)
+        if url.startswith(("http://", "https://", "file://")):
+            continue
+        if name in changed:
+            raise ValueError(f"{name} must be an http(s) or file URL, got {url!r}")
+        logger.warning(f"{name} must be an http(s) or file URL, got {url!r}; that action is skipped")
+        settings = replace(settings, **{field: ""})
+    return settings
+
+
 # LLM Configuration for Q&A (Optional)
 # Default: OpenRouter with free Llama 3.1 8B model
 # To enable: Set LLM_API_KEY in your .env file
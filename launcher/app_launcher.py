@@ -2,13 +2,19 @@
 import subprocess
 import platform
 import os
-import time
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
+from launcher.launch_engine import LaunchEngine, LaunchReport, LaunchStep
+from launcher.launch_plan import LaunchPlan, PlanWatcher
+from utils import tracing
 
 logger = logging.getLogger(__name__)
 
+SUPPORTED_OS = ("Darwin", "Windows", "Linux")
+APP_NAMES = ("vscode", "chrome", "brave", "spotify", "discord")
+
 class AppLauncherError(Exception):
     """Custom exception for app launcher errors."""
     pass
@@ -17,20 +23,47 @@ class AppLauncher:
     def __init__(self):
         self.os_type = platform.system()
         self._load_config()
+        self.engine = LaunchEngine(self._safe_popen)
+        self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="launcher")
+
+        # Resolve executables once; re-resolve only when PATH or a configured path changes
+        self.refresh_plan()
+        self.plan_watcher = PlanWatcher(
+            self._watched_paths,
+            self.refresh_plan,
+            lambda: self.plan,
+            interval=self.plan_poll_interval
+        ).start()
 
     def _load_config(self):
         """Load application configuration from environment variables."""
-        from config import DEBUG
-        
-        self.debug = DEBUG
-        
-        # Load paths from environment variables
-        self.vs_code_path = os.getenv("VS_CODE_PATH", "code")
-        self.spotify_path = os.getenv("SPOTIFY_PATH")
-        self.discord_path = os.getenv("DISCORD_PATH")
-        self.brave_path = os.getenv("BRAVE_PATH", "brave")
-        self.chrome_url = os.getenv("CHROME_URL", "https://claude.ai")
-        self.github_url = os.getenv("GITHUB_URL", "https://github.com/HetParikh4136")
+        from config import LAUNCH_PLAN_POLL_INTERVAL, load_settings
+
+        self.plan_poll_interval = LAUNCH_PLAN_POLL_INTERVAL
+        self.apply_settings(load_settings(), refresh=False)
+
+    def apply_settings(self, settings, refresh: bool = True):
+        """
+        Take app paths and URLs from reloaded settings.
+
+        Args:
+            settings: A ``config.Settings``
+            refresh: Rebuild the launch plan in the background if a path changed
+        """
+        paths = (settings.vs_code_path, settings.spotify_path, settings.discord_path, settings.brave_path)
+        changed = paths != (
+            getattr(self, "vs_code_path", None), getattr(self, "spotify_path", None),
+            getattr(self, "discord_path", None), getattr(self, "brave_path", None)
+        )
+
+        self.debug = settings.debug
+        self.vs_code_path, self.spotify_path, self.discord_path, self.brave_path = paths
+        self.chrome_url = settings.chrome_url
+        self.github_url = settings.github_url
+
+        if refresh and changed:
+            # Resolving executables stats PATH; keep it off the caller's (audio) thread
+            self._background.submit(self.refresh_plan)
 
     def _validate_url(self, url: str) -> bool:
         """Validate URL format."""
@@ -88,137 +121,249 @@ class AppLauncher:
             return None
 
     # ---------- macOS ----------
-    def _launch_macos(self):
-        print("\n🚀 DOUBLE CLAP DETECTED! Launching apps...\n")
+    def _macos_steps(self) -> List[LaunchStep]:
+        steps = []
 
-        try:
-            # VS Code with folder
-            tbt_path = os.path.expanduser("~/code/tbt")
-            if self._validate_path(tbt_path):
-                self._safe_popen(
-                    ["open", "-a", "Visual Studio Code", tbt_path],
-                    description=f"Launched VS Code with folder: {tbt_path}"
-                )
-            else:
-                logger.warning(f"VS Code folder not found: {tbt_path}")
-                self._safe_popen(
-                    ["open", "-a", "Visual Studio Code"],
-                    description="Launched VS Code"
-                )
-            time.sleep(0.5)
+        # VS Code with folder
+        tbt_path = os.path.expanduser("~/code/tbt")
+        if self._validate_path(tbt_path):
+            steps.append(LaunchStep(
+                "vscode",
+                (("open", "-a", "Visual Studio Code", tbt_path),),
+                f"VS Code with folder: {tbt_path}",
+                probe="exit"
+            ))
+        else:
+            logger.warning(f"VS Code folder not found: {tbt_path}")
+            steps.append(LaunchStep(
+                "vscode",
+                (("open", "-a", "Visual Studio Code"),),
+                "VS Code",
+                probe="exit"
+            ))
 
-            # Chrome with URL
-            if self._validate_url(self.chrome_url):
-                self._safe_popen(
-                    ["open", "-a", "Google Chrome", "--args", "--new-window", self.chrome_url],
-                    description=f"Launched Chrome with {self.chrome_url}"
-                )
-            time.sleep(0.5)
+        # Chrome, then the URL in a new window once its process is up. "open -a ... --args" drops
+        # the arguments when Chrome is already running; "-n" starts a process that hands them over
+        if self._validate_url(self.chrome_url):
+            steps.append(LaunchStep(
+                "chrome",
+                (("open", "-a", "Google Chrome"),),
+                "Chrome",
+                probe="exit",
+                process_name="Google Chrome"
+            ))
+            steps.append(LaunchStep(
+                "chrome_url",
+                (("open", "-na", "Google Chrome", "--args", "--new-window", self.chrome_url),),
+                f"Chrome with {self.chrome_url}",
+                after=("chrome",),
+                probe="exit"
+            ))
 
-        except Exception as e:
-            logger.error(f"Error in macOS launch: {e}")
-            print(f"❌ Error during macOS launch: {e}")
+        return steps
 
     # ---------- Windows ----------
-    def _launch_windows(self):
-        print("\n🚀 DOUBLE CLAP DETECTED! Launching apps...\n")
-
-        try:
-            # VS Code - use cmd.exe to launch
-            import shlex
-            self._safe_popen(
-                ["cmd.exe", "/c", "start", "", self.vs_code_path],
-                description="Launched VS Code"
-            )
-            time.sleep(0.5)
+    def _windows_steps(self) -> List[LaunchStep]:
+        # cmd.exe "start" hands off and exits, so readiness means the app's process appeared
+        steps = [LaunchStep(
+            "vscode",
+            (("cmd.exe", "/c", "start", "", self.vs_code_path),),
+            "VS Code",
+            probe="exit",
+            process_name="Code.exe"
+        )]
 
-            # Spotify
-            if self.spotify_path and self._validate_path(self.spotify_path):
-                self._safe_popen(
-                    ["cmd.exe", "/c", "start", "", self.spotify_path],
-                    description="Launched Spotify"
-                )
-                time.sleep(0.5)
-            else:
-                logger.warning("Spotify path not configured or not found")
+        # Spotify
+        if self.spotify_path and self._validate_path(self.spotify_path):
+            steps.append(LaunchStep(
+                "spotify",
+                (("cmd.exe", "/c", "start", "", self.spotify_path),),
+                "Spotify",
+                probe="exit",
+                process_name="Spotify.exe"
+            ))
+        else:
+            logger.warning("Spotify path not configured or not found")
 
-            # Brave Browser
-            if self._validate_path(self.brave_path):
-                self._safe_popen(
-                    ["cmd.exe", "/c", "start", "", self.brave_path, "--new-window", "--profile-directory=Default"],
-                    description="Launched Brave Browser (Default Profile)"
-                )
-            else:
-                logger.warning(f"Brave path not found: {self.brave_path}")
-            time.sleep(0.5)
+        # Brave Browser
+        if self._validate_path(self.brave_path):
+            steps.append(LaunchStep(
+                "brave",
+                (("cmd.exe", "/c", "start", "", self.brave_path, "--new-window", "--profile-directory=Default"),),
+                "Brave Browser (Default Profile)",
+                probe="exit",
+                process_name="brave.exe"
+            ))
+        else:
+            logger.warning(f"Brave path not found: {self.brave_path}")
 
-            # Discord
-            if self.discord_path and self._validate_path(self.discord_path):
-                self._safe_popen(
-                    [self.discord_path, "--processStart", "Discord.exe"],
-                    description="Launched Discord"
-                )
-            else:
-                logger.warning("Discord path not configured or not found")
-            time.sleep(0.5)
+        # Discord (Update.exe starts Discord.exe and exits)
+        if self.discord_path and self._validate_path(self.discord_path):
+            steps.append(LaunchStep(
+                "discord",
+                ((self.discord_path, "--processStart", "Discord.exe"),),
+                "Discord",
+                probe="exit",
+                process_name="Discord.exe"
+            ))
+        else:
+            logger.warning("Discord path not configured or not found")
 
-        except Exception as e:
-            logger.error(f"Error in Windows launch: {e}")
-            print(f"❌ Error during Windows launch: {e}")
+        return steps
 
     # ---------- Linux ----------
-    def _launch_linux(self):
-        print("\n🚀 DOUBLE CLAP DETECTED! Launching apps...\n")
+    def _linux_steps(self) -> List[LaunchStep]:
+        steps = [LaunchStep("vscode", (("code",),), "VS Code")]
 
-        try:
-            # VS Code
-            self._safe_popen(
-                ["code"],
-                description="Launched VS Code"
-            )
-            time.sleep(0.5)
+        # Chrome, falling back to Chromium, with URL
+        if self._validate_url(self.chrome_url):
+            steps.append(LaunchStep(
+                "chrome",
+                (("google-chrome", self.chrome_url), ("chromium-browser", self.chrome_url)),
+                "Google Chrome"
+            ))
 
-            # Chrome / Chromium with URL
-            if self._validate_url(self.chrome_url):
-                process = self._safe_popen(
-                    ["google-chrome", self.chrome_url],
-                    description="Launched Google Chrome"
-                )
-                if not process:
-                    self._safe_popen(
-                        ["chromium-browser", self.chrome_url],
-                        description="Launched Chromium"
-                    )
-            time.sleep(0.5)
-
-            # Discord
-            self._safe_popen(
-                ["discord"],
-                description="Launched Discord"
-            )
-            time.sleep(0.5)
+        # Discord
+        steps.append(LaunchStep("discord", (("discord",),), "Discord"))
+        return steps
+
+    def _usual_steps(self) -> List[LaunchStep]:
+        if self.os_type == "Darwin":
+            return self._macos_steps()
+        if self.os_type == "Windows":
+            return self._windows_steps()
+        if self.os_type == "Linux":
+            return self._linux_steps()
+        raise AppLauncherError(f"Unsupported OS: {self.os_type}")
+
+    def _app_steps(self) -> Dict[str, LaunchStep]:
+        # "open -a" and "cmd /c start" hand off and exit; Linux runs the app directly
+        probe = "alive" if self.os_type == "Linux" else "exit"
+        return {
+            name: LaunchStep(name, tuple(tuple(c) for c in self._app_commands(name)), name, probe=probe)
+            for name in APP_NAMES
+        }
 
+    def _watched_paths(self) -> List[str]:
+        """Configured paths the launch plan was resolved from (bare command names go through PATH)."""
+        candidates = [
+            os.path.expanduser("~/code/tbt"),
+            self.vs_code_path,
+            self.spotify_path,
+            self.discord_path,
+            self.brave_path,
+        ]
+        return [path for path in candidates if path and (os.sep in path or "/" in path)]
+
+    def refresh_plan(self) -> LaunchPlan:
+        """Resolve every launch command into a new plan and swap it in."""
+        try:
+            usual = self._usual_steps() if self.os_type in SUPPORTED_OS else []
         except Exception as e:
-            logger.error(f"Error in Linux launch: {e}")
-            print(f"❌ Error during Linux launch: {e}")
+            logger.error(f"Error building launch plan: {e}")
+            usual = []
+        self.plan = LaunchPlan.build(usual, self._app_steps(), self._watched_paths())
+        return self.plan
+
+    def _print_report(self, report: LaunchReport):
+        for result in report.results:
+            if result.ok:
+                print(f"✅ Launched {result.description} ({result.latency * 1000:.0f} ms)")
+            else:
+                logger.error(f"Failed to launch {result.name}: {result.detail}")
+                print(f"❌ Failed to launch: {result.description} ({result.detail})")
+        logger.info(
+            "Launch latency: "
+            + ", ".join(f"{r.name}={r.latency * 1000:.0f}ms" for r in report.results)
+            + f", total={report.total * 1000:.0f}ms"
+        )
 
     # ---------- PUBLIC METHODS ----------
-    def launch_apps(self):
-        """Launch platform-specific applications."""
+    def launch_apps(self) -> Optional[LaunchReport]:
+        """Launch platform-specific applications concurrently and wait until they are ready."""
         try:
-            if self.os_type == "Darwin":
-                self._launch_macos()
-            elif self.os_type == "Windows":
-                self._launch_windows()
-            elif self.os_type == "Linux":
-                self._launch_linux()
-            else:
+            if self.os_type not in SUPPORTED_OS:
                 raise AppLauncherError(f"Unsupported OS: {self.os_type}")
+            plan = self.plan
+            print("\n🚀 DOUBLE CLAP DETECTED! Launching apps...\n")
 
-            print("\n✨ All apps launched!\n")
+            for name in plan.missing:
+                print(f"⚠️ Skipping {name} (not installed or not found)")
+            with tracing.span("launch_apps", apps=len(plan.usual)):
+                report = self.engine.run(plan.usual)
+            self._print_report(report)
+
+            print(f"\n✨ All apps launched in {report.total:.1f}s!\n")
+            return report
         except Exception as e:
             logger.error(f"Error launching apps: {e}")
             print(f"❌ Failed to launch apps: {e}")
+            return None
+
+    def launch_apps_async(self) -> Future:
+        """Run ``launch_apps`` in the background so the caller (the audio loop) is not blocked."""
+        trace = tracing.current_trace()
+
+        def launch():
+            with tracing.activate(trace):
+                return self.launch_apps()
+
+        return self._background.submit(launch)
+
+    def _app_commands(self, name: str) -> List[List[str]]:
+        """Command alternatives (tried in order) for launching a single app on this OS."""
+        if self.os_type == "Windows":
+            commands = {
+                "vscode": [["cmd.exe", "/c", "start", "", self.vs_code_path]],
+                "chrome": [["cmd.exe", "/c", "start", "", "chrome"]],
+                "brave": [["cmd.exe", "/c", "start", "", self.brave_path]],
+                "spotify": [["cmd.exe", "/c", "start", "", self.spotify_path]] if self.spotify_path else [],
+                "discord": [[self.discord_path, "--processStart", "Discord.exe"]] if self.discord_path else [],
+            }
+        elif self.os_type == "Darwin":
+            commands = {
+                "vscode": [["open", "-a", "Visual Studio Code"]],
+                "chrome": [["open", "-a", "Google Chrome"]],
+                "brave": [["open", "-a", "Brave Browser"]],
+                "spotify": [["open", "-a", "Spotify"]],
+                "discord": [["open", "-a", "Discord"]],
+            }
+        else:
+            commands = {
+                "vscode": [["code"]],
+                "chrome": [["google-chrome"], ["chromium-browser"]],
+                "brave": [[self.brave_path]],
+                "spotify": [[self.spotify_path or "spotify"]],
+                "discord": [[self.discord_path or "discord"]],
+            }
+        return commands.get(name, [])
+
+    def launch_app(self, name: str) -> bool:
+        """
+        Launch a single application by name (vscode, chrome, brave, spotify, discord).
+
+        Returns:
+            True if one of the app's commands started and became ready
+        """
+        step = self.plan.apps.get(name)
+        if step is None:
+            logger.warning(f"No installed launch command for {name} on {self.os_type}")
+            print(f"❌ Don't know how to launch: {name}")
+            return False
+
+        report = self.engine.run([step])
+        self._print_report(report)
+        return report.ok
+
+    def launch_app_async(self, name: str) -> Future:
+        """Run ``launch_app`` in the background, on the same worker as ``launch_apps_async``."""
+        trace = tracing.current_trace()
+
+        def launch():
+            with tracing.activate(trace):
+                return self.launch_app(name)
+
+        return self._background.submit(launch)
 
     def open_url(self, url: Optional[str] = None):
         """Open URL in default browser."""
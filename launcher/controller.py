@@ -1,134 +1,506 @@
+import os
 import time
 import logging
-import speech_recognition as sr
-import sounddevice as sd
-import numpy as np
-from audio.stream import AudioStream
+import threading
 from audio.clap_detector import ClapDetector
+from audio.command_capture import CommandCapture
+from audio.energy_gate import EnergyGate
+from audio import flight_recorder
+from audio.vad import EnergyVAD
 from launcher.app_launcher import AppLauncher
+from launcher.intents import load_router
+from utils import metrics, tracing
+from utils.config_watcher import ConfigWatcher
 from utils.qa_handler import QAHandler
-from config import ACTIVE_DURATION, TRIPLE_WAIT_DURATION
+from utils.stt import STTError, create_stt_backend
+from utils.tts import TTSWorker, create_backend, CACHED_PHRASES, UNKNOWN_AUDIO_PHRASE, LAUNCHING_PHRASE, LAUNCHED_PHRASE
+from config import (
+    TRIPLE_WAIT_DURATION,
+    COMMAND_PREROLL,
+    COMMAND_MAX_DURATION,
+    COMMAND_SILENCE_DURATION,
+    COMMAND_START_TIMEOUT,
+    VAD_ENERGY_THRESHOLD,
+    AUDIO_QUEUE_FRAMES,
+    AUDIO_DEVICE_RATE,
+    TTS_BACKEND,
+    STT_BACKEND,
+    INTENTS_PATH,
+    INTENT_FUZZY,
+    TTS_RATE,
+    TTS_VOLUME,
+    TRACE_DIR,
+    TRACE_HISTORY,
+    ENERGY_GATE,
+    ENERGY_GATE_RATIO,
+    ENERGY_GATE_MIN_LEVEL,
+    ENERGY_GATE_HANGOVER,
+    ENERGY_GATE_LOOKBACK,
+    FLIGHT_RECORDER_DIR,
+    FLIGHT_RECORDER_MINUTES,
+    ENV_FILE,
+    CONFIG_RELOAD_INTERVAL,
+    RELOADABLE_VARIABLES,
+    load_settings,
+)
 
 logger = logging.getLogger(__name__)
 
+# One frame is 32 ms at 512 samples / 16 kHz; buckets are finer below that deadline
+FRAME_SECONDS = metrics.histogram(
+    "arc_frame_seconds", "Detection time per audio frame",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.032, 0.064)
+)
+WAKE_DETECTIONS = metrics.counter("arc_wake_detections_total", "Wake word detections", labels=("keyword", "action"))
+# Sleep after consecutive main-loop errors doubles from the base up to the cap (seconds)
+ERROR_BACKOFF_BASE = 0.01
+ERROR_BACKOFF_MAX = 1.0
+
+# Longest an interaction's trace stays open waiting for launches and speech to finish
+TRACE_SETTLE_TIMEOUT = 60
+
+STT_SECONDS = metrics.histogram(
+    "arc_stt_seconds", "Time from the end of a command to its final transcript", labels=("outcome",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0)
+)
+
 class UnifiedController:
-    def __init__(self, wake_detector, clap_detector):
+    def __init__(self, wake_detector, clap_detector, audio_source=None):
         if not wake_detector or not clap_detector:
             raise ValueError("Wake detector and clap detector cannot be None")
         
         self.wake_detector = wake_detector
         self.clap_detector = clap_detector
-        self.launcher = AppLauncher()
-        self.qa_handler = QAHandler()
+        self._init_actions()
 
-        self.active = False
+        self.recorder = None
+        self._active = False
+        self._waiting_triple = False
         self.active_time = 0
-        self.waiting_triple = False
         self.triple_time = 0
-        
-        # Initialize speech recognizer (no PyAudio needed)
-        self.recognizer = sr.Recognizer()
+        self._loop_errors = 0
 
+        # Set for the live microphone: other consumers (e.g. a recorder) subscribe to it
+        self.hub = None
         try:
-            self.audio = AudioStream(
-                wake_detector.sample_rate,
-                wake_detector.frame_length
-            )
+            if audio_source is not None:
+                if (audio_source.sample_rate != wake_detector.sample_rate
+                        or audio_source.frame_length != wake_detector.frame_length):
+                    raise ValueError(
+                        f"Audio source delivers {audio_source.frame_length} samples at "
+                        f"{audio_source.sample_rate} Hz, wake detector needs "
+                        f"{wake_detector.frame_length} at {wake_detector.sample_rate} Hz"
+                    )
+                self.audio = audio_source
+            else:
+                # Imported here so replayed sources work without PortAudio installed
+                from audio.capture_hub import CaptureHub
+                from audio.stream import AudioStream
+
+                # The device is opened once, at its own rate; detection (and command
+                # capture, which reads the same frames) is one subscriber of the hub,
+                # the flight recorder another
+                device_rate = AUDIO_DEVICE_RATE or wake_detector.sample_rate
+                self.hub = CaptureHub(AudioStream(
+                    device_rate,
+                    wake_detector.frame_length * device_rate // wake_detector.sample_rate,
+                    queue_frames=AUDIO_QUEUE_FRAMES
+                ))
+                self.audio = self.hub.subscribe(
+                    "detection",
+                    wake_detector.sample_rate,
+                    wake_detector.frame_length,
+                    queue_frames=AUDIO_QUEUE_FRAMES
+                )
         except Exception as e:
             logger.error(f"Failed to initialize audio stream: {e}")
             raise
 
+        self.command_capture = CommandCapture(
+            self.audio.sample_rate,
+            self.audio.frame_length,
+            preroll=COMMAND_PREROLL,
+            max_duration=COMMAND_MAX_DURATION,
+            silence_duration=COMMAND_SILENCE_DURATION,
+            start_timeout=COMMAND_START_TIMEOUT,
+            vad=EnergyVAD(VAD_ENERGY_THRESHOLD)
+        )
+
+        # Idle mode: only frames louder than the room reach the detectors
+        self.gate = EnergyGate(
+            self.audio.sample_rate,
+            self.audio.frame_length,
+            ratio=ENERGY_GATE_RATIO,
+            min_level=ENERGY_GATE_MIN_LEVEL,
+            hangover=ENERGY_GATE_HANGOVER,
+            lookback=ENERGY_GATE_LOOKBACK
+        ) if ENERGY_GATE else None
+
+        # Post-mortem record of what was heard. Live, it follows its own hub subscription,
+        # so it keeps recording while the loop is busy (e.g. speaking an answer); a replayed
+        # source is read at the loop's pace, so its frames are written as the loop reads them
+        if FLIGHT_RECORDER_DIR:
+            self.recorder = flight_recorder.FlightRecorder(
+                FLIGHT_RECORDER_DIR,
+                self.audio.sample_rate,
+                self.audio.frame_length,
+                minutes=FLIGHT_RECORDER_MINUTES,
+                wake_labels=[word.label for word in getattr(wake_detector, "wake_words", [])]
+            )
+            if self.hub is not None:
+                self.recorder.follow(self.hub.subscribe(
+                    "flight_recorder",
+                    self.audio.sample_rate,
+                    self.audio.frame_length,
+                    queue_frames=AUDIO_QUEUE_FRAMES
+                ))
+
+    @property
+    def active(self):
+        return self._active
+
+    @active.setter
+    def active(self, value):
+        if value != self._active and self.recorder is not None:
+            self.recorder.event(
+                flight_recorder.EVENT_STATE, flight_recorder.STATE_ACTIVE, float(value), self.audio.now()
+            )
+        self._active = value
+
+    @property
+    def waiting_triple(self):
+        return self._waiting_triple
+
+    @waiting_triple.setter
+    def waiting_triple(self, value):
+        if value != self._waiting_triple and self.recorder is not None:
+            self.recorder.event(
+                flight_recorder.EVENT_STATE, flight_recorder.STATE_WAITING_TRIPLE, float(value), self.audio.now()
+            )
+        self._waiting_triple = value
+
+    def _read(self):
+        """Next frame from the audio source, also written to the flight recorder when replaying."""
+        pcm = self.audio.read()
+        if self.hub is None and self.recorder is not None and pcm is not None and len(pcm):
+            self.recorder.write_frame(pcm, self.audio.now())
+        return pcm
+
+    def _init_actions(self):
+        """Set up everything that acts on a detection: launcher, intents, speech and Q&A."""
+        # Live settings: the watcher publishes new ones when the .env file changes and the
+        # loop applies them between frames
+        self.config_watcher = ConfigWatcher(
+            ENV_FILE, load_settings, CONFIG_RELOAD_INTERVAL, reloadable=RELOADABLE_VARIABLES
+        ).start()
+        self.settings = self.config_watcher.current
+        self._settings_version = self.config_watcher.version
+        self.launcher = AppLauncher()
+        tracing.TRACER.configure(TRACE_HISTORY, TRACE_DIR)
+        self._interaction_waits = []
+        self.intents = load_router(INTENTS_PATH, INTENT_FUZZY)
+        self.tts = TTSWorker(
+            create_backend(TTS_BACKEND, TTS_RATE, TTS_VOLUME),
+            cached_phrases=CACHED_PHRASES
+        ).start()
+        self.qa_handler = QAHandler(tts=self.tts)
+
+        # Speech recognizer, fed incrementally during command capture. It and the LLM
+        # connection are only needed once a command comes in, so they are loaded in the
+        # background while the wake-word loop is already listening.
+        self.stt = None
+        self._stt_error = None
+        self._last_partial = None
+        self._ready = threading.Event()
+        threading.Thread(target=self._warm_up, name="controller-warmup", daemon=True).start()
+
+    def _apply_settings(self):
+        """Hand the watcher's latest settings to the running components (called between frames)."""
+        self._settings_version = self.config_watcher.version
+        settings = self.settings = self.config_watcher.current
+        if getattr(self, "clap_detector", None) is not None:
+            self.clap_detector.configure(settings.clap_threshold, settings.clap_interval)
+        self.launcher.apply_settings(settings)
+        self.qa_handler.apply_settings(settings)
+        logger.debug(f"Applied configuration version {self._settings_version}")
+
+    def _warm_up(self):
+        """Load the speech recognizer and open the LLM connection off the listening path."""
+        try:
+            self.stt = create_stt_backend(STT_BACKEND, VAD_ENERGY_THRESHOLD)
+        except Exception as e:
+            self._stt_error = e
+            logger.error(f"Failed to initialize speech recognition: {e}")
+            print(f"❌ Speech recognition unavailable: {e}")
+        try:
+            self.qa_handler.warm_up()
+        except Exception as e:
+            logger.debug(f"LLM warm-up failed: {e}")
+        self._ready.set()
+        logger.debug("Background warm-up finished")
+
+    def _accept_command_audio(self, chunk):
+        """Feed captured audio to the recogniser while the user is still talking."""
+        partial = self.stt.accept(chunk)
+        if partial and partial != self._last_partial:
+            self._last_partial = partial
+            logger.debug(f"Partial transcript: {partial}")
+
     def listen_for_command(self):
-        """Listen for voice command after wake word using sounddevice."""
+        """Capture the voice command from the running stream until the speaker stops."""
         try:
             print("🎤 Listening for command...")
             
-            # Record audio using sounddevice (16kHz for speech recognition)
-            duration = 5  # seconds
-            sample_rate = 16000
-            audio_data = sd.rec(int(duration * sample_rate), 
-                               samplerate=sample_rate, 
-                               channels=1, 
-                               dtype='int16')
-            sd.wait()
-            
-            # Convert to speech_recognition AudioData format
-            audio_data_bytes = audio_data.tobytes()
-            audio = sr.AudioData(audio_data_bytes, sample_rate, 2)
-                
-            try:
-                command = self.recognizer.recognize_google(audio).lower()
-                print(f"🗣️ You said: {command}")
-                return command
-            except sr.UnknownValueError:
-                print("❓ Could not understand audio")
-                return None
-            except sr.RequestError as e:
-                logger.error(f"Speech recognition service error: {e}")
-                print(f"❌ Speech recognition error: {e}")
+            # Pre-roll plus live frames from the already-open stream, ended by the VAD.
+            # Recognition runs on each chunk as it is captured.
+            self._last_partial = None
+            self._ready.wait()
+            if self.stt is None:
+                print(f"❌ Speech recognition unavailable: {self._stt_error}")
                 return None
+            self.stt.start(self.audio.sample_rate)
+            with tracing.span("capture") as span:
+                audio = self.command_capture.capture(self._read, on_frame=self._accept_command_audio)
+                span.set(audio_seconds=round(len(audio) / self.audio.sample_rate, 3))
+
+            return self._finish_transcript()
         except Exception as e:
             logger.error(f"Error listening for command: {e}")
             print(f"❌ Error capturing audio: {e}")
             return None
-    
-    def run(self):
-        """Main control loop for wake word and clap detection."""
+
+    def transcribe(self, audio, sample_rate, chunk_length=512):
+        """Recognise a command captured elsewhere (e.g. by a capture worker process)."""
+        try:
+            self._last_partial = None
+            self._ready.wait()
+            if self.stt is None:
+                print(f"❌ Speech recognition unavailable: {self._stt_error}")
+                return None
+            self.stt.start(sample_rate)
+            for offset in range(0, len(audio), chunk_length):
+                self._accept_command_audio(audio[offset:offset + chunk_length])
+            return self._finish_transcript()
+        except Exception as e:
+            logger.error(f"Error transcribing command: {e}")
+            print(f"❌ Error transcribing audio: {e}")
+            return None
+
+    def _finish_transcript(self):
+        """Final transcript of the audio fed to the recogniser, or None (reported to the user)."""
+        started = time.perf_counter()
+        with tracing.span("stt", backend=self.stt.name) as span:
+            try:
+                command = self.stt.finish()
+            except STTError as e:
+                STT_SECONDS.labels(outcome="error").observe(time.perf_counter() - started)
+                span.set(outcome="error")
+                logger.error(f"Speech recognition service error: {e}")
+                print(f"❌ Speech recognition error: {e}")
+                return None
+            outcome = "recognized" if command else "empty"
+            STT_SECONDS.labels(outcome=outcome).observe(time.perf_counter() - started)
+            span.set(outcome=outcome)
+
+        if not command:
+            print("❓ Could not understand audio")
+            self.tts.say(UNKNOWN_AUDIO_PHRASE)
+            return None
+
+        print(f"🗣️ You said: {command}")
+        return command
+
+    def _launch_apps_in_background(self):
+        """Launch "the usual" without blocking the audio loop; announce when everything is ready."""
+        trace = tracing.current_trace()
+        announced = threading.Event()
+
+        def on_done(future):
+            try:
+                report = future.result()
+                if report is not None:
+                    with tracing.activate(trace):
+                        self.tts.say(LAUNCHED_PHRASE)
+            finally:
+                announced.set()
+
+        self._interaction_waits.append(announced)
+        self.launcher.launch_apps_async().add_done_callback(on_done)
+
+    def _launch_app_in_background(self, name):
+        """Launch one app without blocking the audio loop while its readiness probe waits."""
+        done = threading.Event()
+
+        def on_done(future):
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Error launching {name}: {e}")
+                print(f"❌ Failed to launch {name}: {e}")
+            finally:
+                done.set()
+
+        self._interaction_waits.append(done)
+        self.launcher.launch_app_async(name).add_done_callback(on_done)
+
+    def _finish_interaction(self, trace):
+        """Close the interaction's trace once its launches and queued speech are done."""
+        waits, self._interaction_waits = self._interaction_waits, []
+
+        def settled():
+            for event in waits:
+                event.wait(TRACE_SETTLE_TIMEOUT)
+            self.tts.drain().wait(TRACE_SETTLE_TIMEOUT)
+
+        tracing.finish_trace(trace, settled)
+
+    def _run_intent(self, intent):
+        """Execute a locally matched intent without touching the network."""
+        if intent.action == "launch_apps":
+            print("📱 Executing 'the usual' command...")
+            self.tts.say(LAUNCHING_PHRASE)
+            self._launch_apps_in_background()
+        elif intent.action == "launch_app":
+            self._launch_app_in_background(intent.slots.get("app", ""))
+        elif intent.action == "open_url":
+            url = intent.intent.args.get("url", "")
+            # Either a literal URL or the name of a configured launcher URL (e.g. github_url)
+            self.launcher.open_url(url if "://" in url else getattr(self.launcher, url, None))
+        elif intent.action == "stop":
+            self.tts.flush()
+        else:
+            logger.warning(f"Intent {intent.name} has unknown action {intent.action!r}")
+
+    def handle_command(self, command):
+        """Route a transcribed command to a local intent, or to the LLM as a question."""
+        with tracing.span("dispatch") as span:
+            intent = self.intents.match(command)
+            span.set(intent=intent.name if intent else "llm")
+        if intent:
+            logger.debug(f"Matched intent {intent.name} via '{intent.phrase}'{' (fuzzy)' if intent.fuzzy else ''}")
+            try:
+                with tracing.span("intent", intent=intent.name, action=intent.action):
+                    self._run_intent(intent)
+            except Exception as e:
+                logger.error(f"Error running intent {intent.name}: {e}")
+                print(f"❌ Error running '{intent.name}': {e}")
+            return
+
+        # Treat as a question
+        print("❓ Processing question...")
+        try:
+            # Spoken as it arrives when streaming is enabled
+            with tracing.span("answer", stream=self.qa_handler.stream):
+                answer = self.qa_handler.speak_answer(command)
+            if answer:
+                print(f"💬 Answer: {answer}")
+        except Exception as e:
+            logger.error(f"Error processing question: {e}")
+            print(f"❌ Error: {e}")
+
+    def _on_wake_word(self, wake_word):
+        """Run the action bound to the wake word that fired."""
+        trace = tracing.start_trace(
+            "interaction", trigger="wake_word", keyword=wake_word.label, action=wake_word.action
+        )
+        if wake_word.action == "cancel":
+            print(f"🤫 {wake_word.label}: stopping speech")
+            self.tts.flush()
+        elif wake_word.action == "launch":
+            print(f"✨ {wake_word.label} detected!")
+            self.tts.say(LAUNCHING_PHRASE)
+            self._launch_apps_in_background()
+        else:
+            self.active = True
+            self.active_time = self.audio.now()
+            print("✨ Wake word detected!")
+
+            # Listen for voice command
+            command = self.listen_for_command()
+            if self.gate is not None:
+                # Its look-back predates the command that was just read
+                self.gate.reset()
+            if command:
+                self.handle_command(command)
+            self.active = False
+        self._finish_interaction(trace)
+
+    def run(self, on_listening=None):
+        """
+        Main control loop for wake word and clap detection.
+
+        Args:
+            on_listening: Optional callback invoked once the audio source is running
+        """
         try:
             self.audio.start()
             print("🎧 Listening...\n")
+            if on_listening:
+                on_listening()
 
             while True:
                 try:
-                    pcm = self.audio.read()
+                    pcm = self._read()
                     
                     if pcm is None or len(pcm) == 0:
                         continue
+                    self._loop_errors = 0
+                    if self.config_watcher.version != self._settings_version:
+                        self._apply_settings()
 
+                    frame_started = time.perf_counter()
+                    frames = self.gate.admit(pcm) if self.gate is not None else (pcm,)
                     if not self.active and not self.waiting_triple:
-                        if self.wake_detector.detect(pcm):
-                            self.active = True
-                            self.active_time = time.time()
-                            print("✨ Wake word detected!")
-                            
-                            # Listen for voice command
-                            command = self.listen_for_command()
-                            if command:
-                                if "the usual" in command:
-                                    print("📱 Executing 'the usual' command...")
-                                    try:
-                                        self.launcher.launch_apps()
-                                    except Exception as e:
-                                        logger.error(f"Error launching apps: {e}")
-                                        print(f"❌ Error launching apps: {e}")
-                                else:
-                                    # Treat as a question
-                                    print("❓ Processing question...")
-                                    try:
-                                        answer = self.qa_handler.answer_question(command)
-                                        if answer:
-                                            print(f"💬 Answer: {answer}")
-                                            self.qa_handler.text_to_speech(answer)
-                                    except Exception as e:
-                                        logger.error(f"Error processing question: {e}")
-                                        print(f"❌ Error: {e}")
-                            self.active = False
+                        self.command_capture.push(pcm)
+                        detected = None
+                        # Frames between the one the wake word was heard on and this one
+                        lag = 0
+                        for index, frame in enumerate(frames):
+                            detected = self.wake_detector.detect(frame)
+                            if detected:
+                                lag = len(frames) - 1 - index
+                                break
+                        FRAME_SECONDS.observe(time.perf_counter() - frame_started)
+                        if detected:
+                            WAKE_DETECTIONS.labels(keyword=detected.label, action=detected.action).inc()
+                            if self.recorder is not None:
+                                self.recorder.event(
+                                    flight_recorder.EVENT_WAKE,
+                                    self.wake_detector.wake_words.index(detected),
+                                    timestamp=self.audio.now() - lag * self.command_capture.frame_duration
+                                )
+                            self._on_wake_word(detected)
                             continue
 
                     # Keep double clap functionality as backup
                     elif self.active:
                         # Check if active duration has expired
-                        if time.time() - self.active_time > ACTIVE_DURATION:
+                        if self.audio.now() - self.active_time > self.settings.active_duration:
                             self.active = False
                             continue
 
-                        clap = self.clap_detector.detect(pcm)
+                        # Replayed look-back frames are stamped with the time they were heard
+                        clap = 0
+                        now = self.audio.now()
+                        for index, frame in enumerate(frames):
+                            lag = len(frames) - 1 - index
+                            heard_at = now - lag * self.command_capture.frame_duration
+                            clap = self.clap_detector.detect(frame, heard_at)
+                            if self.recorder is not None:
+                                self.recorder.event(
+                                    flight_recorder.EVENT_CLAP_AMPLITUDE,
+                                    value=self.clap_detector.amplitude,
+                                    timestamp=heard_at
+                                )
+                                if clap:
+                                    self.recorder.event(flight_recorder.EVENT_CLAP, clap, timestamp=heard_at)
+                            if clap:
+                                break
+                        FRAME_SECONDS.observe(time.perf_counter() - frame_started)
                         if clap == 2:
-                            try:
-                                self.launcher.launch_apps()
-                            except Exception as e:
-                                logger.error(f"Error launching apps: {e}")
-                                print(f"❌ Error launching apps: {e}")
+                            trace = tracing.start_trace("interaction", trigger="double_clap")
+                            self._launch_apps_in_background()
+                            self._finish_interaction(trace)
                             
                             self.active = False
                             # Commented out triple clap / URL functionality
@@ -154,9 +526,17 @@ class UnifiedController:
                 except KeyboardInterrupt:
                     print("\n👋 Shutting down...")
                     break
+                except EOFError:
+                    print("📼 Audio source finished")
+                    break
                 except Exception as e:
+                    # A persistent fault (e.g. a closed stream) must not become a tight loop:
+                    # report the first error of a streak and back off exponentially
+                    self._loop_errors += 1
                     logger.error(f"Error in main loop: {e}")
-                    print(f"❌ Error in main loop: {e}")
+                    if self._loop_errors == 1:
+                        print(f"❌ Error in main loop: {e}")
+                    time.sleep(min(ERROR_BACKOFF_MAX, ERROR_BACKOFF_BASE * 2 ** min(self._loop_errors - 1, 10)))
                     continue
 
         except KeyboardInterrupt:
@@ -165,8 +545,22 @@ class UnifiedController:
             logger.error(f"Fatal error in controller: {e}")
             print(f"❌ Fatal error: {e}")
         finally:
+            self.config_watcher.stop()
+            self.tts.close()
             try:
                 self.audio.stop()
+                logger.info(f"Audio source stats: {self.hub.stats() if self.hub is not None else self.audio.stats()}")
+                if self.gate is not None:
+                    logger.info(f"Energy gate stats: {self.gate.stats()}")
+                if self.recorder is not None:
+                    self.recorder.close()
+                    logger.info(f"Flight recorder: {self.recorder.frame} frames, {self.recorder.event_count} events")
+                self.qa_handler.close()
+                if self.qa_handler.cache is not None:
+                    logger.info(f"Answer cache stats: {self.qa_handler.cache_stats()}")
+                if TRACE_DIR and tracing.TRACER.recent():
+                    path = tracing.TRACER.export(os.path.join(TRACE_DIR, "last-interactions.json"))
+                    logger.info(f"Wrote the last {len(tracing.TRACER.recent())} interaction traces to {path}")
                 print("✅ Audio stream closed")
             except Exception as e:
                 logger.error(f"Error closing audio stream: {e}")
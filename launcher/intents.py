@@ -0,0 +1,254 @@
+"""Local intent routing for voice commands.
+
+An intent table maps phrases, synonyms and slot patterns to actions. The
+table is compiled once into a word-level Aho-Corasick automaton, so a
+command is matched against every pattern in a single pass over its words,
+and each word is first snapped to the table's vocabulary with a one-edit
+fuzzy lookup to absorb small speech-recognition errors. A fuzzy match must
+keep the word's first letter, and the word a phrase starts with (its verb,
+e.g. "open") is never fuzzy-matched, so "smart music" is not "start music".
+Commands that match are handled locally and never reach the LLM.
+
+Table format (JSON list, or the ``DEFAULT_INTENTS`` below)::
+
+    {
+        "name": "launch_app",
+        "phrases": ["open {app}", "launch {app}"],
+        "slots": {"app": {"spotify": ["spotify"], "vscode": ["vs code", "vscode"]}},
+        "action": "launch_app",
+        "args": {},
+        "match": "exact"           # the whole command must be the phrase (filler
+                                   # words allowed, and a polite lead-in such as
+                                   # "can you"); "contains" matches anywhere
+    }
+"""
+import json
+import logging
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTENTS = [
+    {
+        "name": "the_usual",
+        "phrases": ["the usual", "start my day", "usual setup"],
+        "action": "launch_apps",
+        "match": "exact",
+    },
+    {
+        "name": "stop",
+        "phrases": ["stop", "cancel", "never mind", "be quiet", "quiet", "shut up", "stop talking"],
+        "action": "stop",
+        "match": "exact",
+    },
+    {
+        "name": "open_github",
+        "phrases": ["open github", "open my github", "show github", "show my github"],
+        "action": "open_url",
+        "args": {"url": "github_url"},
+        "match": "exact",
+    },
+    {
+        "name": "launch_app",
+        "phrases": ["open {app}", "launch {app}", "start {app}", "run {app}"],
+        "slots": {
+            "app": {
+                "vscode": ["vs code", "vscode", "visual studio code", "code editor"],
+                "chrome": ["chrome", "google chrome", "chromium"],
+                "brave": ["brave", "brave browser"],
+                "spotify": ["spotify", "music"],
+                "discord": ["discord"],
+            }
+        },
+        "action": "launch_app",
+        # "how do I open discord on linux" is a question for the LLM, not a launch
+        "match": "exact",
+    },
+]
+
+# Words that may surround an "exact" phrase without breaking the match
+FILLER_WORDS = {"arc", "hey", "ok", "okay", "please", "now", "just"}
+# Words that may also come before it: "can you do the usual", "could you open spotify"
+LEAD_IN_WORDS = FILLER_WORDS | {"do", "can", "could", "would", "will", "you"}
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+_SLOT = re.compile(r"^\{(\w+)\}$")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def _deletions(word: str):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+@dataclass(frozen=True)
+class Intent:
+    name: str
+    action: str
+    args: Dict[str, str] = field(default_factory=dict)
+    match: str = "contains"
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    intent: Intent
+    slots: Dict[str, str]
+    phrase: str
+    fuzzy: bool = False
+
+    @property
+    def name(self) -> str:
+        return self.intent.name
+
+    @property
+    def action(self) -> str:
+        return self.intent.action
+
+
+class IntentRouter:
+    """Compiled matcher over an intent table."""
+
+    def __init__(self, table=None, fuzzy: bool = True, min_fuzzy_length: int = 4):
+        self.fuzzy = fuzzy
+        self.min_fuzzy_length = min_fuzzy_length
+        self.patterns: List[Tuple[Tuple[str, ...], Intent, Dict[str, str]]] = []
+        # First words of phrases (their verbs); matched exactly, never fuzzily
+        self.leading_words = set()
+        for entry in (DEFAULT_INTENTS if table is None else table):
+            self._add_entry(entry)
+        self._compile()
+
+    @classmethod
+    def from_file(cls, path: str, fuzzy: bool = True) -> "IntentRouter":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), fuzzy=fuzzy)
+
+    def _add_entry(self, entry):
+        intent = Intent(
+            name=entry["name"],
+            action=entry.get("action", entry["name"]),
+            args=dict(entry.get("args", {})),
+            match=entry.get("match", "contains"),
+        )
+        slots = entry.get("slots", {})
+
+        for phrase in entry["phrases"]:
+            first = phrase.split()[:1]
+            if first and not _SLOT.match(first[0]):
+                self.leading_words.update(tokenize(first[0])[:1])
+            # Expand each {slot} into every synonym of every slot value
+            expansions = [((), {})]
+            for word in phrase.split():
+                slot = _SLOT.match(word)
+                if not slot:
+                    expansions = [(tokens + tuple(tokenize(word)), bound) for tokens, bound in expansions]
+                    continue
+                name = slot.group(1)
+                if name not in slots:
+                    raise ValueError(f"Intent {intent.name!r} uses undefined slot {{{name}}}")
+                expansions = [
+                    (tokens + tuple(tokenize(synonym)), {**bound, name: value})
+                    for tokens, bound in expansions
+                    for value, synonyms in slots[name].items()
+                    for synonym in synonyms
+                ]
+            for tokens, bound in expansions:
+                if tokens:
+                    self.patterns.append((tokens, intent, bound))
+
+    def _compile(self):
+        """Build the word-level Aho-Corasick automaton and the fuzzy vocabulary index."""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for index, (tokens, _, _) in enumerate(self.patterns):
+            state = 0
+            for token in tokens:
+                nxt = self._goto[state].get(token)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][token] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = nxt
+            self._output[state].append(index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+        self.vocabulary = {token for tokens, _, _ in self.patterns for token in tokens}
+        self._deletion_index: Dict[str, List[str]] = {}
+        for word in self.vocabulary - self.leading_words:
+            if len(word) >= self.min_fuzzy_length:
+                for key in _deletions(word) | {word}:
+                    self._deletion_index.setdefault(key, []).append(word)
+
+    def _snap(self, token: str) -> Tuple[str, bool]:
+        """Map a word onto the table vocabulary, allowing one edit (not to the first letter) for longer words."""
+        if token in self.vocabulary or not self.fuzzy or len(token) < self.min_fuzzy_length:
+            return token, False
+        for key in (token, *_deletions(token)):
+            candidates = [word for word in self._deletion_index.get(key, ()) if word[0] == token[0]]
+            if candidates:
+                return min(candidates), True
+        return token, False
+
+    def match(self, text: str) -> Optional[IntentMatch]:
+        """Return the best intent for ``text`` or None if it should go to the LLM."""
+        words = tokenize(text)
+        if not words:
+            return None
+
+        snapped = [self._snap(word) for word in words]
+        tokens = [token for token, _ in snapped]
+
+        best = None
+        state = 0
+        for position, token in enumerate(tokens):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+
+            for index in self._output[state]:
+                pattern, intent, bound = self.patterns[index]
+                start = position + 1 - len(pattern)
+                if intent.match == "exact" and not self._spans_command(tokens, start, position + 1):
+                    continue
+                rank = (intent.match == "exact", len(pattern), -start)
+                if best is None or rank > best[0]:
+                    fuzzy = any(changed for _, changed in snapped[start:position + 1])
+                    best = (rank, IntentMatch(intent, dict(bound), " ".join(pattern), fuzzy))
+
+        return best[1] if best else None
+
+    @staticmethod
+    def _spans_command(tokens, start, end) -> bool:
+        return all(t in LEAD_IN_WORDS for t in tokens[:start]) and all(t in FILLER_WORDS for t in tokens[end:])
+
+
+def load_router(path: Optional[str] = None, fuzzy: bool = True) -> IntentRouter:
+    """Load the intent table from ``path`` if given, falling back to the defaults on error."""
+    if path:
+        try:
+            router = IntentRouter.from_file(path, fuzzy=fuzzy)
+            logger.info(f"Loaded {len(router.patterns)} intent patterns from {path}")
+            return router
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Could not load intents from {path}: {e}. Using defaults.")
+    return IntentRouter(fuzzy=fuzzy)
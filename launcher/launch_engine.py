@@ -0,0 +1,191 @@
+"""Concurrent app launching with readiness probes.
+
+Independent apps are started in parallel; a step only waits for the steps
+named in its ``after``. Instead of sleeping a fixed time after each launch,
+every step is probed until it is actually ready:
+
+- ``exit``:  hand-off commands (``cmd /c start``, ``open -a``, ``xdg-open``)
+  are ready once they exit with status 0
+- ``alive``: directly executed apps are ready once they have survived a
+  short grace period, or have exited 0 after forking into the background
+- ``process_name``: optionally also wait until a process with that image
+  name shows up (window/PID appeared), up to ``timeout``
+"""
+import logging
+import platform
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils import metrics, tracing
+
+logger = logging.getLogger(__name__)
+
+LAUNCH_SECONDS = metrics.histogram(
+    "arc_app_launch_seconds", "Time from starting an app until it was ready", labels=("app", "ok"),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+)
+
+
+@dataclass(frozen=True)
+class LaunchStep:
+    name: str
+    commands: Tuple[Tuple[str, ...], ...]
+    description: str
+    after: Tuple[str, ...] = ()
+    probe: str = "alive"
+    process_name: Optional[str] = None
+    timeout: float = 5.0
+
+
+@dataclass
+class LaunchResult:
+    name: str
+    description: str
+    ok: bool
+    latency: float
+    command: Optional[Tuple[str, ...]] = None
+    detail: str = ""
+
+
+@dataclass
+class LaunchReport:
+    results: List[LaunchResult]
+    total: float
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.results)
+
+
+def process_running(image_name: str) -> bool:
+    """Whether a process with this executable name is running (pgrep / tasklist)."""
+    try:
+        if platform.system() == "Windows":
+            output = subprocess.run(
+                ["tasklist", "/FI", f"IMAGENAME eq {image_name}", "/NH"],
+                capture_output=True, text=True, timeout=2,
+                creationflags=subprocess.CREATE_NO_WINDOW
+            ).stdout
+            return image_name.lower() in output.lower()
+        return subprocess.run(["pgrep", "-x", image_name], capture_output=True, timeout=2).returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+
+class LaunchEngine:
+    """
+    Run launch steps concurrently, honouring ``after`` dependencies.
+
+    Args:
+        popen: Callable taking an argv list and returning a Popen (or None if
+            the command could not be started)
+        grace: Seconds a directly executed app must stay alive to count as ready
+        poll_interval: Seconds between readiness checks
+    """
+
+    def __init__(
+        self,
+        popen: Callable[[List[str]], Optional[subprocess.Popen]],
+        grace: float = 0.2,
+        poll_interval: float = 0.05,
+        max_workers: int = 8
+    ):
+        self.popen = popen
+        self.grace = grace
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="launch")
+
+    def _wait_ready(self, step: LaunchStep, process: subprocess.Popen, started: float) -> Tuple[bool, str]:
+        deadline = started + step.timeout
+        alive_since = started
+
+        while True:
+            code = process.poll()
+            now = time.perf_counter()
+
+            if code is not None and code != 0:
+                return False, f"exited with status {code}"
+
+            launched = (
+                code == 0
+                or (step.probe == "alive" and now - alive_since >= self.grace)
+            )
+            if launched and (not step.process_name or process_running(step.process_name)):
+                return True, "ready"
+
+            if now >= deadline:
+                if step.probe == "alive" and code is None:
+                    return True, "running (readiness probe timed out)"
+                return False, "readiness probe timed out"
+
+            time.sleep(self.poll_interval)
+
+    def _run_step(self, step: LaunchStep, done: Dict[str, threading.Event], trace=None) -> LaunchResult:
+        for dependency in step.after:
+            event = done.get(dependency)
+            if event is not None:
+                event.wait()
+
+        started = time.perf_counter()
+        try:
+            with tracing.span("launch", trace=trace, app=step.name) as span:
+                result = LaunchResult(step.name, step.description, False, 0.0, None, "no command could be started")
+                for command in step.commands:
+                    process = self.popen(list(command))
+                    if process is None:
+                        continue
+                    ok, detail = self._wait_ready(step, process, started)
+                    result = LaunchResult(step.name, step.description, ok, 0.0, command, detail)
+                    break
+                result.latency = time.perf_counter() - started
+                span.set(ok=result.ok, detail=result.detail)
+                return result
+        finally:
+            done[step.name].set()
+
+    @staticmethod
+    def _ordered(steps: Sequence[LaunchStep]) -> List[LaunchStep]:
+        """
+        Order steps so dependencies come first.
+
+        Steps are submitted in this order, so a step waiting on its
+        dependencies never holds a worker they need. Unknown or cyclic
+        dependencies are dropped with a warning.
+        """
+        by_name = {step.name: step for step in steps}
+        ordered, visiting, placed = [], set(), set()
+
+        def visit(step):
+            if step.name in placed:
+                return
+            visiting.add(step.name)
+            kept = []
+            for dependency in step.after:
+                if dependency not in by_name or dependency in visiting:
+                    logger.warning(f"{step.name}: ignoring unknown or cyclic launch dependency {dependency!r}")
+                    continue
+                visit(by_name[dependency])
+                kept.append(dependency)
+            visiting.discard(step.name)
+            placed.add(step.name)
+            ordered.append(step if tuple(kept) == step.after else replace(step, after=tuple(kept)))
+
+        for step in steps:
+            visit(step)
+        return ordered
+
+    def run(self, steps: Sequence[LaunchStep]) -> LaunchReport:
+        """Launch all steps and wait for each to become ready (or fail)."""
+        steps = self._ordered(steps)
+        done = {step.name: threading.Event() for step in steps}
+        started = time.perf_counter()
+        trace = tracing.current_trace()
+        futures = [self._executor.submit(self._run_step, step, done, trace) for step in steps]
+        results = [future.result() for future in futures]
+        for result in results:
+            LAUNCH_SECONDS.labels(app=result.name, ok=str(result.ok).lower()).observe(result.latency)
+        return LaunchReport(results, time.perf_counter() - started)
@@ -0,0 +1,158 @@
+"""Launch plans resolved once, ahead of the launch.
+
+Building a plan resolves every command's executable (``shutil.which`` for
+bare names, an existence check for paths), keeps only the alternatives
+that exist and drops apps that cannot be launched at all. Triggering a
+launch then just runs the plan: no PATH lookups, no existence checks and
+no doomed fork/exec attempts on the hot path.
+
+A plan is immutable. ``PlanWatcher`` rebuilds it in the background only
+when something it was resolved from changes: the PATH variable, the mtime
+of a PATH directory (an app was installed or removed) or a configured
+path.
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Callable, Iterable, Mapping, Optional, Sequence, Tuple
+
+from launcher.launch_engine import LaunchStep
+
+logger = logging.getLogger(__name__)
+
+Fingerprint = Tuple[Tuple[str, Optional[float]], ...]
+
+
+def resolve_executable(name: str) -> Optional[str]:
+    """Absolute path of an executable name or path, or None if it does not exist."""
+    if not name:
+        return None
+    if os.path.isabs(name) or os.sep in name or (os.altsep and os.altsep in name):
+        return name if os.path.exists(name) else None
+    return shutil.which(name)
+
+
+def resolve_step(step: LaunchStep) -> Optional[LaunchStep]:
+    """The step with only its runnable alternatives, argv[0] made absolute; None if none run."""
+    commands = []
+    for command in step.commands:
+        executable = resolve_executable(command[0]) if command else None
+        if executable:
+            commands.append((executable,) + tuple(command[1:]))
+    if not commands:
+        return None
+    return replace(step, commands=tuple(commands))
+
+
+def fingerprint(paths: Iterable[str]) -> Fingerprint:
+    """PATH plus the mtime (None if missing) of every PATH directory and watched path."""
+    search_path = os.environ.get("PATH", "")
+    entries = [("PATH", search_path)] + [
+        (path, None) for path in search_path.split(os.pathsep) if path
+    ] + [(path, None) for path in paths if path]
+
+    result = []
+    for path, value in entries:
+        if path == "PATH":
+            result.append((path, hash(value)))
+            continue
+        try:
+            result.append((path, os.stat(path).st_mtime))
+        except OSError:
+            result.append((path, None))
+    return tuple(result)
+
+
+@dataclass(frozen=True)
+class LaunchPlan:
+    """Resolved steps for "the usual" and for each single app."""
+
+    usual: Tuple[LaunchStep, ...]
+    apps: Mapping[str, LaunchStep]
+    missing: Tuple[str, ...]
+    fingerprint: Fingerprint
+    built_at: float
+
+    @classmethod
+    def build(
+        cls,
+        usual: Sequence[LaunchStep],
+        apps: Mapping[str, LaunchStep],
+        watched_paths: Iterable[str] = ()
+    ) -> "LaunchPlan":
+        # Fingerprint first: a change made while resolving triggers another rebuild
+        stamp = fingerprint(watched_paths)
+        missing = []
+
+        resolved_usual = []
+        for step in usual:
+            resolved = resolve_step(step)
+            if resolved is None:
+                missing.append(step.name)
+            else:
+                resolved_usual.append(resolved)
+
+        resolved_apps = {}
+        for name, step in apps.items():
+            resolved = resolve_step(step)
+            if resolved is not None:
+                resolved_apps[name] = resolved
+
+        if missing:
+            logger.warning(f"Not installed or not found, skipped by 'the usual': {', '.join(missing)}")
+        return cls(
+            tuple(resolved_usual),
+            MappingProxyType(resolved_apps),
+            tuple(missing),
+            stamp,
+            time.time()
+        )
+
+
+class PlanWatcher:
+    """
+    Rebuild the launch plan in the background when its inputs change.
+
+    Args:
+        watched_paths: Callable returning the configured paths the plan depends on
+        rebuild: Callable that builds and installs a new plan
+        current: Callable returning the installed plan
+        interval: Seconds between fingerprint checks
+    """
+
+    def __init__(
+        self,
+        watched_paths: Callable[[], Iterable[str]],
+        rebuild: Callable[[], LaunchPlan],
+        current: Callable[[], LaunchPlan],
+        interval: float = 5.0
+    ):
+        self.watched_paths = watched_paths
+        self.rebuild = rebuild
+        self.current = current
+        self.interval = interval
+        self.rebuilds = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="launch-plan-watcher", daemon=True)
+
+    def start(self) -> "PlanWatcher":
+        if self.interval > 0:
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if fingerprint(self.watched_paths()) != self.current().fingerprint:
+                    logger.info("Launch inputs changed, rebuilding launch plan")
+                    self.rebuild()
+                    self.rebuilds += 1
+            except Exception as e:
+                logger.error(f"Error refreshing launch plan: {e}")
+
+    def stop(self):
+        self._stop.set()
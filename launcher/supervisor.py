@@ -0,0 +1,335 @@
+"""One assistant, several microphones.
+
+``Supervisor`` starts a ``capture_worker`` process per configured input
+device. ``EventDispatcher`` runs in the main process with the single
+launcher, Q&A handler, speech output and recogniser, and receives every
+worker's detections. A loud "Hey Arc" is usually heard in more than one
+room; detections of the same thing within ``DEDUP_WINDOW`` seconds of
+each other are treated as one, and only the loudest room's is acted on.
+"""
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from logging.handlers import QueueListener
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from audio.capture_worker import (
+    CapturedCommand,
+    DetectionEvent,
+    DetectorSettings,
+    WorkerConfig,
+    WorkerExit,
+    capture_worker,
+)
+from launcher.controller import UnifiedController, WAKE_DETECTIONS
+from utils import metrics, tracing
+from utils.tts import LAUNCHING_PHRASE
+from config import (
+    ACTIVE_DURATION,
+    AUDIO_QUEUE_FRAMES,
+    CLAP_INTERVAL,
+    CLAP_THRESHOLD,
+    COMMAND_MAX_DURATION,
+    COMMAND_PREROLL,
+    COMMAND_SILENCE_DURATION,
+    COMMAND_START_TIMEOUT,
+    DEDUP_WINDOW,
+    TRACE_DIR,
+    VAD_ENERGY_THRESHOLD,
+)
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_DETECTIONS = metrics.counter(
+    "arc_duplicate_detections_total", "Detections dropped because another room heard the same thing", labels=("room",)
+)
+# How long workers get to finish after the stop event before they are terminated
+WORKER_STOP_TIMEOUT = 3.0
+
+
+def worker_configs(devices: Sequence[Tuple[str, str]], wake_words, speed: float = 1.0) -> List[WorkerConfig]:
+    """Worker settings for each ``(room, device)`` from the current configuration."""
+    # Replayed sources share one clock so detections in different files line up
+    start_time = time.time()
+    return [
+        WorkerConfig(
+            room=room,
+            device=device,
+            wake_words=list(wake_words),
+            clap_threshold=CLAP_THRESHOLD,
+            clap_interval=CLAP_INTERVAL,
+            active_duration=ACTIVE_DURATION,
+            command_preroll=COMMAND_PREROLL,
+            command_max_duration=COMMAND_MAX_DURATION,
+            command_silence_duration=COMMAND_SILENCE_DURATION,
+            command_start_timeout=COMMAND_START_TIMEOUT,
+            vad_threshold=VAD_ENERGY_THRESHOLD,
+            queue_frames=AUDIO_QUEUE_FRAMES,
+            speed=speed,
+            start_time=start_time,
+        )
+        for room, device in devices
+    ]
+
+
+class _RelayHandler(logging.Handler):
+    """Re-emit a worker's log record through this process's logging setup."""
+
+    def handle(self, record):
+        logging.getLogger(record.name).handle(record)
+        return True
+
+
+class Supervisor:
+    """
+    Start, watch and stop one capture worker process per input.
+
+    Workers are started with ``spawn`` on every platform (it is the only
+    method on Windows, and it avoids forking a process that already runs
+    the logging and speech threads).
+
+    Args:
+        configs: One ``WorkerConfig`` per input
+    """
+
+    def __init__(self, configs: Sequence[WorkerConfig]):
+        if not configs:
+            raise ValueError("At least one audio device is required")
+        self.configs = list(configs)
+        self._context = multiprocessing.get_context("spawn")
+        self.events = self._context.Queue()
+        self._log_queue = self._context.Queue()
+        self._stop = self._context.Event()
+        self._log_listener = QueueListener(self._log_queue, _RelayHandler())
+        # One control queue per worker, for settings changed by a configuration reload
+        self._controls = {config.room: self._context.Queue() for config in self.configs}
+        self.processes: Dict[str, multiprocessing.Process] = {}
+
+    @property
+    def rooms(self) -> List[str]:
+        return [config.room for config in self.configs]
+
+    def start(self) -> "Supervisor":
+        self._log_listener.start()
+        level = logging.getLogger().level
+        for config in self.configs:
+            process = self._context.Process(
+                target=capture_worker,
+                args=(config, self.events, self._log_queue, self._stop, level, self._controls[config.room]),
+                name=f"capture-{config.room}",
+                daemon=True
+            )
+            process.start()
+            self.processes[config.room] = process
+            logger.info(f"Started capture worker for {config.room} ({config.device}), pid {process.pid}")
+        return self
+
+    def configure(self, settings):
+        """Send reloaded clap and active-window settings to every running worker."""
+        message = DetectorSettings(settings.clap_threshold, settings.clap_interval, settings.active_duration)
+        for room, process in self.processes.items():
+            if process.is_alive():
+                self._controls[room].put(message)
+
+    def running(self) -> bool:
+        return any(process.is_alive() for process in self.processes.values())
+
+    def stop(self):
+        self._stop.set()
+        deadline = time.monotonic() + WORKER_STOP_TIMEOUT
+        for room, process in self.processes.items():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"Capture worker for {room} did not stop, terminating it")
+                process.terminate()
+                process.join(1.0)
+        self._log_listener.stop()
+
+
+class EventDispatcher(UnifiedController):
+    """
+    Act once on detections reported by several capture workers.
+
+    Reuses the controller's actions (intents, Q&A, launching, speech and
+    tracing) but has no audio of its own: commands are transcribed from
+    the audio the winning worker captured.
+
+    Events are grouped by kind and action; an event joins a group when its
+    detection time is within ``dedup_window`` seconds of the group's first
+    event. A group is decided ``dedup_window`` seconds after its first event
+    arrives, and the event with the highest energy wins.
+
+    Args:
+        supervisor: Started by ``run``; its workers feed ``supervisor.events``
+        dedup_window: Seconds within which detections count as the same one
+    """
+
+    def __init__(self, supervisor: Supervisor, dedup_window: float = DEDUP_WINDOW):
+        self.supervisor = supervisor
+        self.dedup_window = dedup_window
+        self._init_actions()
+
+        # [decide at (monotonic), events]
+        self._groups: List[list] = []
+        # Command audio by (room, seq): kept until the group is decided
+        self._commands: Dict[Tuple[str, int], CapturedCommand] = {}
+        self._discarded = set()
+        # Winning command event and its trace, until its audio arrives
+        self._awaiting: Optional[Tuple[DetectionEvent, tracing.Trace]] = None
+
+    def _apply_settings(self):
+        super()._apply_settings()
+        # The clap detectors live in the worker processes
+        self.supervisor.configure(self.settings)
+
+    def _add_event(self, event: DetectionEvent):
+        for group in self._groups:
+            first = group[1][0]
+            if (first.kind, first.action) == (event.kind, event.action) and abs(event.time - first.time) <= self.dedup_window:
+                group[1].append(event)
+                return
+        self._groups.append([time.monotonic() + self.dedup_window, [event]])
+
+    def _decide_due_groups(self):
+        now = time.monotonic()
+        due = [group for group in self._groups if group[0] <= now]
+        for group in due:
+            self._groups.remove(group)
+            events = group[1]
+            winner = max(events, key=lambda event: event.energy)
+            duplicates = [event for event in events if event is not winner]
+            for event in duplicates:
+                DUPLICATE_DETECTIONS.labels(room=event.room).inc()
+                if self._commands.pop((event.room, event.seq), None) is None and event.action == "command":
+                    self._discarded.add((event.room, event.seq))
+            if duplicates:
+                heard = ", ".join(f"{event.room} ({event.energy:.0f})" for event in events)
+                logger.info(f"{winner.keyword or winner.kind} heard in {heard}; acting on {winner.room}")
+            self._dispatch(winner, len(events))
+
+    def _next_timeout(self) -> float:
+        if not self._groups:
+            return 0.1
+        return max(0.0, min(group[0] for group in self._groups) - time.monotonic())
+
+    def _dispatch(self, event: DetectionEvent, heard_in: int):
+        """Run the action for the winning detection, like ``_on_wake_word`` does for one microphone."""
+        if event.kind == "clap":
+            trace = tracing.start_trace("interaction", trigger="double_clap", room=event.room, heard_in=heard_in)
+            print(f"👏 Double clap in {event.room}")
+            self._launch_apps_in_background()
+            self._finish_interaction(trace)
+            return
+
+        WAKE_DETECTIONS.labels(keyword=event.keyword, action=event.action).inc()
+        trace = tracing.start_trace(
+            "interaction", trigger="wake_word", keyword=event.keyword, action=event.action,
+            room=event.room, heard_in=heard_in
+        )
+        if event.action == "cancel":
+            print(f"🤫 {event.keyword} ({event.room}): stopping speech")
+            self.tts.flush()
+        elif event.action == "launch":
+            print(f"✨ {event.keyword} detected in {event.room}!")
+            self.tts.say(LAUNCHING_PHRASE)
+            self._launch_apps_in_background()
+        else:
+            print(f"✨ Wake word detected in {event.room}!")
+            print("🎤 Listening for command...")
+            if self._awaiting is not None:
+                # The previous command's audio never arrived (its worker is stuck or gone)
+                stale, stale_trace = self._awaiting
+                self._discarded.add((stale.room, stale.seq))
+                self._finish_interaction(stale_trace)
+            self._awaiting = (event, trace)
+            captured = self._commands.pop((event.room, event.seq), None)
+            if captured is not None:
+                self._on_command_audio(captured)
+            return
+        self._finish_interaction(trace)
+
+    def _on_command_audio(self, captured: CapturedCommand):
+        key = (captured.room, captured.seq)
+        if key in self._discarded:
+            self._discarded.discard(key)
+            return
+        if self._awaiting is None or (self._awaiting[0].room, self._awaiting[0].seq) != key:
+            # Its group has not been decided yet
+            self._commands[key] = captured
+            return
+
+        event, trace = self._awaiting
+        self._awaiting = None
+        with tracing.activate(trace):
+            command = self.transcribe(captured.audio, captured.sample_rate, captured.frame_length)
+            if command:
+                self.handle_command(command)
+        self._finish_interaction(trace)
+
+    def _on_worker_exit(self, message: WorkerExit):
+        logger.info(f"Capture worker for {message.room} stopped ({message.reason}): {message.stats}")
+        if message.reason != "source finished" and message.reason != "stopped":
+            print(f"❌ Capture worker for {message.room} stopped: {message.reason}")
+        if self._awaiting is not None and self._awaiting[0].room == message.room:
+            # The command's audio is not coming
+            self._finish_interaction(self._awaiting[1])
+            self._awaiting = None
+
+    def run(self, on_listening=None):
+        """
+        Start the workers and dispatch their detections until all of them stop.
+
+        Args:
+            on_listening: Optional callback invoked once the workers are started
+        """
+        exited = set()
+        try:
+            self.supervisor.start()
+            print(f"🎧 Listening in {', '.join(self.supervisor.rooms)}...\n")
+            if on_listening:
+                on_listening()
+
+            while True:
+                try:
+                    message = self.supervisor.events.get(timeout=self._next_timeout())
+                except queue.Empty:
+                    message = None
+                    if not self._groups and (
+                        len(exited) == len(self.supervisor.configs) or not self.supervisor.running()
+                    ):
+                        break
+
+                try:
+                    if self.config_watcher.version != self._settings_version:
+                        self._apply_settings()
+                    if isinstance(message, DetectionEvent):
+                        self._add_event(message)
+                    elif isinstance(message, CapturedCommand):
+                        self._on_command_audio(message)
+                    elif isinstance(message, WorkerExit):
+                        exited.add(message.room)
+                        self._on_worker_exit(message)
+                    self._decide_due_groups()
+                except Exception as e:
+                    logger.error(f"Error dispatching detection: {e}")
+                    print(f"❌ Error: {e}")
+
+            print("📼 All capture workers finished")
+        except KeyboardInterrupt:
+            print("\n👋 Shutting down...")
+        except Exception as e:
+            logger.error(f"Fatal error in dispatcher: {e}")
+            print(f"❌ Fatal error: {e}")
+        finally:
+            self.config_watcher.stop()
+            self.supervisor.stop()
+            self.tts.close()
+            self.qa_handler.close()
+            if self.qa_handler.cache is not None:
+                logger.info(f"Answer cache stats: {self.qa_handler.cache_stats()}")
+            if TRACE_DIR and tracing.TRACER.recent():
+                path = tracing.TRACER.export(os.path.join(TRACE_DIR, "last-interactions.json"))
+                logger.info(f"Wrote the last {len(tracing.TRACER.recent())} interaction traces to {path}")
+            print("✅ Capture workers stopped")
@@ -1,23 +1,51 @@
+import time
+
+# Taken first so the startup report covers module imports too
+_STARTED = time.perf_counter()
+
+import os
 import sys
 import logging
+import threading
 from pathlib import Path
 
-# Setup logging
-logging.basicConfig(
+from utils.log import setup_logging
+
+# Setup logging (before config is imported, so configuration errors are logged).
+# Log calls are queued and written by a background thread, rotated files are gzipped,
+# and repeated messages from one call site are rate-limited.
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass  # reported below when config is imported
+setup_logging(
+    Path(__file__).parent / 'arc_assist.log',
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(Path(__file__).parent / 'arc_assist.log'),
-        logging.StreamHandler()
-    ]
+    max_bytes=int(os.getenv("LOG_MAX_BYTES", str(5 * 1024 * 1024))),
+    backups=int(os.getenv("LOG_BACKUPS", "5")),
+    rate_interval=float(os.getenv("LOG_RATE_LIMIT_INTERVAL", "5")),
+    rate_burst=int(os.getenv("LOG_RATE_LIMIT_BURST", "5"))
 )
 logger = logging.getLogger(__name__)
 
 try:
-    from audio.wake_word import WakeWordDetector
+    from audio.wake_word import WakeWord, WakeWordDetector, parse_wake_words
     from audio.clap_detector import ClapDetector
     from launcher.controller import UnifiedController
-    from config import DEFAULT_WAKE_WORD, CLAP_THRESHOLD, CLAP_INTERVAL
+    from utils.metrics import MetricsExporters
+    from utils.startup import StartupProfile, import_breakdown
+    from config import (
+        DEFAULT_WAKE_WORD,
+        WAKE_WORDS,
+        AUDIO_DEVICES,
+        CLAP_THRESHOLD,
+        CLAP_INTERVAL,
+        STARTUP_BUDGET_MS,
+        METRICS_PORT,
+        METRICS_SNAPSHOT_PATH,
+        METRICS_SNAPSHOT_INTERVAL,
+    )
 except ImportError as e:
     logger.error(f"Failed to import required modules: {e}")
     print(f"❌ Import Error: {e}")
@@ -28,18 +56,37 @@ except ValueError as e:
     print("Please check your .env file and ensure all required variables are set.")
     sys.exit(1)
 
+def _get_arg_value(name, default=None):
+    """Return the value following ``name`` on the command line, if present."""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+        raise ValueError(f"{name} requires a value")
+    return default
+
 def main():
     """Main entry point for Arc Assist."""
     try:
+        profile = StartupProfile(STARTUP_BUDGET_MS, started=_STARTED)
+        profile.mark("imports")
         debug = "--debug" in sys.argv
+        # Print where startup time went once listening, checked against STARTUP_BUDGET_MS
+        startup_report = "--startup-report" in sys.argv
+        # Replay a WAV/raw file or synthetic script instead of the microphone
+        source_spec = _get_arg_value("--source")
+        speed = float(_get_arg_value("--speed", "1"))
+        # Several inputs (devices or replay sources), one capture process each
+        devices_spec = _get_arg_value("--devices", AUDIO_DEVICES)
         
         if debug:
             logging.getLogger().setLevel(logging.DEBUG)
             logger.debug("Debug mode enabled")
         
         # Validate configuration
-        if not DEFAULT_WAKE_WORD:
-            raise ValueError("DEFAULT_WAKE_WORD is not configured")
+        wake_words = parse_wake_words(WAKE_WORDS) if WAKE_WORDS else [WakeWord(DEFAULT_WAKE_WORD)]
+        if not wake_words or not wake_words[0].keyword:
+            raise ValueError("No wake word configured (set WAKE_WORD_PATH or WAKE_WORDS)")
         
         if CLAP_THRESHOLD <= 0:
             raise ValueError(f"CLAP_THRESHOLD must be positive, got {CLAP_THRESHOLD}")
@@ -48,18 +95,61 @@ def main():
             raise ValueError(f"CLAP_INTERVAL must be positive, got {CLAP_INTERVAL}")
         
         logger.info("Initializing Arc Assist...")
-        
-        # Initialize detectors
-        logger.info(f"Loading wake word from: {DEFAULT_WAKE_WORD}")
-        detector = WakeWordDetector(DEFAULT_WAKE_WORD)
-        
-        logger.info("Initializing clap detector...")
-        clap = ClapDetector(CLAP_THRESHOLD, CLAP_INTERVAL, debug)
+        for wake_word in wake_words:
+            logger.info(f"Loading wake word: {wake_word.keyword} ({wake_word.action}, sensitivity {wake_word.sensitivity})")
+
+        if devices_spec:
+            # Each capture worker loads its own wake word engine and clap detector
+            from audio.capture_worker import parse_devices
+            from launcher.supervisor import EventDispatcher, Supervisor, worker_configs
+            devices = parse_devices(devices_spec)
+            if not devices:
+                raise ValueError("AUDIO_DEVICES / --devices lists no devices")
+            logger.info(f"Starting capture workers for {', '.join(room for room, _ in devices)}...")
+            controller = EventDispatcher(Supervisor(worker_configs(devices, wake_words, speed)))
+            profile.mark("controller")
+        else:
+            # Initialize detectors
+            detector = WakeWordDetector(wake_words)
+            profile.mark("wake word engine")
+
+            logger.info("Initializing clap detector...")
+            clap = ClapDetector(CLAP_THRESHOLD, CLAP_INTERVAL, debug)
+
+            audio_source = None
+            if source_spec:
+                from audio.sources import open_source
+                logger.info(f"Replaying audio from {source_spec} at {speed or 'max'}x")
+                audio_source = open_source(
+                    source_spec,
+                    detector.sample_rate,
+                    detector.frame_length,
+                    speed
+                )
+
+            # Initialize and run controller
+            logger.info("Starting unified controller...")
+            controller = UnifiedController(detector, clap, audio_source)
+            profile.mark("controller")
+
+        def on_listening():
+            elapsed = profile.mark("listening")
+            logger.info(f"Listening {elapsed:.0f} ms after start")
+            if startup_report:
+                # The import breakdown runs a fresh interpreter; keep it off the audio loop
+                threading.Thread(
+                    target=lambda: profile.report(import_breakdown("main")),
+                    name="startup-report",
+                    daemon=True
+                ).start()
+            elif profile.over_budget:
+                logger.warning(f"Startup took {elapsed:.0f} ms, over the {STARTUP_BUDGET_MS} ms budget")
 
-        # Initialize and run controller
-        logger.info("Starting unified controller...")
-        controller = UnifiedController(detector, clap)
-        controller.run()
+        exporters = MetricsExporters(METRICS_PORT, METRICS_SNAPSHOT_PATH, METRICS_SNAPSHOT_INTERVAL)
+        try:
+            controller.run(on_listening)
+        finally:
+            exporters.stop()
         
     except ValueError as e:
         logger.error(f"Configuration validation error: {e}")
@@ -0,0 +1,111 @@
+"""HTTP requests that another thread can abort before the server answers.
+
+``requests`` hands back no connection until the response headers arrive,
+so a hedged Q&A request that lost the race would hold its thread and its
+connection until the server answered or the timeout hit. Requests sent
+through ``AbortableAdapter`` while an ``Attempt`` is active on the thread
+record the connection they use; ``Attempt.abort`` shuts its socket down,
+and the blocked read fails at once.
+
+Imported lazily, like ``requests`` itself.
+"""
+import socket
+import threading
+from contextlib import contextmanager
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+_current = threading.local()
+
+
+def _shutdown(connection):
+    sock = getattr(connection, "sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class Attempt:
+    """One request's connection, for aborting it from another thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connection = None
+        self.aborted = False
+
+    def _attach(self, connection):
+        with self._lock:
+            self._connection = connection
+            if self.aborted:
+                _shutdown(connection)
+
+    @contextmanager
+    def active(self):
+        """Track the connection of requests sent on this thread until the block ends.
+
+        End the block once the response headers are in: after that the
+        connection may go back to the pool and serve someone else.
+        """
+        _current.attempt = self
+        try:
+            yield self
+        finally:
+            _current.attempt = None
+            with self._lock:
+                self._connection = None
+
+    def abort(self):
+        """Fail the request now if it is waiting on the server, or as soon as it sends."""
+        with self._lock:
+            self.aborted = True
+            if self._connection is not None:
+                _shutdown(self._connection)
+
+
+def _attach_current(connection):
+    attempt = getattr(_current, "attempt", None)
+    if attempt is not None:
+        attempt._attach(connection)
+
+
+class _HTTPConnection(HTTPConnection):
+    def connect(self):
+        super().connect()
+        # A new connection has no socket when it is checked out
+        _attach_current(self)
+
+
+class _HTTPSConnection(HTTPSConnection):
+    def connect(self):
+        super().connect()
+        _attach_current(self)
+
+
+class _HTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _HTTPConnection
+
+    def _get_conn(self, timeout=None):
+        connection = super()._get_conn(timeout)
+        _attach_current(connection)
+        return connection
+
+
+class _HTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _HTTPSConnection
+
+    def _get_conn(self, timeout=None):
+        connection = super()._get_conn(timeout)
+        _attach_current(connection)
+        return connection
+
+
+class AbortableAdapter(HTTPAdapter):
+    """``HTTPAdapter`` whose connections can be aborted through an active ``Attempt``."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _HTTPConnectionPool, "https": _HTTPSConnectionPool}
@@ -0,0 +1,158 @@
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION = re.compile(r"[^\w\s']")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivially different phrasings share a key."""
+    text = _PUNCTUATION.sub(" ", question.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class AnswerCache:
+    """
+    Two-tier answer cache: an in-memory LRU in front of a SQLite file.
+
+    Keys combine the normalized question with the model and system prompt,
+    so changing either never serves a stale answer. Every entry has a TTL;
+    the memory tier is bounded by entry count and the disk tier by
+    ``max_entries``, evicting least recently used entries first.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        ttl: float = 86400,
+        max_entries: int = 5000,
+        memory_entries: int = 256
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        if path:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS answers ("
+                    "key TEXT PRIMARY KEY, answer TEXT NOT NULL, "
+                    "expires REAL NOT NULL, used REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS answers_used ON answers (used)")
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Answer cache disk tier disabled ({path}): {e}")
+                self._db = None
+
+    @staticmethod
+    def make_key(question: str, model: str, system_prompt: str) -> str:
+        raw = "\x1f".join((normalize_question(question), model, system_prompt))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                answer, expires = entry
+                if expires > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return answer
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT answer, expires FROM answers WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    answer, expires = row
+                    if expires > now:
+                        self._db.execute("UPDATE answers SET used = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, answer, expires)
+                        self.hits += 1
+                        return answer
+                    self._db.execute("DELETE FROM answers WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, answer: str, ttl: Optional[float] = None):
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, answer, expires)
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO answers (key, answer, expires, used) VALUES (?, ?, ?, ?)",
+                    (key, answer, expires, now)
+                )
+                self._evict_disk(now)
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Answer cache write failed: {e}")
+
+    def _remember(self, key, answer, expires):
+        self._memory[key] = (answer, expires)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _evict_disk(self, now):
+        expired = self._db.execute("DELETE FROM answers WHERE expires <= ?", (now,)).rowcount
+        overflow = self._db.execute("SELECT COUNT(*) FROM answers").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM answers WHERE key IN "
+                "(SELECT key FROM answers ORDER BY used LIMIT ?)",
+                (overflow,)
+            )
+        self.evictions += max(expired, 0) + max(overflow, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            disk_entries = (
+                self._db.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+                if self._db is not None else 0
+            )
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
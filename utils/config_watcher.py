@@ -0,0 +1,127 @@
+"""Reload settings from the ``.env`` file while the assistant runs.
+
+``ConfigWatcher`` checks the file's modification time every ``interval``
+seconds on a daemon thread, a single ``stat`` call. When the file changes
+it applies the variables whose values changed in the file to the process
+environment, so variables set in the shell stay in force until their line
+in the file is edited. It then builds a new settings object with ``load``.
+Invalid values are reported and the previous settings stay in place.
+
+A successfully loaded object is published by replacing ``current`` and
+then bumping ``version``. Consumers compare ``version`` with the last one
+they applied (one integer comparison, cheap enough for every audio frame)
+and apply ``current`` from their own thread, between frames::
+
+    if watcher.version != applied:
+        applied = watcher.version
+        apply(watcher.current)
+"""
+import logging
+import os
+import threading
+from typing import Callable, Dict, FrozenSet, Generic, Iterable, Optional, TypeVar
+
+from dotenv import dotenv_values
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ConfigWatcher(Generic[T]):
+    """
+    Poll ``path`` and publish a freshly loaded settings object when it changes.
+
+    Args:
+        path: The ``.env`` file to watch (it may not exist yet)
+        load: Builds and validates settings from the environment. Called
+            with the variables that changed (empty at startup); raises
+            ``ValueError`` on invalid values
+        interval: Seconds between modification-time checks
+        reloadable: Variables ``load`` reads; a change to any other variable
+            is reported as needing a restart
+    """
+
+    def __init__(self, path, load: Callable[[FrozenSet[str]], T], interval: float = 2.0, reloadable: Iterable[str] = ()):
+        self.path = str(path)
+        self.load = load
+        self.interval = interval
+        self.reloadable = frozenset(reloadable)
+        self.current: T = load(frozenset())
+        self.version = 0
+        self.reloads = 0
+        self.errors = 0
+        self._stamp = self._file_stamp()
+        self._values = self._read_values()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+
+    def start(self) -> "ConfigWatcher[T]":
+        if self.interval > 0:
+            self._thread.start()
+        return self
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_values(self) -> Dict[str, Optional[str]]:
+        if not os.path.exists(self.path):
+            return {}
+        return dict(dotenv_values(self.path))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            stamp = self._file_stamp()
+            if stamp == self._stamp:
+                continue
+            self._stamp = stamp
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Error reloading {self.path}: {e}")
+
+    def reload(self) -> bool:
+        """Re-read the file now; returns True if new settings were published."""
+        values = self._read_values()
+        changed = {key for key in values.keys() | self._values.keys() if values.get(key) != self._values.get(key)}
+        if not changed:
+            return False
+
+        previous_env = {key: os.environ.get(key) for key in changed}
+        for key in changed:
+            if values.get(key) is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = values[key]
+
+        try:
+            settings = self.load(frozenset(changed))
+        except ValueError as e:
+            # Put the environment back so the running settings and the environment agree
+            for key, value in previous_env.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+            self.errors += 1
+            logger.error(f"Not reloading {self.path}: {e}")
+            return False
+
+        self._values = values
+        restart = sorted(changed - self.reloadable)
+        if restart:
+            logger.warning(f"Changed in {self.path} but only applied after a restart: {', '.join(restart)}")
+        if changed & self.reloadable or not self.reloadable:
+            self.current = settings
+            self.version += 1
+            self.reloads += 1
+            logger.info(f"Reloaded {self.path}: {', '.join(sorted(changed & self.reloadable or changed))}")
+            return True
+        return False
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,130 @@
+"""Local stand-in for an OpenAI-compatible chat completions endpoint.
+
+Serves ``POST /v1/chat/completions`` (plain JSON or ``stream: true``
+server-sent events) and ``GET /v1/models`` so Q&A features can be exercised
+without an API key or network. Behaviour is picked per request from the
+model name:
+
+- ``...slow...``   waits ``--slow-delay`` seconds before answering
+- ``...error...``  answers HTTP 500
+- ``...limit...``  answers HTTP 429
+- ``...break...``  drops the connection halfway through a streamed answer
+- anything else    answers normally
+
+Usage:
+    python -m utils.llm_stub_server --port 8089
+    LLM_API_KEY=stub LLM_API_BASE=http://127.0.0.1:8089/v1 python main.py
+"""
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_ANSWER = (
+    "Arc here, answering from the local stub server. "
+    "Every sentence is streamed a few words at a time. "
+    "That is all for now."
+)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    answer = DEFAULT_ANSWER
+    token_delay = 0.02
+    slow_delay = 5.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"data": [{"id": "stub"}]})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": "not found"})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        model = request.get("model", "")
+
+        if "slow" in model:
+            time.sleep(self.slow_delay)
+        if "error" in model:
+            self._send_json(500, {"error": f"{model} failed"})
+            return
+        if "limit" in model:
+            self._send_json(429, {"error": "rate limited"})
+            return
+
+        answer = self.answer
+        if request.get("messages", [{}])[-1].get("role") == "user" and len(request.get("messages", [])) > 2:
+            answer = "Continuing where the last model stopped."
+
+        if not request.get("stream"):
+            self._send_json(200, {
+                "model": model,
+                "choices": [{"message": {"role": "assistant", "content": answer}}],
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        words = answer.split(" ")
+        for i, word in enumerate(words):
+            if "break" in model and i == len(words) // 2:
+                self.wfile.flush()
+                self.close_connection = True
+                return
+            chunk = {"choices": [{"delta": {"content": word + (" " if i < len(words) - 1 else "")}}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(self.token_delay)
+
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def serve(host="127.0.0.1", port=8089, token_delay=0.02, slow_delay=5.0, answer=None):
+    """Start the stub server in the current thread and return the server object once bound."""
+    StubHandler.token_delay = token_delay
+    StubHandler.slow_delay = slow_delay
+    if answer:
+        StubHandler.answer = answer
+    return ThreadingHTTPServer((host, port), StubHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Seconds between streamed words")
+    parser.add_argument("--slow-delay", type=float, default=5.0, help="Delay for models named *slow*")
+    parser.add_argument("--answer", help="Answer text to return")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.token_delay, args.slow_delay, args.answer)
+    print(f"🧪 LLM stub listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
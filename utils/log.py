@@ -0,0 +1,174 @@
+"""Non-blocking logging setup.
+
+Log calls only format the record and put it on a queue; a background
+``QueueListener`` thread does the file and console I/O, so the audio loop
+never waits on disk or terminal writes. The log file rotates by size and
+rotated files are gzip-compressed.
+
+Records pass a per-call-site ``RateLimitFilter`` before they are queued:
+repeats of the same message from the same line, and bursts beyond a few
+records per interval, are counted instead of written, and the count is
+attached to the next record that gets through ("suppressed 4,812
+identical messages"). A persistent fault in a tight loop therefore costs
+one log line per interval.
+"""
+import atexit
+import gzip
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional, Tuple
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drop repeated and excessive records per call site (file and line).
+
+    Args:
+        interval: Window in seconds; identical messages are written at most
+            once per window
+        burst: Records per call site allowed in one window
+    """
+
+    def __init__(self, interval: float = 5.0, burst: int = 5):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self._sites: Dict[Tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.interval <= 0:
+            return True
+
+        now = time.monotonic()
+        message = record.getMessage()
+        key = (record.pathname, record.lineno)
+
+        with self._lock:
+            # [window start, records in window, last message, last written at, identical, limited]
+            site = self._sites.get(key)
+            if site is None:
+                site = self._sites[key] = [now, 0, None, 0.0, 0, 0]
+            if now - site[0] >= self.interval:
+                site[0], site[1] = now, 0
+
+            if message == site[2] and now - site[3] < self.interval:
+                site[4] += 1
+                return False
+            if site[1] >= self.burst:
+                site[5] += 1
+                return False
+
+            identical, limited = site[4], site[5]
+            site[1] += 1
+            site[2], site[3] = message, now
+            site[4] = site[5] = 0
+
+        if identical or limited:
+            notes = []
+            if identical:
+                notes.append(f"{identical:,} identical")
+            if limited:
+                notes.append(f"{limited:,} rate-limited")
+            record.msg = f"{message} (suppressed {' and '.join(notes)} messages)"
+            record.args = None
+        return True
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Queue handler that never blocks: when the writer falls behind, records are dropped and counted."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _gzip_namer(name: str) -> str:
+    return f"{name}.gz"
+
+
+def _gzip_rotator(source: str, dest: str):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[_DroppingQueueHandler] = None
+
+
+def setup_logging(
+    log_path,
+    level: int = logging.INFO,
+    max_bytes: int = 5 * 1024 * 1024,
+    backups: int = 5,
+    rate_interval: float = 5.0,
+    rate_burst: int = 5,
+    queue_size: int = 10000
+) -> QueueListener:
+    """
+    Route all logging through a queue to a rotating, gzip-compressing file and the console.
+
+    Args:
+        log_path: Log file path
+        level: Root logger level
+        max_bytes: Rotate the file at this size (0 disables rotation)
+        backups: Number of compressed rotated files to keep
+        rate_interval: Per-call-site rate-limit window in seconds (0 disables)
+        rate_burst: Records per call site allowed per window
+        queue_size: Records buffered for the writer before new ones are dropped
+
+    Returns:
+        The running listener (stopped automatically at exit)
+    """
+    global _listener, _queue_handler
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+    file_handler.namer = _gzip_namer
+    file_handler.rotator = _gzip_rotator
+    console_handler = logging.StreamHandler()
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+
+    queue_handler = _DroppingQueueHandler(queue.Queue(queue_size))
+    queue_handler.addFilter(RateLimitFilter(rate_interval, rate_burst))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    _queue_handler = queue_handler
+
+    if _listener is not None:
+        _listener.stop()
+    _listener = QueueListener(queue_handler.queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Write out everything still queued and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        if _queue_handler is not None and _queue_handler.dropped:
+            logging.getLogger(__name__).warning(
+                f"Dropped {_queue_handler.dropped:,} log records because the log writer fell behind"
+            )
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,342 @@
+"""In-process metrics: counters, gauges and fixed-bucket histograms.
+
+Updates are a dict lookup plus a locked add, cheap enough for the
+per-frame loop. Metrics are created once at module level with
+``counter``/``gauge``/``histogram`` and read out either over HTTP in the
+Prometheus text format (``MetricsServer``) or as a JSON file written
+periodically (``SnapshotWriter``)::
+
+    FRAMES = metrics.counter("arc_frames_total", "Audio frames processed")
+    LATENCY = metrics.histogram("arc_stt_seconds", "STT latency", buckets=(0.1, 0.5, 1, 2))
+
+    FRAMES.inc()
+    LATENCY.observe(0.42)
+    metrics.histogram(...).labels(model="gpt-4o-mini").observe(1.3)
+"""
+import json
+import logging
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; suits network and speech latencies
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _CounterValue:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeValue(_CounterValue):
+    __slots__ = ()
+
+    def set(self, value: float):
+        self.value = value
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+
+class _HistogramValue:
+    __slots__ = ("upper_bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def cumulative(self):
+        """(upper bound, observations <= bound) pairs ending with +Inf."""
+        total = 0
+        for bound, count in zip(self.upper_bounds + (math.inf,), self.counts):
+            total += count
+            yield bound, total
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        # Unlabelled metrics are updated directly through a single child
+        self._default = None if self.labelnames else self.labels()
+
+    def _new_value(self):
+        raise NotImplementedError
+
+    def labels(self, **labels):
+        """The child for one combination of label values (created on first use)."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_value())
+        return child
+
+    def children(self):
+        return [(dict(zip(self.labelnames, key)), child) for key, child in list(self._children.items())]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_value(self):
+        return _CounterValue()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_value(self):
+        return _GaugeValue()
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.upper_bounds = tuple(sorted(buckets))
+        super().__init__(name, help, labels)
+
+    def _new_value(self):
+        return _HistogramValue(self.upper_bounds)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+
+def _format_labels(labels: Dict[str, str], extra: Optional[Dict[str, str]] = None) -> str:
+    merged = {**labels, **(extra or {})}
+    if not merged:
+        return ""
+    pairs = []
+    for key, value in merged.items():
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """Named metrics, rendered together for scraping or snapshots."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labels=labels)
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labels=labels)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labels=labels, buckets=buckets)
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, child in metric.children():
+                if metric.kind != "histogram":
+                    lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(child.value)}")
+                    continue
+                for bound, total in child.cumulative():
+                    le = {"le": _format_value(bound)}
+                    lines.append(f"{metric.name}_bucket{_format_labels(labels, le)} {total}")
+                lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_value(child.sum)}")
+                lines.append(f"{metric.name}_count{_format_labels(labels)} {child.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict:
+        """All metrics as a JSON-serialisable dict."""
+        metrics = {}
+        for metric in list(self._metrics.values()):
+            values = []
+            for labels, child in metric.children():
+                if metric.kind != "histogram":
+                    values.append({"labels": labels, "value": child.value})
+                    continue
+                values.append({
+                    "labels": labels,
+                    "count": child.count,
+                    "sum": round(child.sum, 6),
+                    "mean": round(child.sum / child.count, 6) if child.count else None,
+                    "buckets": {_format_value(bound): total for bound, total in child.cumulative()},
+                })
+            metrics[metric.name] = {"type": metric.kind, "help": metric.help, "values": values}
+        return {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "metrics": metrics}
+
+
+REGISTRY = MetricsRegistry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+
+
+class MetricsServer:
+    """
+    Serve ``/metrics`` in the Prometheus text format from a daemon thread.
+
+    Args:
+        registry: Registry to expose
+        port: TCP port (bound to ``host`` only, localhost by default)
+        host: Interface to bind
+    """
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, port: int = 9464, host: str = "127.0.0.1"):
+        registry_ref = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry_ref.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(f"metrics {self.address_string()} {format % args}")
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        logger.info(f"Serving metrics on http://{self.server.server_address[0]}:{self.port}/metrics")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SnapshotWriter:
+    """
+    Write ``registry.snapshot()`` to a JSON file every ``interval`` seconds.
+
+    The file is replaced atomically, so readers never see a partial write.
+    A final snapshot is written on ``stop``.
+    """
+
+    def __init__(self, path: str, interval: float = 30.0, registry: MetricsRegistry = REGISTRY):
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-snapshot", daemon=True)
+
+    def start(self) -> "SnapshotWriter":
+        self._thread.start()
+        return self
+
+    def write(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.registry.snapshot(), f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                logger.error(f"Could not write metrics snapshot to {self.path}: {e}")
+
+    def stop(self):
+        self._stop.set()
+        try:
+            self.write()
+        except OSError as e:
+            logger.error(f"Could not write metrics snapshot to {self.path}: {e}")
+
+
+class MetricsExporters:
+    """The configured exporters, started and stopped together."""
+
+    def __init__(self, port: int = 0, snapshot_path: str = "", snapshot_interval: float = 30.0):
+        self.server = None
+        self.snapshots = None
+        if port:
+            try:
+                self.server = MetricsServer(port=port).start()
+            except OSError as e:
+                logger.error(f"Could not start metrics endpoint on port {port}: {e}")
+        if snapshot_path:
+            self.snapshots = SnapshotWriter(snapshot_path, snapshot_interval).start()
+
+    def stop(self):
+        if self.server is not None:
+            self.server.stop()
+        if self.snapshots is not None:
+            self.snapshots.stop()
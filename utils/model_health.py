@@ -0,0 +1,289 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Weight of the newest request in the latency and error-rate averages
+ALPHA = 0.3
+RECENT_STATUSES = 10
+
+BREAKER_TRIPS = metrics.counter(
+    "arc_llm_breaker_trips_total", "Times a model's circuit breaker opened", labels=("model",)
+)
+BREAKER_SKIPS = metrics.counter(
+    "arc_llm_breaker_skips_total", "Questions that skipped a model because its breaker was open", labels=("model",)
+)
+EXPECTED_SECONDS = metrics.gauge(
+    "arc_llm_expected_seconds", "Expected time to an answer per model, used to order them", labels=("model",)
+)
+
+
+class ModelStats:
+    """Running health of one model."""
+
+    def __init__(self):
+        self.latency: Optional[float] = None  # EWMA of successful request seconds
+        self.failure_seconds: Optional[float] = None  # EWMA of seconds lost on failed requests
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.statuses = deque(maxlen=RECENT_STATUSES)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.cooldown = 0.0
+
+    @property
+    def expected_seconds(self) -> Optional[float]:
+        """Success latency plus the time a failure costs, weighted by how often it fails."""
+        if self.latency is None:
+            return None
+        return self.latency + self.error_rate * (self.failure_seconds or 0.0)
+
+    def to_dict(self) -> dict:
+        return {
+            "latency": self.latency,
+            "failure_seconds": self.failure_seconds,
+            "error_rate": self.error_rate,
+            "requests": self.requests,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "statuses": list(self.statuses),
+            "state": self.state,
+            "opened_at": self.opened_at,
+            "cooldown": self.cooldown,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ModelStats":
+        stats = cls()
+        stats.latency = data.get("latency")
+        stats.failure_seconds = data.get("failure_seconds")
+        stats.error_rate = float(data.get("error_rate", 0.0))
+        stats.requests = int(data.get("requests", 0))
+        stats.failures = int(data.get("failures", 0))
+        stats.consecutive_failures = int(data.get("consecutive_failures", 0))
+        stats.statuses.extend(data.get("statuses", []))
+        stats.state = data.get("state", CLOSED)
+        stats.opened_at = float(data.get("opened_at", 0.0))
+        stats.cooldown = float(data.get("cooldown", 0.0))
+        return stats
+
+
+class ModelHealth:
+    """
+    Per-model latency, error rate and circuit breakers for the Q&A fallback chain.
+
+    Every request is recorded with its duration and status (an HTTP code,
+    ``timeout`` or ``error``). ``order`` returns the configured models
+    fastest first by expected time to an answer, without the ones whose
+    breaker is open. A breaker opens after ``failure_threshold`` failures in
+    a row, or at once on HTTP 429. After ``cooldown`` seconds the model is
+    let back in for a probe, behind every model whose breaker is closed, so
+    a model that was timing out is never a question's first attempt. It is
+    asked when the models ahead of it fail, or when hedging reaches it. If
+    the probe succeeds the breaker closes. If it fails, the breaker opens
+    again with the cooldown doubled, up to ``max_cooldown``.
+
+    Models never asked yet go first, in configured order, so each one is
+    measured once (on a fresh start that is the primary model). Models that
+    have only ever failed go last. Stats are saved as JSON to ``path`` at
+    most every ``save_interval`` seconds after a request changed them (from
+    a timer thread, so no question waits on the disk) and by ``close``, and
+    loaded on start, so a model that failed all afternoon is not retried
+    first after a restart.
+
+    Args:
+        path: JSON file for the stats across restarts (None keeps them in memory)
+        failure_threshold: Consecutive failures that open a model's breaker
+        cooldown: Seconds before an open breaker lets a probe through
+        max_cooldown: Upper bound for the cooldown after repeated failed probes
+        save_interval: Seconds between a change and the save that writes it
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        failure_threshold: int = 3,
+        cooldown: float = 60.0,
+        max_cooldown: float = 900.0,
+        save_interval: float = 30.0
+    ):
+        self.path = path
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max(cooldown, max_cooldown)
+        self.save_interval = save_interval
+        self._stats: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+        # Serialises writers of the file; never held together with _lock's critical sections
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            data = json.loads(Path(self.path).read_text())
+            self._stats = {model: ModelStats.from_dict(entry) for model, entry in data.get("models", {}).items()}
+            logger.debug(f"Loaded model health for {len(self._stats)} models from {self.path}")
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable model health file {self.path}: {e}")
+
+    def _schedule_save(self):
+        """Mark the stats changed and start the save timer if none is pending (call with _lock held)."""
+        self._dirty = True
+        if self.path and self._save_timer is None:
+            self._save_timer = threading.Timer(self.save_interval, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """Write the stats to ``path`` now if they changed since the last save."""
+        with self._save_lock:
+            with self._lock:
+                self._save_timer = None
+                if not self.path or not self._dirty:
+                    return
+                self._dirty = False
+                data = {"saved": time.time(), "models": {model: stats.to_dict() for model, stats in self._stats.items()}}
+            try:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                temporary = f"{self.path}.tmp"
+                Path(temporary).write_text(json.dumps(data, indent=2))
+                os.replace(temporary, self.path)
+            except OSError as e:
+                logger.warning(f"Could not save model health to {self.path}: {e}")
+
+    def close(self):
+        """Cancel the pending timer and save any unsaved stats."""
+        with self._lock:
+            timer, self._save_timer = self._save_timer, None
+        if timer is not None:
+            timer.cancel()
+        self.flush()
+
+    def _get(self, model: str) -> ModelStats:
+        stats = self._stats.get(model)
+        if stats is None:
+            stats = self._stats[model] = ModelStats()
+        return stats
+
+    def order(self, models: List[str]) -> List[str]:
+        """
+        The models to try for one question, most promising first.
+
+        Models with an open breaker are left out. If every model is left
+        out, they are all returned in configured order rather than giving up
+        without asking.
+        """
+        now = time.time()
+        ranked = []
+        skipped = []
+        with self._lock:
+            for position, model in enumerate(models):
+                stats = self._stats.get(model)
+                if stats is None or not stats.requests:
+                    ranked.append((0, 0.0, position, model))
+                    continue
+                if stats.state == OPEN:
+                    if now - stats.opened_at < stats.cooldown:
+                        skipped.append(model)
+                        continue
+                    stats.state = HALF_OPEN
+                    logger.info(f"Probing model {model} after {stats.cooldown:.0f}s cooldown")
+                if stats.state == HALF_OPEN:
+                    ranked.append((3, stats.latency or 0.0, position, model))
+                    continue
+                expected = stats.expected_seconds
+                if expected is None:
+                    ranked.append((2, 0.0, position, model))
+                else:
+                    ranked.append((1, expected, position, model))
+
+        for model in skipped:
+            BREAKER_SKIPS.labels(model=model).inc()
+        if not ranked:
+            logger.warning("Every model's circuit breaker is open; trying them all anyway")
+            return list(models)
+        if skipped:
+            logger.debug(f"Skipping models with open circuit breakers: {', '.join(skipped)}")
+        return [model for _, _, _, model in sorted(ranked)]
+
+    def record(self, model: str, seconds: float, status, ok: bool):
+        """
+        Record one request.
+
+        Args:
+            model: The model asked
+            seconds: How long the request took
+            status: HTTP status code, or ``timeout``/``error``/``incomplete``
+            ok: Whether a usable answer came back
+        """
+        with self._lock:
+            stats = self._get(model)
+            stats.requests += 1
+            stats.statuses.append(status)
+            stats.error_rate += ALPHA * ((0.0 if ok else 1.0) - stats.error_rate)
+            if ok:
+                stats.latency = seconds if stats.latency is None else stats.latency + ALPHA * (seconds - stats.latency)
+                stats.consecutive_failures = 0
+                if stats.state != CLOSED:
+                    logger.info(f"Model {model} recovered; circuit breaker closed")
+                stats.state = CLOSED
+                stats.cooldown = 0.0
+            else:
+                stats.failures += 1
+                stats.consecutive_failures += 1
+                stats.failure_seconds = (
+                    seconds if stats.failure_seconds is None
+                    else stats.failure_seconds + ALPHA * (seconds - stats.failure_seconds)
+                )
+                if stats.state == HALF_OPEN:
+                    self._trip(model, stats, min(self.max_cooldown, stats.cooldown * 2))
+                elif stats.state == CLOSED and (
+                    status == 429 or stats.consecutive_failures >= self.failure_threshold
+                ):
+                    self._trip(model, stats, self.base_cooldown)
+
+            expected = stats.expected_seconds
+            if expected is not None:
+                EXPECTED_SECONDS.labels(model=model).set(expected)
+            self._schedule_save()
+
+    def _trip(self, model: str, stats: ModelStats, cooldown: float):
+        stats.state = OPEN
+        stats.opened_at = time.time()
+        stats.cooldown = cooldown
+        BREAKER_TRIPS.labels(model=model).inc()
+        logger.warning(
+            f"Circuit breaker opened for model {model} after {stats.consecutive_failures} failures "
+            f"(last status {stats.statuses[-1]}); skipping it for {cooldown:.0f}s"
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                model: {
+                    "state": stats.state,
+                    "expected_seconds": None if stats.expected_seconds is None else round(stats.expected_seconds, 3),
+                    "error_rate": round(stats.error_rate, 3),
+                    "requests": stats.requests,
+                    "recent_statuses": list(stats.statuses),
+                }
+                for model, stats in self._stats.items()
+            }
@@ -1,26 +1,309 @@
+import json
 import logging
 import os
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Optional, Tuple
+from utils import metrics, tracing
+from utils.answer_cache import AnswerCache, normalize_question
+from utils.model_health import ModelHealth
+from utils.sentence_segmenter import SentenceSegmenter
+from utils.tts import TTSWorker, create_backend, QA_DISABLED_PHRASE
 
 logger = logging.getLogger(__name__)
 
+# Questions containing these phrases change answer from moment to moment and are never cached
+DEFAULT_UNCACHEABLE_PHRASES = "time is it,today,tonight,tomorrow,yesterday,right now,current,currently,latest,news,weather,score"
+
+SYSTEM_PROMPT = "You are Arc, a helpful voice assistant. Provide concise, clear answers (2-3 sentences max). Be friendly and direct."
+CONTINUE_PROMPT = "Continue your previous answer exactly where it stopped. Do not repeat anything already said."
+FAILURE_MESSAGE = "Sorry, I couldn't get a response from any model."
+
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0)
+LLM_SECONDS = metrics.histogram(
+    "arc_llm_request_seconds", "LLM request latency per model and outcome", labels=("model", "status"),
+    buckets=LLM_BUCKETS
+)
+LLM_FIRST_SENTENCE_SECONDS = metrics.histogram(
+    "arc_llm_first_sentence_seconds", "Time until a streamed answer's first sentence", labels=("model",),
+    buckets=LLM_BUCKETS
+)
+
 class QAHandler:
     """Handles question-answering using LLM APIs."""
     
-    def __init__(self):
+    def __init__(self, tts: Optional[TTSWorker] = None):
+        self.tts = tts
         self.api_key = os.getenv("LLM_API_KEY")
         self.api_base = os.getenv("LLM_API_BASE", "https://openrouter.ai/api/v1")
         self.model = os.getenv("LLM_MODEL", "mistralai/mistral-7b-instruct:free")
         fallback_env = os.getenv("LLM_FALLBACK_MODELS", "meta-llama/llama-3.1-8b-instruct:free")
         self.fallback_models = [m.strip() for m in fallback_env.split(",") if m.strip()]
+        # LLM_MODEL, LLM_FALLBACK_MODELS, LLM_TIMEOUT, LLM_HEDGE_DELAY and LLM_STREAM can change at runtime (apply_settings)
+        self.timeout = float(os.getenv("LLM_TIMEOUT", "10"))
+        # Seconds to wait on a model before also firing the next fallback (0 = sequential)
+        self.hedge_delay = float(os.getenv("LLM_HEDGE_DELAY", "0"))
+        # Stream answers and speak them sentence by sentence
+        self.stream = os.getenv("LLM_STREAM", "false").lower() == "true"
         self.enabled = bool(self.api_key)
+
+        cache_ttl = float(os.getenv("ANSWER_CACHE_TTL", "86400"))
+        self.uncacheable_phrases = [
+            f" {normalize_question(p)} "
+            for p in os.getenv("ANSWER_CACHE_SKIP_PHRASES", DEFAULT_UNCACHEABLE_PHRASES).split(",")
+            if p.strip()
+        ]
+        self.cache = None
+        if self.enabled and cache_ttl > 0:
+            self.cache = AnswerCache(
+                os.getenv("ANSWER_CACHE_PATH", str(Path(__file__).parent.parent / ".cache" / "answers.sqlite3")),
+                ttl=cache_ttl,
+                max_entries=int(os.getenv("ANSWER_CACHE_SIZE", "5000")),
+                memory_entries=int(os.getenv("ANSWER_CACHE_MEMORY_SIZE", "256"))
+            )
+
+        # Per-model latency and circuit breakers decide the order models are tried in
+        self.health = ModelHealth(
+            os.getenv("LLM_HEALTH_PATH", str(Path(__file__).parent.parent / ".cache" / "model_health.json")) or None,
+            failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "3")),
+            cooldown=float(os.getenv("LLM_BREAKER_COOLDOWN", "60"))
+        )
+
+        self._session = None
+        self._session_lock = threading.Lock()
         
         if not self.enabled:
             logger.warning("LLM API key not configured. Q&A functionality disabled.")
             logger.info("To enable Q&A, set LLM_API_KEY in your .env file")
         else:
             logger.info(f"Q&A enabled with model: {self.model}")
+
+    def apply_settings(self, settings):
+        """Take the model list, timeouts and streaming from reloaded settings (between questions)."""
+        if settings.llm_model != self.model and self.enabled:
+            logger.info(f"Q&A model changed to {settings.llm_model}")
+        self.model = settings.llm_model
+        self.fallback_models = list(settings.llm_fallback_models)
+        self.timeout = settings.llm_timeout
+        self.hedge_delay = settings.llm_hedge_delay
+        self.stream = settings.llm_stream
+
+    @property
+    def models_to_try(self):
+        return [self.model] + [m for m in self.fallback_models if m != self.model]
+
+    def _models_for_question(self):
+        """Configured models, fastest healthy first, without those whose circuit breaker is open."""
+        return self.health.order(self.models_to_try)
+
+    def _get_session(self):
+        """Return the shared keep-alive session, creating it on first use."""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from utils.abortable_http import AbortableAdapter
+
+                session = requests.Session()
+                # Hedged losers of earlier questions may still hold connections while a new question races
+                adapter = AbortableAdapter(pool_connections=1, pool_maxsize=max(4, 2 * len(self.models_to_try)))
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({
+                    "Authorization": "Bearer " + self.api_key,
+                    "Content-Type": "application/json"
+                })
+                self._session = session
+            return self._session
+
+    def warm_up(self):
+        """Open the keep-alive connection in the background so the first question skips TCP/TLS setup."""
+        if not self.enabled:
+            return
+
+        def _warm():
+            try:
+                self._get_session().get(f"{self.api_base}/models", timeout=5)
+                logger.debug("LLM connection warmed up")
+            except Exception as e:
+                logger.debug(f"LLM warm-up failed: {e}")
+
+        threading.Thread(target=_warm, name="qa-warmup", daemon=True).start()
+
+    def _build_payload(self, model: str, question: str, partial: str = "", stream: bool = False) -> dict:
+        """Chat completion request body; ``partial`` asks the model to continue an interrupted answer."""
+        messages = [
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": question
+            }
+        ]
+        if partial:
+            messages.append({"role": "assistant", "content": partial})
+            messages.append({"role": "user", "content": CONTINUE_PROMPT})
+
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": 150,
+            "temperature": 0.7
+        }
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _request_answer(self, model: str, question: str, attempt=None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Ask a single model.
+
+        Args:
+            model: The model to ask
+            question: The user's question
+            attempt: ``abortable_http.Attempt`` aborted when another model has already answered (hedging)
+
+        Returns:
+            (answer, None) on success, or (None, error description) on failure
+        """
+        with tracing.span("llm", model=model) as span:
+            answer, error = self._post_question(model, question, attempt)
+            span.set(outcome="ok" if error is None else error[:120])
+            return answer, error
+
+    def _post_question(self, model: str, question: str, attempt=None) -> Tuple[Optional[str], Optional[str]]:
+        import requests
+        from contextlib import nullcontext
+
+        payload = self._build_payload(model, question)
+        started = time.perf_counter()
+
+        def finish(status, answer=None, error=None, ok=None):
+            elapsed = time.perf_counter() - started
+            LLM_SECONDS.labels(model=model, status=status).observe(elapsed)
+            self.health.record(model, elapsed, status, ok=error is None if ok is None else ok)
+            return answer, error
+
+        try:
+            # stream=True returns once the headers are in, so a hedged loser can drop the body unread
+            with attempt.active() if attempt is not None else nullcontext():
+                response = self._get_session().post(
+                    f"{self.api_base}/chat/completions",
+                    json=payload,
+                    timeout=self.timeout,
+                    stream=True
+                )
+        except requests.exceptions.RequestException as e:
+            if attempt is not None and attempt.aborted:
+                # Cut off by the winner before the server answered; says nothing about this model
+                LLM_SECONDS.labels(model=model, status="cancelled").observe(time.perf_counter() - started)
+                return None, "cancelled"
+            if isinstance(e, requests.exceptions.Timeout):
+                return finish("timeout", error="timeout")
+            return finish("error", error=f"request failed ({e})")
+
+        with response:
+            status = response.status_code
+            if attempt is not None and attempt.aborted:
+                # Another model already answered; this one's latency and status still count
+                return finish(status, error="cancelled", ok=status == 200)
+            try:
+                text = response.text
+            except requests.exceptions.Timeout:
+                return finish("timeout", error="timeout")
+            except requests.exceptions.RequestException as e:
+                return finish("error", error=f"request failed ({e})")
+
+        if status != 200:
+            return finish(status, error=f"API error {status}: {text}")
+        if not text:
+            return finish(status, error="empty response")
+        try:
+            data = json.loads(text)
+            return finish(status, answer=data["choices"][0]["message"]["content"].strip())
+        except Exception as parse_error:
+            return finish(status, error=f"invalid JSON ({parse_error})")
+
+    def _answer_sequential(self, question: str, models) -> Tuple[Optional[str], Optional[str]]:
+        last_error = None
+        for model in models:
+            answer, error = self._request_answer(model, question)
+            if answer is not None:
+                return answer, None
+            last_error = error
+            logger.warning(f"Model {model} failed: {error}. Trying next fallback.")
+        return None, last_error
+
+    def _answer_hedged(self, question: str, models) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Race models in fallback order.
+
+        The next model is fired when the running ones have not answered
+        within ``hedge_delay`` or as soon as one of them fails. The first
+        good answer wins. Losers still waiting for the server are aborted
+        by shutting their connection down, and losers whose headers are in
+        close the response without reading the body. Each question gets its
+        own threads, so a slow loser never holds a thread the next
+        question's hedges need.
+        """
+        from utils.abortable_http import Attempt
+
+        executor = ThreadPoolExecutor(max_workers=len(models), thread_name_prefix="qa-hedge")
+        attempts = []
+        pending = {}
+        remaining = list(models)
+        last_error = None
+
+        def launch():
+            model = remaining.pop(0)
+            attempts.append(Attempt())
+            pending[executor.submit(self._request_answer, model, question, attempts[-1])] = model
+
+        try:
+            launch()
+            while pending:
+                done, _ = wait(pending, timeout=self.hedge_delay if remaining else None, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    logger.info(f"No answer after {self.hedge_delay}s, hedging with {remaining[0]}")
+                    launch()
+                    continue
+
+                for future in done:
+                    model = pending.pop(future)
+                    answer, error = future.result()
+                    if answer is not None:
+                        return answer, None
+                    last_error = error
+                    logger.warning(f"Model {model} failed: {error}. Trying next fallback.")
+                    if remaining:
+                        launch()
+
+            return None, last_error
+        finally:
+            for attempt in attempts:
+                attempt.abort()
+            executor.shutdown(wait=False)
     
+    def _cache_key(self, question: str) -> Optional[str]:
+        """Cache key for the question, or None if it should not be cached."""
+        if self.cache is None:
+            return None
+        padded = f" {normalize_question(question)} "
+        if any(phrase in padded for phrase in self.uncacheable_phrases):
+            return None
+        return AnswerCache.make_key(question, self.model, SYSTEM_PROMPT)
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats() if self.cache is not None else {}
+
+    def close(self):
+        """Save unsaved model health stats (call on shutdown)."""
+        self.health.close()
+
     def answer_question(self, question: str) -> Optional[str]:
         """
         Send question to LLM and get answer.
@@ -32,68 +315,31 @@ class QAHandler:
             The LLM's answer, or None if failed
         """
         if not self.enabled:
-            return "Q&A is not configured. Please set LLM_API_KEY in your .env file."
+            return QA_DISABLED_PHRASE
         
         try:
-            import requests
+            cache_key = self._cache_key(question)
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.debug("Answer served from cache")
+                    return cached
 
-            headers = {
-                "Authorization": "Bearer " + self.api_key,
-                "Content-Type": "application/json"
-            }
+            import requests  # noqa: F401
 
-            models_to_try = [self.model] + [m for m in self.fallback_models if m != self.model]
-            last_error = None
-
-            for model in models_to_try:
-                payload = {
-                    "model": model,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are Arc, a helpful voice assistant. Provide concise, clear answers (2-3 sentences max). Be friendly and direct."
-                        },
-                        {
-                            "role": "user",
-                            "content": question
-                        }
-                    ],
-                    "max_tokens": 150,
-                    "temperature": 0.7
-                }
-
-                try:
-                    response = requests.post(
-                        f"{self.api_base}/chat/completions",
-                        headers=headers,
-                        json=payload,
-                        timeout=10
-                    )
-                except requests.exceptions.Timeout:
-                    last_error = "timeout"
-                    logger.warning(f"API request timed out for model {model}. Trying next fallback.")
-                    continue
+            models = self._models_for_question()
+            if self.hedge_delay > 0 and len(models) > 1:
+                answer, last_error = self._answer_hedged(question, models)
+            else:
+                answer, last_error = self._answer_sequential(question, models)
 
-                if response.status_code == 200:
-                    if not response.text:
-                        last_error = "empty response"
-                        logger.warning(f"Empty response for model {model}. Trying next fallback.")
-                        continue
-                    try:
-                        data = response.json()
-                        answer = data["choices"][0]["message"]["content"].strip()
-                        return answer
-                    except Exception as parse_error:
-                        last_error = f"invalid JSON ({parse_error})"
-                        logger.warning(f"Invalid JSON for model {model}. Trying next fallback.")
-                        continue
-                else:
-                    last_error = f"API error {response.status_code}"
-                    logger.warning(f"API error {response.status_code} for model {model}: {response.text}. Trying next fallback.")
-                    continue
+            if answer is not None:
+                if cache_key is not None:
+                    self.cache.put(cache_key, answer)
+                return answer
 
             logger.error(f"All model attempts failed. Last error: {last_error}")
-            return "Sorry, I couldn't get a response from any model."
+            return FAILURE_MESSAGE
 
         except ImportError:
             logger.error("requests library not installed")
@@ -102,32 +348,145 @@ class QAHandler:
             logger.error(f"Error getting answer: {e}")
             return f"Sorry, I encountered an error: {str(e)}"
     
-    def text_to_speech(self, text: str):
+    def _stream_model(self, model: str, question: str, partial: str, on_sentence) -> Tuple[str, Optional[str]]:
         """
-        Convert text to speech and play it.
-        Uses Windows SAPI on Windows, or prints text as fallback.
-        
+        Stream one model's answer, handing each finished sentence to ``on_sentence``.
+
+        Returns:
+            (text of the sentences delivered, None) on success, or
+            (text delivered before the failure, error description)
+        """
+        import requests
+
+        segmenter = SentenceSegmenter()
+        delivered = []
+        started = time.perf_counter()
+        status = "error"
+        ok = False
+
+        def deliver(sentence):
+            if not delivered:
+                LLM_FIRST_SENTENCE_SECONDS.labels(model=model).observe(time.perf_counter() - started)
+            on_sentence(sentence)
+            delivered.append(sentence)
+
+        try:
+            with self._get_session().post(
+                f"{self.api_base}/chat/completions",
+                json=self._build_payload(model, question, partial, stream=True),
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                status = response.status_code
+                if response.status_code != 200:
+                    return "", f"API error {response.status_code}: {response.text}"
+
+                finished = False
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        finished = True
+                        break
+                    delta = json.loads(data)["choices"][0].get("delta", {}).get("content") or ""
+                    for sentence in segmenter.feed(delta):
+                        deliver(sentence)
+
+                if not finished:
+                    status = "incomplete"
+                    return " ".join(delivered), "stream ended early"
+        except requests.exceptions.Timeout:
+            status = "timeout"
+            return " ".join(delivered), "timeout"
+        except (requests.exceptions.RequestException, ValueError, KeyError, IndexError) as e:
+            status = "error"
+            return " ".join(delivered), f"stream failed ({e})"
+        else:
+            ok = True
+        finally:
+            elapsed = time.perf_counter() - started
+            LLM_SECONDS.labels(model=model, status=status).observe(elapsed)
+            self.health.record(model, elapsed, status, ok=ok)
+
+        for sentence in segmenter.flush():
+            deliver(sentence)
+        return " ".join(delivered), None
+
+    def stream_answer(self, question: str, on_sentence) -> Optional[str]:
+        """
+        Answer a question, delivering it sentence by sentence as it is generated.
+
+        Models are tried in fallback order. If a stream fails after some
+        sentences were delivered, the next model is asked to continue from
+        there instead of starting over, so nothing is repeated.
+
         Args:
-            text: The text to speak
+            question: The user's question
+            on_sentence: Called with each complete sentence
+
+        Returns:
+            The full answer, or None if failed
         """
+        if not self.enabled:
+            on_sentence(QA_DISABLED_PHRASE)
+            return QA_DISABLED_PHRASE
+
+        cache_key = self._cache_key(question)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Answer served from cache")
+                on_sentence(cached)
+                return cached
+
         try:
-            import platform
-            
-            if platform.system() == "Windows":
-                # Use Windows SAPI
-                import pyttsx3
-                engine = pyttsx3.init()
-                engine.setProperty('rate', 175)  # Speed
-                engine.setProperty('volume', 0.9)  # Volume
-                engine.say(text)
-                engine.runAndWait()
-            else:
-                # Fallback: just print
-                print(f"🗣️ Arc: {text}")
-                
+            import requests  # noqa: F401
         except ImportError:
-            # If pyttsx3 not installed, just print
-            print(f"🗣️ Arc: {text}")
-        except Exception as e:
-            logger.error(f"TTS error: {e}")
-            print(f"🗣️ Arc: {text}")
+            logger.error("requests library not installed")
+            return None
+
+        spoken = ""
+        last_error = None
+        for model in self._models_for_question():
+            with tracing.span("llm", model=model, stream=True, continuation=bool(spoken)) as span:
+                text, error = self._stream_model(model, question, spoken, on_sentence)
+                span.set(outcome="ok" if error is None else error[:120], chars=len(text))
+            spoken = f"{spoken} {text}".strip()
+            if error is None:
+                if cache_key is not None and spoken:
+                    self.cache.put(cache_key, spoken)
+                return spoken
+            last_error = error
+            logger.warning(f"Model {model} stream failed: {error}. Trying next fallback.")
+
+        logger.error(f"All model attempts failed. Last error: {last_error}")
+        if not spoken:
+            on_sentence(FAILURE_MESSAGE)
+        return spoken or None
+
+    def speak_answer(self, question: str) -> Optional[str]:
+        """Answer a question and speak it, streaming sentence by sentence when LLM_STREAM is enabled."""
+        if self.stream:
+            return self.stream_answer(question, self.text_to_speech)
+
+        answer = self.answer_question(question)
+        if answer:
+            self.text_to_speech(answer)
+        return answer
+
+    def text_to_speech(self, text: str, wait: bool = False):
+        """
+        Speak text on the background TTS worker.
+
+        Returns as soon as the text is queued unless ``wait`` is set. Without
+        an injected worker one is started on first use with the platform
+        default backend (pyttsx3 on Windows, printing elsewhere).
+
+        Args:
+            text: The text to speak
+            wait: Block until the text has been spoken
+        """
+        if self.tts is None:
+            self.tts = TTSWorker(create_backend(os.getenv("TTS_BACKEND", "auto"))).start()
+        self.tts.say(text, wait=wait)
@@ -0,0 +1,57 @@
+import re
+from typing import List
+
+# Tokens ending in a period that do not end a sentence
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e",
+    "approx", "no", "fig", "inc", "ltd", "co", "mt", "u.s", "a.m", "p.m",
+}
+
+_BOUNDARY = re.compile(r'([.!?]+["\')\]]*)(\s+)|\n+')
+
+
+class SentenceSegmenter:
+    """
+    Incrementally split streamed text into complete sentences.
+
+    ``feed`` takes text fragments as they arrive and returns any sentences
+    that are now complete; ``flush`` returns whatever is left once the
+    stream ends. A sentence ends at ``.``, ``!`` or ``?`` followed by
+    whitespace (so decimals like 3.14 are safe) or at a newline, except
+    after common abbreviations.
+    """
+
+    def __init__(self, min_length: int = 2):
+        self.min_length = min_length
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        sentences = []
+        start = 0
+
+        for match in _BOUNDARY.finditer(self._buffer):
+            end = match.end(1) if match.group(1) else match.start()
+            candidate = self._buffer[start:end].strip()
+
+            if match.group(1) and match.group(1).startswith("."):
+                last_word = candidate[:-1].rsplit(None, 1)[-1].lower() if candidate[:-1].split() else ""
+                # Abbreviations and initials ("J. K. Rowling")
+                if last_word.rstrip(".") in ABBREVIATIONS or (len(last_word) == 1 and last_word.isalpha()):
+                    continue
+
+            if len(candidate) >= self.min_length:
+                sentences.append(candidate)
+                start = match.end()
+
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return [remainder] if remainder else []
+
+    @property
+    def pending(self) -> str:
+        return self._buffer
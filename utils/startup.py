@@ -0,0 +1,123 @@
+"""Startup timing: wall clock to "Listening..." and an import-time breakdown.
+
+``StartupProfile`` records milestones relative to when ``main`` was first
+imported. ``import_breakdown`` re-imports an entry module in a fresh
+interpreter with ``python -X importtime`` and returns the slowest imports,
+so the report shows what the time before the first milestone was spent on.
+"""
+import logging
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def import_breakdown(entry: str = "main", top: int = 10) -> Dict:
+    """
+    Import ``entry`` in a fresh interpreter with ``-X importtime``.
+
+    Args:
+        entry: Module to import (not run)
+        top: Number of slowest direct imports of ``entry`` to return
+
+    Returns:
+        Dict with the subprocess wall time, the time to import ``entry`` and
+        the ``top`` slowest modules it imports directly as (module, cumulative ms)
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {entry}"],
+        cwd=ROOT,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+        timeout=60
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    # Lines look like "import time: <self us> | <cumulative us> | <indented name>", and a
+    # module's nested imports are listed (indented two more spaces) before it
+    imports: List[Tuple[str, float]] = []
+    children: List[Tuple[str, float]] = []
+    entry_ms = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((name.strip(), int(cumulative) / 1000))
+        elif depth == 0:
+            if name.strip() == entry:
+                entry_ms = int(cumulative) / 1000
+                imports = children
+            children = []
+
+    imports.sort(key=lambda item: item[1], reverse=True)
+    return {
+        "entry": entry,
+        "ok": result.returncode == 0,
+        "interpreter_ms": round(wall_ms, 1),
+        "imports_ms": round(entry_ms, 1),
+        "slowest": [(name, round(ms, 1)) for name, ms in imports[:top]],
+    }
+
+
+class StartupProfile:
+    """Milestones from process start to listening, checked against a budget."""
+
+    def __init__(self, budget_ms: int, started: Optional[float] = None):
+        self.budget_ms = budget_ms
+        self.started = time.perf_counter() if started is None else started
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, stage: str) -> float:
+        """Record that ``stage`` finished now; returns ms since start."""
+        elapsed = (time.perf_counter() - self.started) * 1000
+        self.marks.append((stage, elapsed))
+        logger.debug(f"Startup: {stage} at {elapsed:.0f} ms")
+        return elapsed
+
+    @property
+    def total_ms(self) -> float:
+        return self.marks[-1][1] if self.marks else 0.0
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget_ms > 0 and self.total_ms > self.budget_ms
+
+    def report(self, imports: Optional[Dict] = None) -> Dict:
+        """Print the startup breakdown and return it as a dict."""
+        print("\n⏱️ Startup report")
+        previous = 0.0
+        for stage, elapsed in self.marks:
+            print(f"   {stage:<20} {elapsed:8.0f} ms  (+{elapsed - previous:.0f} ms)")
+            previous = elapsed
+
+        if imports:
+            print(
+                f"   Fresh interpreter: {imports['interpreter_ms']:.0f} ms, "
+                f"of which importing {imports['entry']}: {imports['imports_ms']:.0f} ms"
+            )
+            for name, ms in imports["slowest"]:
+                print(f"     {name:<32} {ms:8.1f} ms")
+
+        if self.over_budget:
+            logger.warning(f"Startup took {self.total_ms:.0f} ms, over the {self.budget_ms} ms budget")
+            print(f"⚠️ Startup took {self.total_ms:.0f} ms (budget {self.budget_ms} ms)\n")
+        else:
+            print(f"✅ Startup took {self.total_ms:.0f} ms (budget {self.budget_ms} ms)\n")
+
+        return {
+            "marks": [{"stage": stage, "ms": round(ms, 1)} for stage, ms in self.marks],
+            "total_ms": round(self.total_ms, 1),
+            "budget_ms": self.budget_ms,
+            "over_budget": self.over_budget,
+            "imports": imports,
+        }
@@ -0,0 +1,195 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+from audio.vad import EnergyVAD
+
+logger = logging.getLogger(__name__)
+
+
+class STTError(Exception):
+    """Speech recognition service failure (as opposed to audio that was not understood)."""
+    pass
+
+
+class STTBackend:
+    """
+    Incremental speech-to-text.
+
+    ``start`` begins an utterance, ``accept`` is fed int16 chunks while the
+    user is still speaking and may return a partial transcript, and
+    ``finish`` returns the final transcript (None if nothing was understood)
+    or raises ``STTError``.
+    """
+
+    name = "base"
+
+    def start(self, sample_rate: int):
+        self.sample_rate = sample_rate
+
+    def accept(self, chunk: np.ndarray) -> Optional[str]:
+        raise NotImplementedError
+
+    def finish(self) -> Optional[str]:
+        raise NotImplementedError
+
+
+class GoogleSTTBackend(STTBackend):
+    """
+    Google Web Speech API via ``speech_recognition``.
+
+    The API only takes whole clips, so the utterance is split at short
+    pauses and each finished phrase is recognised in the background while
+    the user keeps talking. ``finish`` only waits for the last phrase.
+    """
+
+    name = "google"
+
+    def __init__(self, pause_duration: float = 0.35, vad_threshold: int = 500, max_workers: int = 3):
+        import speech_recognition as sr
+
+        self._sr = sr
+        self.recognizer = sr.Recognizer()
+        self.pause_duration = pause_duration
+        self.vad_threshold = vad_threshold
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stt-google")
+
+    def start(self, sample_rate: int):
+        super().start(sample_rate)
+        self._vad = EnergyVAD(self.vad_threshold)
+        self._segment: List[np.ndarray] = []
+        self._segment_has_speech = False
+        self._silence = 0.0
+        self._futures = []
+
+    def _recognize(self, samples: np.ndarray) -> Optional[str]:
+        audio = self._sr.AudioData(samples.tobytes(), self.sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio).lower()
+        except self._sr.UnknownValueError:
+            return None
+        except self._sr.RequestError as e:
+            raise STTError(str(e))
+
+    def _submit_segment(self):
+        if self._segment and self._segment_has_speech:
+            samples = np.concatenate(self._segment)
+            self._futures.append(self._executor.submit(self._recognize, samples))
+        self._segment = []
+        self._segment_has_speech = False
+        self._silence = 0.0
+
+    def _completed_text(self) -> str:
+        parts = []
+        for future in self._futures:
+            if not future.done():
+                break
+            if future.exception() is None and future.result():
+                parts.append(future.result())
+        return " ".join(parts)
+
+    def accept(self, chunk: np.ndarray) -> Optional[str]:
+        self._segment.append(chunk)
+        if self._vad.is_speech(chunk):
+            self._segment_has_speech = True
+            self._silence = 0.0
+        else:
+            self._silence += len(chunk) / self.sample_rate
+            if self._segment_has_speech and self._silence >= self.pause_duration:
+                self._submit_segment()
+        return self._completed_text() or None
+
+    def finish(self) -> Optional[str]:
+        self._submit_segment()
+        parts = []
+        for future in self._futures:
+            text = future.result()
+            if text:
+                parts.append(text)
+        self._futures = []
+        return " ".join(parts) or None
+
+
+class VoskSTTBackend(STTBackend):
+    """Offline recognition with Vosk (``pip install vosk`` plus a model directory)."""
+
+    name = "vosk"
+
+    def __init__(self, model_path: str):
+        try:
+            from vosk import Model, KaldiRecognizer, SetLogLevel
+        except ImportError:
+            raise STTError("vosk is not installed. Run: pip install vosk")
+        if not model_path or not os.path.isdir(model_path):
+            raise STTError(f"Vosk model directory not found: {model_path!r} (set VOSK_MODEL_PATH)")
+
+        SetLogLevel(-1)
+        self._recognizer_class = KaldiRecognizer
+        self.model = Model(model_path)
+
+    def start(self, sample_rate: int):
+        super().start(sample_rate)
+        self._recognizer = self._recognizer_class(self.model, sample_rate)
+        self._final_parts = []
+
+    def accept(self, chunk: np.ndarray) -> Optional[str]:
+        if self._recognizer.AcceptWaveform(chunk.tobytes()):
+            text = json.loads(self._recognizer.Result()).get("text", "")
+            if text:
+                self._final_parts.append(text)
+            return " ".join(self._final_parts) or None
+        partial = json.loads(self._recognizer.PartialResult()).get("partial", "")
+        return " ".join(self._final_parts + ([partial] if partial else [])) or None
+
+    def finish(self) -> Optional[str]:
+        text = json.loads(self._recognizer.FinalResult()).get("text", "")
+        if text:
+            self._final_parts.append(text)
+        return " ".join(self._final_parts).lower() or None
+
+
+class FakeSTTBackend(STTBackend):
+    """
+    Deterministic recogniser for tests and replays.
+
+    Returns the scripted transcripts in order, one per utterance (cycling).
+    Partials reveal one more word every ``seconds_per_word`` of audio.
+    """
+
+    name = "fake"
+
+    def __init__(self, transcripts, seconds_per_word: float = 0.3):
+        self.transcripts = list(transcripts) or [""]
+        self.seconds_per_word = seconds_per_word
+        self._index = 0
+
+    def start(self, sample_rate: int):
+        super().start(sample_rate)
+        self._audio_seconds = 0.0
+        self._words = self.transcripts[self._index % len(self.transcripts)].split()
+        self._index += 1
+
+    def accept(self, chunk: np.ndarray) -> Optional[str]:
+        self._audio_seconds += len(chunk) / self.sample_rate
+        count = int(self._audio_seconds / self.seconds_per_word)
+        return " ".join(self._words[:count]) or None
+
+    def finish(self) -> Optional[str]:
+        return " ".join(self._words).lower() or None
+
+
+def create_stt_backend(name: str = "google", vad_threshold: int = 500) -> STTBackend:
+    """Build the configured STT backend (``google``, ``vosk`` or ``fake``)."""
+    name = (name or "google").lower()
+    if name == "vosk":
+        return VoskSTTBackend(os.getenv("VOSK_MODEL_PATH", ""))
+    if name == "fake":
+        transcripts = os.getenv("STT_FAKE_TRANSCRIPTS", "the usual").split("|")
+        return FakeSTTBackend(transcripts)
+    if name != "google":
+        logger.warning(f"Unknown STT backend {name!r}, using google")
+    return GoogleSTTBackend(vad_threshold=vad_threshold)
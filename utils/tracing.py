@@ -0,0 +1,252 @@
+"""Per-interaction tracing with Chrome trace-event export.
+
+Each interaction (wake word or double clap until the last word is spoken)
+becomes a ``Trace`` of nested spans: capture, STT, intent dispatch, every
+LLM attempt, TTS and app launches. Finished traces are kept in a bounded
+ring and can be written as Chrome trace-event JSON, which opens in
+Perfetto (https://ui.perfetto.dev) or ``chrome://tracing``::
+
+    trace = tracing.start_trace("interaction", trigger="wake_word")
+    with tracing.span("stt") as span:
+        text = stt.finish()
+        span.set(chars=len(text))
+    tracing.finish_trace(trace)
+
+Spans nest per thread. Work that continues on other threads (hedged LLM
+requests, the TTS worker, app launches) attaches to the interaction that
+is active, or to the one captured with ``current_trace`` and passed along
+as ``trace=`` or re-entered with ``activate``. When no interaction is
+being traced, ``span`` returns a shared no-op span.
+"""
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    __slots__ = ("name", "parent", "start", "end", "args", "thread_id", "thread_name")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, args: Optional[Dict] = None):
+        thread = threading.current_thread()
+        self.name = name
+        self.parent = parent
+        self.start = time.perf_counter()
+        self.end = None
+        self.args = dict(args or {})
+        self.thread_id = thread.ident
+        self.thread_name = thread.name
+
+    def set(self, **args):
+        """Attach (or overwrite) span arguments, e.g. the outcome of an LLM attempt."""
+        self.args.update(args)
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+
+class _NullSpan:
+    """Stand-in used when nothing is being traced."""
+
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Trace:
+    """One interaction: a root span plus every span recorded under it."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, name: str, args: Optional[Dict] = None):
+        self.id = next(self._ids)
+        self.name = name
+        self.wall_start = time.time()
+        self.root = Span(name, None, args)
+        self.spans: List[Span] = [self.root]
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration
+
+    def summary(self) -> str:
+        """Root duration and the top-level spans, for the log."""
+        children = [s for s in self.spans if s.parent is self.root]
+        parts = ", ".join(f"{s.name}={s.duration * 1000:.0f}ms" for s in children)
+        return f"{self.name} #{self.id} {self.duration * 1000:.0f}ms" + (f" ({parts})" if parts else "")
+
+    def chrome_events(self) -> List[Dict]:
+        """Trace-event records: one complete ("X") event per span, one process per trace."""
+        pid = self.id
+        events = [{
+            "name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+            "args": {"name": f"{self.name} #{self.id} @ {time.strftime('%H:%M:%S', time.localtime(self.wall_start))}"},
+        }]
+        seen_threads = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            seen_threads.setdefault(span.thread_id, span.thread_name)
+            events.append({
+                "name": span.name,
+                "cat": "arc",
+                "ph": "X",
+                "ts": round(span.start * 1e6, 1),
+                "dur": round(span.duration * 1e6, 1),
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": {key: value if isinstance(value, (int, float, bool)) else str(value)
+                         for key, value in span.args.items()},
+            })
+        for thread_id, thread_name in seen_threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": thread_name}})
+        return events
+
+
+def write_chrome_trace(path: str, traces) -> str:
+    """Write traces as a Chrome trace-event JSON file (atomically) and return the path."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    events = [event for trace in traces for event in trace.chrome_events()]
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    os.replace(tmp_path, path)
+    return path
+
+
+class Tracer:
+    """
+    Tracks the active interaction and keeps the last ``history`` finished ones.
+
+    Args:
+        history: Number of finished traces kept in memory
+        directory: If set, each finished trace is also written there as
+            ``trace-<time>-<id>.json``
+    """
+
+    def __init__(self, history: int = 20, directory: str = ""):
+        self.history: deque = deque(maxlen=max(1, history))
+        self.directory = directory
+        self._active: Optional[Trace] = None
+        self._local = threading.local()
+
+    def configure(self, history: int = 20, directory: str = ""):
+        self.history = deque(self.history, maxlen=max(1, history))
+        self.directory = directory
+
+    def _stack(self) -> List[Tuple[Trace, Span]]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current_trace(self) -> Optional[Trace]:
+        """The trace this thread works for: an ``activate``d one, else the active interaction."""
+        return getattr(self._local, "trace", None) or self._active
+
+    @contextmanager
+    def activate(self, trace: Optional[Trace]):
+        """Attribute spans on this thread to ``trace`` (e.g. in a background worker)."""
+        previous = getattr(self._local, "trace", None)
+        self._local.trace = trace
+        try:
+            yield trace
+        finally:
+            self._local.trace = previous
+
+    def start_trace(self, name: str, **args) -> Trace:
+        trace = Trace(name, args)
+        self._active = trace
+        return trace
+
+    @contextmanager
+    def span(self, name: str, trace: Optional[Trace] = None, **args):
+        trace = trace or self.current_trace()
+        if trace is None or trace.closed:
+            yield NULL_SPAN
+            return
+
+        # Entries are (trace, span): nest under this thread's innermost span of the same trace
+        stack = self._stack()
+        parent = stack[-1][1] if stack and stack[-1][0] is trace else trace.root
+        span = Span(name, parent, args)
+        stack.append((trace, span))
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            span.end = time.perf_counter()
+            stack.pop()
+            trace.add(span)
+
+    def finish_trace(self, trace: Optional[Trace], wait: Optional[Callable[[], None]] = None):
+        """
+        End ``trace``, after ``wait`` returns if given.
+
+        ``wait`` runs on a background thread so the caller can go back to
+        listening while, e.g., the answer is still being spoken. The trace
+        stops being the active interaction immediately.
+        """
+        if trace is None:
+            return
+        if self._active is trace:
+            self._active = None
+        if wait is None:
+            self._close(trace)
+            return
+
+        def close_after_wait():
+            try:
+                wait()
+            except Exception as e:
+                logger.debug(f"Waiting to close trace {trace.id} failed: {e}")
+            self._close(trace)
+
+        threading.Thread(target=close_after_wait, name=f"trace-{trace.id}", daemon=True).start()
+
+    def _close(self, trace: Trace):
+        trace.root.end = time.perf_counter()
+        trace.closed = True
+        self.history.append(trace)
+        logger.info(f"Trace {trace.summary()}")
+        if self.directory:
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(trace.wall_start))
+            try:
+                write_chrome_trace(os.path.join(self.directory, f"trace-{stamp}-{trace.id}.json"), [trace])
+            except OSError as e:
+                logger.error(f"Could not write trace {trace.id}: {e}")
+
+    def recent(self) -> List[Trace]:
+        return list(self.history)
+
+    def export(self, path: str) -> str:
+        """Write the traces still in the ring to one Chrome trace file."""
+        return write_chrome_trace(path, self.recent())
+
+
+TRACER = Tracer()
+span = TRACER.span
+start_trace = TRACER.start_trace
+finish_trace = TRACER.finish_trace
+current_trace = TRACER.current_trace
+activate = TRACER.activate
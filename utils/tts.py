@@ -0,0 +1,265 @@
+import logging
+import os
+import platform
+import queue
+import tempfile
+import threading
+import time
+import wave
+from typing import Optional, Tuple
+
+import numpy as np
+
+from utils import metrics, tracing
+
+logger = logging.getLogger(__name__)
+
+TTS_SECONDS = metrics.histogram(
+    "arc_tts_seconds", "Time spent speaking one utterance", labels=("source",),
+    buckets=(0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 30.0)
+)
+
+# Fixed phrases spoken often enough to be rendered once and replayed from memory
+UNKNOWN_AUDIO_PHRASE = "Sorry, I could not understand that."
+QA_DISABLED_PHRASE = "Q&A is not configured. Please set LLM_API_KEY in your .env file."
+LAUNCHING_PHRASE = "Launching your apps."
+LAUNCHED_PHRASE = "All apps launched."
+CACHED_PHRASES = (UNKNOWN_AUDIO_PHRASE, QA_DISABLED_PHRASE, LAUNCHING_PHRASE, LAUNCHED_PHRASE)
+
+
+class TTSBackend:
+    """Speech engine driven by ``TTSWorker``. All methods run on the worker thread except ``stop``."""
+
+    name = "base"
+
+    def open(self):
+        """Initialise the engine (called once, on the worker thread)."""
+
+    def speak(self, text: str):
+        """Speak ``text`` and return when done or stopped."""
+        raise NotImplementedError
+
+    def render(self, text: str) -> Optional[Tuple[np.ndarray, int]]:
+        """Render ``text`` to ``(int16 samples, sample_rate)``, or None if unsupported."""
+        return None
+
+    def play(self, samples: np.ndarray, sample_rate: int):
+        """Play a pre-rendered buffer and return when done or stopped."""
+        import sounddevice as sd
+        sd.play(samples, sample_rate)
+        sd.wait()
+
+    def stop(self):
+        """Interrupt the current utterance (called from any thread)."""
+
+    def close(self):
+        pass
+
+
+class PrintBackend(TTSBackend):
+    """Prints instead of speaking; used where no speech engine is available."""
+
+    name = "print"
+
+    def speak(self, text: str):
+        print(f"🗣️ Arc: {text}")
+
+
+class NullBackend(TTSBackend):
+    """Silent backend that records what would have been spoken (for tests)."""
+
+    name = "null"
+
+    def __init__(self):
+        self.spoken = []
+
+    def speak(self, text: str):
+        self.spoken.append(text)
+
+
+class Pyttsx3Backend(TTSBackend):
+    """pyttsx3 engine, initialised once and reused for every utterance."""
+
+    name = "pyttsx3"
+
+    def __init__(self, rate: int = 175, volume: float = 0.9):
+        self.rate = rate
+        self.volume = volume
+        self.engine = None
+        self._playing = False
+
+    def open(self):
+        import pyttsx3
+        self.engine = pyttsx3.init()
+        self.engine.setProperty('rate', self.rate)  # Speed
+        self.engine.setProperty('volume', self.volume)  # Volume
+
+    def speak(self, text: str):
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def render(self, text: str) -> Optional[Tuple[np.ndarray, int]]:
+        try:
+            import sounddevice  # noqa: F401 - playback needs it
+        except (ImportError, OSError):
+            return None
+
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            self.engine.save_to_file(text, path)
+            self.engine.runAndWait()
+            with wave.open(path, "rb") as wav:
+                if wav.getsampwidth() != 2:
+                    return None
+                samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+                channels = wav.getnchannels()
+                if channels > 1:
+                    samples = samples.reshape(-1, channels)
+                return samples.copy(), wav.getframerate()
+        except Exception as e:
+            logger.debug(f"Could not pre-render phrase {text!r}: {e}")
+            return None
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def play(self, samples: np.ndarray, sample_rate: int):
+        self._playing = True
+        try:
+            super().play(samples, sample_rate)
+        finally:
+            self._playing = False
+
+    def stop(self):
+        if self._playing:
+            import sounddevice as sd
+            sd.stop()
+        elif self.engine is not None:
+            self.engine.stop()
+
+
+def create_backend(name: str = "auto", rate: int = 175, volume: float = 0.9) -> TTSBackend:
+    """
+    Build a TTS backend by name.
+
+    ``auto`` keeps the historical behaviour: pyttsx3 on Windows when it is
+    installed, printing everywhere else.
+    """
+    name = (name or "auto").lower()
+    if name == "auto":
+        name = "pyttsx3" if platform.system() == "Windows" else "print"
+
+    if name == "pyttsx3":
+        try:
+            import pyttsx3  # noqa: F401
+            return Pyttsx3Backend(rate, volume)
+        except ImportError:
+            logger.warning("pyttsx3 not installed, printing answers instead")
+            return PrintBackend()
+    if name == "null":
+        return NullBackend()
+    if name != "print":
+        logger.warning(f"Unknown TTS backend {name!r}, printing answers instead")
+    return PrintBackend()
+
+
+class TTSWorker:
+    """
+    Long-lived speech thread that owns a single backend.
+
+    Utterances are queued with ``say`` and spoken in order without blocking
+    the caller. ``interrupt`` cuts the current utterance short and ``flush``
+    also drops everything still queued. Phrases passed as ``cached_phrases``
+    are rendered once at start-up and replayed from memory when the backend
+    supports rendering.
+    """
+
+    def __init__(self, backend: TTSBackend, cached_phrases=()):
+        self.backend = backend
+        self.cached_phrases = tuple(cached_phrases)
+        self._cache = {}
+        self._queue = queue.Queue()
+        self._generation = 0
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.backend.open()
+        except Exception as e:
+            logger.error(f"TTS engine failed to start ({e}), printing answers instead")
+            self.backend = PrintBackend()
+
+        for phrase in self.cached_phrases:
+            rendered = self.backend.render(phrase)
+            if rendered is not None:
+                self._cache[phrase] = rendered
+        if self._cache:
+            logger.debug(f"Pre-rendered {len(self._cache)} TTS phrases")
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            generation, text, done, trace = item
+            try:
+                # text is None for drain() markers
+                if text is not None and generation == self._generation:
+                    started = time.perf_counter()
+                    cached = self._cache.get(text)
+                    source = "cached" if cached is not None else "live"
+                    with tracing.span("tts", trace=trace, source=source, chars=len(text)):
+                        if cached is not None:
+                            self.backend.play(*cached)
+                        else:
+                            self.backend.speak(text)
+                    TTS_SECONDS.labels(source=source).observe(time.perf_counter() - started)
+            except Exception as e:
+                logger.error(f"TTS error: {e}")
+                print(f"🗣️ Arc: {text}")
+            finally:
+                done.set()
+
+        self.backend.close()
+
+    def say(self, text: str, wait: bool = False) -> threading.Event:
+        """Queue ``text``; returns an event set once it has been spoken or skipped."""
+        done = threading.Event()
+        if self._thread is None:
+            self.start()
+        self._queue.put((self._generation, text, done, tracing.current_trace()))
+        if wait:
+            done.wait()
+        return done
+
+    def drain(self) -> threading.Event:
+        """Event set once everything queued so far has been spoken or skipped."""
+        done = threading.Event()
+        if self._thread is None:
+            done.set()
+            return done
+        self._queue.put((self._generation, None, done, None))
+        return done
+
+    def interrupt(self):
+        """Stop the utterance currently being spoken."""
+        self.backend.stop()
+
+    def flush(self):
+        """Drop all queued utterances and stop the current one."""
+        self._generation += 1
+        self.interrupt()
+
+    def close(self, timeout: float = 2.0):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None